@@ -0,0 +1,3 @@
+#!/usr/bin/python3
+
+"""Benchmarks for the lambda REPL"""
@@ -0,0 +1,29 @@
+#!/usr/bin/python3
+
+"""Benchmark for applying aliases with many unused aliases defined"""
+
+from timeit import repeat
+from lambda_calculus.terms import arithmetic
+from lambda_calculus.visitors.substitution.renaming import CountingSubstitution
+from lambda_repl.aliases import LetAliases
+from lambda_repl.parsing import LambdaTransformer
+
+
+def main() -> None:
+    """measure single pass and sequential alias application"""
+    term = LambdaTransformer().transform_string(r"\x.A0 (A1 x) (\y.y A2 x)")
+    for count in (10, 100, 1000):
+        aliases = LetAliases(CountingSubstitution)
+        for i in range(count):
+            aliases[f"A{i}"] = arithmetic.number(i % 10)
+        single = min(repeat(lambda: aliases.apply(term), number=100, repeat=5)) / 100
+        sequential = min(repeat(
+            lambda: aliases.substitute_sequentially(term, frozenset()),
+            number=10,
+            repeat=3
+        )) / 10
+        print(f"{count:>5} aliases: single pass {single * 1e6:9.1f}µs, sequential {sequential * 1e6:9.1f}µs")
+
+
+if __name__ == "__main__":
+    main()
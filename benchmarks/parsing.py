@@ -0,0 +1,43 @@
+#!/usr/bin/python3
+
+"""Benchmark for importing the parser and parsing term text"""
+
+import sys
+from subprocess import run
+from timeit import repeat
+from lambda_repl.parsing import LambdaTransformer
+
+IMPORT = "import lambda_repl.parsing"
+
+FIRST_PARSE = "from lambda_repl.parsing import LambdaTransformer; LambdaTransformer().transform_string('a')"
+
+
+def measure_process(statement: str) -> float:
+    """measure the time of running a statement in a new interpreter"""
+    return min(repeat(
+        lambda: run((sys.executable, "-c", statement), check=True),
+        number=1,
+        repeat=5
+    ))
+
+
+def main() -> None:
+    """measure import time, time until the first term is parsed and parsing throughput"""
+    baseline = measure_process("pass")
+    print(f"import:      {(measure_process(IMPORT) - baseline) * 1e3:7.1f}ms")
+    print(f"first parse: {(measure_process(FIRST_PARSE) - baseline) * 1e3:7.1f}ms")
+    transformer = LambdaTransformer()
+    for name, line in (
+        ("applications", " ".join(f"x{i}" for i in range(50))),
+        ("abstractions", "".join(f"λx{i}. " for i in range(50)) + "x0"),
+        ("numerals", "λf.λx." + "f (" * 50 + "x" + ")" * 50),
+        ("whitespace", " \t".join(f"( λ x{i} . x{i} )" for i in range(20)))
+    ):
+        lines = [line] * 100
+        size = sum(len(line.encode("utf8")) for line in lines) / 1e6
+        seconds = min(repeat(lambda: [transformer.transform_string(line) for line in lines], number=1, repeat=5))
+        print(f"{name:<12} {size / seconds:7.2f}MB/s")
+
+
+if __name__ == "__main__":
+    main()
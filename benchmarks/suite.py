@@ -0,0 +1,208 @@
+#!/usr/bin/python3
+
+"""Reproducible benchmark suite writing its results as JSON for comparing commits"""
+
+from __future__ import annotations
+import json
+import platform
+import sys
+from argparse import ArgumentParser, FileType
+from collections import deque
+from collections.abc import Callable, Iterator
+from functools import partial
+from statistics import median
+from subprocess import CalledProcessError, run
+from timeit import Timer
+from typing import Any
+from lambda_calculus.terms import Term, arithmetic, combinators
+from lambda_calculus.visitors.substitution.renaming import CountingSubstitution
+from lambda_repl.aliases import LetAliases
+from lambda_repl.main import ENGINES
+from lambda_repl.normalisation import Normaliser, skip_intermediate
+from lambda_repl.parsing import LambdaTransformer
+
+__all__ = (
+    "Benchmark",
+    "WORKLOADS",
+    "ARGUMENT_PARSER",
+    "generate_term",
+    "parsing",
+    "aliases",
+    "normalisation",
+    "normalise",
+    "benchmarks",
+    "measure",
+    "commit",
+    "compare",
+    "main"
+)
+
+# name of a benchmark and the function measured
+Benchmark = tuple[str, Callable[[], object]]
+
+# definitions available to the normalisation workloads
+DEFINITIONS = {
+    "Y": combinators.Y,
+    "ADD": arithmetic.ADD,
+    "MULTIPLY": arithmetic.MULTIPLY,
+    "POWER": arithmetic.POWER,
+    "PREDECESSOR": arithmetic.PREDECESSOR,
+    "SUCCESSOR": arithmetic.SUCCESSOR,
+    "ISZERO": arithmetic.ISZERO
+}
+
+WORKLOADS = {
+    "arithmetic": r"ADD (MULTIPLY 3 4) (POWER 2 3)",
+    "factorial": r"Y (λf.λn.ISZERO n 1 (MULTIPLY n (f (PREDECESSOR n)))) 3",
+    "recursion": r"Y (λf.λn.ISZERO n 0 (SUCCESSOR (f (PREDECESSOR n)))) 6",
+    "nesting": "(λx.x) (" * 300 + "a" + ")" * 300
+}
+
+ARGUMENT_PARSER = ArgumentParser(description=__doc__)
+ARGUMENT_PARSER.add_argument(
+    "-o",
+    "--output",
+    type=FileType("w"),
+    default=sys.stdout,
+    help="file receiving the results as JSON"
+)
+ARGUMENT_PARSER.add_argument(
+    "-c",
+    "--compare",
+    type=FileType("r"),
+    help="results of an earlier run to compare with, written to stderr"
+)
+ARGUMENT_PARSER.add_argument(
+    "-k",
+    "--filter",
+    default="",
+    help="only run benchmarks whose name contains this string"
+)
+ARGUMENT_PARSER.add_argument(
+    "-r",
+    "--repeat",
+    type=int,
+    default=5,
+    help="number of measurements of each benchmark"
+)
+
+
+def generate_term(nodes: int) -> str:
+    """generate the text of a balanced term with roughly the given number of nodes"""
+    # every iteration combines the two oldest parts in alternating ways
+    parts = deque(f"x{i}" for i in range(max(nodes // 3, 2)))
+    index = 0
+    while len(parts) > 1:
+        first, second = parts.popleft(), parts.popleft()
+        if index % 2:
+            parts.append(f"(λx{index}. {first} {second})")
+        else:
+            parts.append(f"({first}) ({second})")
+        index += 1
+    return parts[0]
+
+
+def parsing() -> Iterator[Benchmark]:
+    """parse large generated terms and many small ones"""
+    transformer = LambdaTransformer()
+    for nodes in (1000, 10000):
+        text = generate_term(nodes)
+        yield f"parse/large/{nodes}", partial(transformer.transform_string, text)
+    lines = [generate_term(30)] * 100
+    yield "parse/lines/100", lambda: [transformer.transform_string(line) for line in lines]
+
+
+def aliases() -> Iterator[Benchmark]:
+    """apply aliases to a term while increasing numbers of aliases are defined"""
+    term = LambdaTransformer().transform_string(r"\x.A0 (A1 x) (\y.y A2 x)")
+    for count in (10, 100, 1000):
+        definitions = LetAliases(CountingSubstitution)
+        for i in range(count):
+            definitions[f"A{i}"] = arithmetic.number(i % 10)
+        yield f"aliases/apply/{count}", partial(definitions.apply, term)
+        yield f"aliases/expand/{count}", partial(definitions.expand, term)
+
+
+def normalisation() -> Iterator[Benchmark]:
+    """normalise the workloads with every engine"""
+    transformer = LambdaTransformer(numerals=True)
+    definitions = LetAliases(CountingSubstitution)
+    for name, value in DEFINITIONS.items():
+        definitions[name] = value
+    for workload, text in WORKLOADS.items():
+        term = definitions.expand(definitions.apply(transformer.transform_string(text)))
+        for engine, factory in ENGINES.items():
+            yield f"normalise/{workload}/{engine}", partial(normalise, factory, term)
+
+
+def normalise(factory: Callable[[], Normaliser], term: Term[str]) -> Term[str]:
+    """normalise a term with a new engine"""
+    return skip_intermediate(factory(), term)
+
+
+def benchmarks() -> Iterator[Benchmark]:
+    """generate all benchmarks of the suite"""
+    yield from parsing()
+    yield from aliases()
+    yield from normalisation()
+
+
+def measure(function: Callable[[], object], repeat: int) -> dict[str, Any]:
+    """measure the seconds per call of a function"""
+    timer = Timer(function)
+    number, _ = timer.autorange()
+    times = [seconds / number for seconds in timer.repeat(repeat, number)]
+    return {
+        "min": min(times),
+        "median": median(times),
+        "number": number,
+        "repeat": repeat
+    }
+
+
+def commit() -> str | None:
+    """return the current git commit if known"""
+    try:
+        return run(
+            ("git", "rev-parse", "HEAD"),
+            capture_output=True,
+            check=True,
+            text=True
+        ).stdout.strip()
+    except (OSError, CalledProcessError):
+        return None
+
+
+def compare(baseline: dict[str, Any], results: dict[str, Any]) -> Iterator[str]:
+    """generate lines comparing the minimum times of two runs"""
+    for name, result in results["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            yield f"{name:<32} {result['min'] * 1e6:12.1f}µs {'new':>8}"
+        else:
+            yield f"{name:<32} {result['min'] * 1e6:12.1f}µs {result['min'] / before['min']:7.2f}x"
+
+
+def main() -> int:
+    """run the suite and write its results"""
+    args = ARGUMENT_PARSER.parse_args()
+    results: dict[str, Any] = {
+        "commit": commit(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "results": {}
+    }
+    for name, function in benchmarks():
+        if args.filter in name:
+            results["results"][name] = measure(function, args.repeat)
+    json.dump(results, args.output, indent=4)
+    args.output.write("\n")
+    if args.compare is not None:
+        for line in compare(json.load(args.compare), results):
+            print(line, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,66 +4,212 @@
 
 from __future__ import annotations
 from cmd import Cmd
-from importlib import import_module
-from typing import Any
+from contextlib import AbstractContextManager, contextmanager
+from collections.abc import Callable, Iterable, Iterator
+from typing import IO, Any
 from lambda_calculus.terms import Term
-from lambda_calculus.visitors.normalisation import (
-    Conversion,
-    BetaNormalisingVisitor
-)
-from lark.exceptions import UnexpectedInput
 from .parsing import LambdaTransformer
 from .aliases import Aliases
+from .cache import NormalFormCache
+from .limits import LimitExceeded, Limits, parse_limit
+from .normalisation import Normaliser
+from .printing import FORMATTERS, Formatter, truncate, write_tokens
+from .serialisation import SnapshotError
+from .session import DefinitionError, Interrupted, ParseError, Session, TermImportError, TraceStep
+from .stats import Statistics
+from .tracing import SYMBOLS, format_position, locate
 
 __version__ = "1.2.0"
 __author__  = "Eric Niklas Wolf"
 __email__   = "eric_niklas.wolf@mailbox.tu-dresden.de"
 __all__ = (
     "LambdaREPL",
+    "acceleration",
     "aliases",
+    "cache",
+    "compilation",
+    "debruijn",
+    "graph",
+    "interning",
+    "limits",
     "main",
-    "parsing"
+    "normalisation",
+    "numerals",
+    "parallel",
+    "parsing",
+    "printing",
+    "serialisation",
+    "server",
+    "session",
+    "stats",
+    "strategies",
+    "tracing",
+    "zipper"
 )
 
 
 class LambdaREPL(Cmd):
-    """interactive REPL"""
+    """interactive REPL displaying the results of a session"""
+
+    session: Session
+
+    errors: int
+
+    output: str
+
+    formatters: dict[str, Formatter]
 
-    aliases: Aliases[str]
+    width: int | None
 
-    transformer: LambdaTransformer
+    trace_mode: str
 
-    visitor: BetaNormalisingVisitor
+    trace_interval: int
 
-    def __init__(self, aliases: Aliases[str], transformer: LambdaTransformer, visitor: BetaNormalisingVisitor, *args: Any, **kwargs: Any) -> None:
+    trace_file: str | None
+
+    stats: bool
+
+    stats_file: str | None
+
+    def __init__(self, aliases: Aliases[str], transformer: LambdaTransformer, visitor: Normaliser, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
-        self.aliases = aliases
-        self.transformer = transformer
-        self.visitor = visitor
+        self.session = Session(aliases, transformer, visitor)
+        self.errors = 0
+        self.output = "full"
+        self.formatters = FORMATTERS.copy()
+        self.width = None
+        self.trace_mode = "full"
+        self.trace_interval = 1
+        self.trace_file = None
+        self.stats = False
+        self.stats_file = None
         self.intro = "Welcome to the the Lambda REPL, type 'help' for help"
         self.prompt = "λ "
 
+    @property
+    def aliases(self) -> Aliases[str]:
+        """aliases of the session"""
+        return self.session.aliases
+
+    @property
+    def transformer(self) -> LambdaTransformer:
+        """transformer of the session"""
+        return self.session.transformer
+
+    @property
+    def visitor(self) -> Normaliser:
+        """engine of the session"""
+        return self.session.visitor
+
+    @visitor.setter
+    def visitor(self, visitor: Normaliser) -> None:
+        self.session.visitor = visitor
+
+    @property
+    def strategy(self) -> str:
+        """reduction strategy of the session"""
+        return self.session.strategy
+
+    @property
+    def strategies(self) -> dict[str, Callable[[], Normaliser]]:
+        """reduction strategies available to the session"""
+        return self.session.strategies
+
+    @property
+    def limits(self) -> Limits:
+        """limits of the session"""
+        return self.session.limits
+
+    @limits.setter
+    def limits(self, limits: Limits) -> None:
+        self.session.limits = limits
+
+    @property
+    def cache(self) -> NormalFormCache:
+        """normal form cache of the session"""
+        return self.session.cache
+
+    @property
+    def hooks(self) -> list[Callable[[str], AbstractContextManager[Any]]]:
+        """hooks of the session surrounding phases of commands"""
+        return self.session.hooks
+
+    def write_error(self, message: str) -> None:
+        """display an error and count it"""
+        self.errors += 1
+        self.stdout.write(message)
+
+    @contextmanager
+    def collect_statistics(self, command: str) -> Iterator[None]:
+        """collect statistics about a command if enabled and write them afterwards"""
+        if not self.stats:
+            yield None
+            return
+        self.session.statistics = statistics = Statistics(command)
+        try:
+            yield None
+        finally:
+            self.session.statistics = None
+        self.write_statistics(statistics)
+
+    def write_statistics(self, statistics: Statistics) -> None:
+        """display statistics or append them to the statistics file as JSON"""
+        if self.stats_file is not None:
+            try:
+                with open(self.stats_file, "a", encoding="utf8") as file:
+                    file.write(f"{statistics.to_json()}\n")
+            except OSError as error:
+                self.write_error(f"Error while writing statistics: {error}\n")
+            return
+        summary = statistics.summary()
+        del summary["command"]
+        timings = summary.pop("timings")
+        for name, value in summary.items():
+            self.stdout.write(f"{name} = {value}\n")
+        for name, seconds in timings.items():
+            self.stdout.write(f"{name} = {seconds:.6f}s\n")
+
+    def write_term(self, term: Term[str], file: IO[str] | None = None) -> None:
+        """write a term and a newline in the output format as a stream, by default to stdout"""
+        if file is None:
+            file = self.stdout
+        with self.session.phase("print"):
+            parts = self.formatters[self.output](term, self.transformer.numerals)
+            if self.width is not None:
+                parts = truncate(term, parts, self.width)
+            write_tokens(parts, file)
+            file.write("\n")
+
     def parse_term(self, term: str) -> Term[str] | None:
         """parse a term and handle error display"""
         try:
-            return self.transformer.transform_string(term)
-        except UnexpectedInput as error:
-            self.stdout.write(f"Error while parsing: {error}")
-            self.stdout.write(error.get_context(term))
+            return self.session.parse(term)
+        except ParseError as error:
+            self.write_error(f"Error while parsing: {error}")
+            self.stdout.write(error.context())
         return None
 
     def import_term(self, location: str) -> Term[str] | None:
         """import a term and handle error display"""
-        module, _, name = location.strip().rpartition(".")
         try:
-            term = getattr(import_module(module), name)
-        except Exception as error:  # pylint: disable=W0718
-            self.stdout.write(f"Error while importing: {error}\n")
-            return None
-        if not isinstance(term, Term):
-            self.stdout.write(f"Error: object {term} is not a lambda term\n")
-            return None
-        return term
+            return self.session.import_term(location)
+        except TermImportError as error:
+            if error.__cause__ is None:
+                self.write_error(f"Error: {error}\n")
+            else:
+                self.write_error(f"Error while importing: {error}\n")
+        return None
+
+    def execute(self, lines: Iterable[str]) -> bool:
+        """execute commands without prompting, returning if the REPL was exited"""
+        for line in lines:
+            line = self.precmd(line.rstrip("\r\n"))
+            stop = self.postcmd(self.onecmd(line), line)
+            # stream results instead of waiting for all commands
+            self.stdout.flush()
+            if stop:
+                return True
+        return False
 
     def emptyline(self) -> bool:
         """ignore empty lines"""
@@ -71,29 +217,87 @@ class LambdaREPL(Cmd):
 
     def default(self, line: str) -> None:
         """print an error"""
-        self.stdout.write(f"*** Unknown command: {line}\n")
+        self.write_error(f"*** Unknown command: {line}\n")
+
+    def handle_interruption(self, error: Interrupted, partial: bool) -> None:
+        """display why an evaluation stopped and optionally its partial result"""
+        if isinstance(error.reason, LimitExceeded):
+            self.write_error(f"Error: {error} after {error.steps} steps\n")
+        else:
+            self.write_error(f"Interrupted after {error.steps} steps\n")
+        if partial:
+            self.write_term(error.term)
 
     def do_trace(self, arg: str) -> bool:
         """trace the evaluation of a lambda term"""
-        term = self.parse_term(arg)
-        if term is not None:
-            term = self.aliases.apply(term)
-            for conversion, step in term.accept(self.visitor):
-                if conversion is Conversion.ALPHA:
-                    symbol = "α"
-                elif conversion is Conversion.BETA:
-                    symbol = "β"
-                else:
-                    symbol = "?"    # type: ignore[unreachable]
-                self.stdout.write(f"{symbol} {step}\n")
+        with self.collect_statistics("trace"):
+            term = self.parse_term(arg)
+            if term is None:
+                return False
+            if self.trace_file is None:
+                self.trace(term, self.stdout)
+            else:
+                try:
+                    with open(self.trace_file, "a", encoding="utf8") as file:
+                        self.trace(term, file)
+                except OSError as error:
+                    self.write_error(f"Error while tracing: {error}\n")
         return False
 
+    def trace(self, term: Term[str], file: IO[str]) -> None:
+        """write the steps of evaluating a term to a file while they are performed"""
+        try:
+            self.trace_steps(term, file)
+        except Interrupted as error:
+            self.handle_interruption(error, False)
+
+    def trace_steps(self, term: Term[str], file: IO[str]) -> None:
+        """write the steps of evaluating a term to a file"""
+        counts = dict.fromkeys(SYMBOLS.values(), 0)
+        # the last step is always written
+        pending: tuple[str, TraceStep] | None = None
+        step: TraceStep | None = None
+        try:
+            for step in self.session.trace(term):
+                symbol = SYMBOLS.get(step.conversion, "?")
+                counts[symbol] = counts.get(symbol, 0) + 1
+                if self.trace_mode != "counts":
+                    if step.number % self.trace_interval == 0:
+                        self.write_step(file, symbol, step)
+                        pending = None
+                    else:
+                        pending = (symbol, step)
+        except KeyboardInterrupt as error:
+            # interrupted while writing a step
+            raise Interrupted(error, 0 if step is None else step.number, term) from error
+        finally:
+            if pending is not None:
+                self.write_step(file, *pending)
+            if self.trace_mode == "counts":
+                for symbol, count in counts.items():
+                    file.write(f"{symbol} {count}\n")
+
+    def write_step(self, file: IO[str], symbol: str, step: TraceStep) -> None:
+        """write a step of a trace, only writing the converted subterm in redex mode"""
+        if self.trace_mode == "redex":
+            position, subterm = locate(step.before, step.after, step.conversion)
+            file.write(f"{symbol} {format_position(position)} ")
+            self.write_term(subterm, file)
+        else:
+            file.write(f"{symbol} ")
+            self.write_term(step.after, file)
+
     def do_evaluate(self, arg: str) -> bool:
         """evaluate a lambda term"""
-        term = self.parse_term(arg)
-        if term is not None:
-            term = self.aliases.apply(term)
-            self.stdout.write(f"{self.visitor.skip_intermediate(term)}\n")
+        with self.collect_statistics("evaluate"):
+            term = self.parse_term(arg)
+            if term is not None:
+                try:
+                    evaluation = self.session.evaluate(term)
+                except Interrupted as error:
+                    self.handle_interruption(error, True)
+                else:
+                    self.write_term(evaluation.term)
         return False
 
     do_eval = do_evaluate
@@ -104,26 +308,73 @@ class LambdaREPL(Cmd):
             case (alias, "=", value):
                 term = self.parse_term(value)
                 if term is not None:
-                    self.aliases[alias.strip()] = term
+                    self.session.define(alias.strip(), term)
             case _:
-                self.stdout.write("invalid Command: missing alias value\n")
+                self.write_error("invalid Command: missing alias value\n")
         return False
 
     def do_import(self, arg: str) -> bool:
-        """import an alias from a module with name = module.name"""
+        """import an alias with name = module.name or all terms of a module with module.*"""
         match arg.partition("="):
             case (alias, "=", location):
                 term = self.import_term(location)
                 if term is not None:
-                    self.aliases[alias.strip()] = term
+                    self.session.define(alias.strip(), term)
+            case (location, "", "") if location.strip().endswith(".*"):
+                try:
+                    self.session.import_all(location.strip()[:-2])
+                except TermImportError as error:
+                    self.write_error(f"Error while importing: {error}\n")
             case _:
-                self.stdout.write("invalid Command: missing import location\n")
+                self.write_error("invalid Command: missing import location\n")
+        return False
+
+    def do_save(self, arg: str) -> bool:
+        """save the aliases to a snapshot file"""
+        path = arg.strip()
+        if not path:
+            self.write_error("invalid Command: missing file\n")
+            return False
+        try:
+            with open(path, "wb") as file:
+                self.session.save(file)
+        except OSError as error:
+            self.write_error(f"Error while saving: {error}\n")
+        return False
+
+    def do_load(self, arg: str) -> bool:
+        """load aliases from a snapshot file or a file with lines of name = term"""
+        path = arg.strip()
+        if not path:
+            self.write_error("invalid Command: missing file\n")
+            return False
+        try:
+            with open(path, "rb") as file:
+                self.session.load(file)
+        except (OSError, SnapshotError, DefinitionError) as error:
+            self.write_error(f"Error while loading: {error}\n")
         return False
 
     def do_aliases(self, _: object) -> bool:
         """list defined aliases"""
         for alias, term in self.aliases.items():
-            self.stdout.write(f"{alias} = {term}\n")
+            self.stdout.write(f"{alias} = ")
+            self.write_term(term)
+        return False
+
+    def do_deps(self, arg: str) -> bool:
+        """list the aliases used by an alias and the aliases rebuilt when it changes"""
+        alias = arg.strip()
+        if not alias:
+            self.write_error("invalid Command: missing alias\n")
+        elif alias not in self.aliases:
+            self.write_error(f"Error: alias '{alias}' does not exist\n")
+        else:
+            for name, aliases in (
+                ("dependencies", self.aliases.dependencies(alias)),
+                ("dependents", self.aliases.dependents(alias))
+            ):
+                self.stdout.write(f"{name} = {', '.join(aliases) if aliases else 'none'}\n")
         return False
 
     def do_clear(self, arg: str) -> bool:
@@ -131,13 +382,162 @@ class LambdaREPL(Cmd):
         alias = arg.strip()
         if alias:
             try:
-                del self.aliases[alias]
+                self.session.delete(alias)
             except KeyError:
-                self.stdout.write(f"Error: alias '{alias}' does not exist\n")
+                self.write_error(f"Error: alias '{alias}' does not exist\n")
         else:
-            self.aliases.clear()
+            self.session.clear()
+        return False
+
+    def do_cache(self, arg: str) -> bool:
+        """show statistics of the normal form cache or clear it with cache clear"""
+        match arg.strip():
+            case "":
+                self.stdout.write(
+                    f"entries = {len(self.cache)}/{self.cache.maxsize}\n"
+                    f"hits = {self.cache.hits}\n"
+                    f"misses = {self.cache.misses}\n"
+                )
+            case "clear":
+                self.cache.clear()
+            case _:
+                self.write_error(f"invalid Command: unknown argument {arg.strip()}\n")
+        return False
+
+    def do_set(self, arg: str) -> bool:
+        """change a setting with set name value or list settings"""
+        name, _, value = arg.strip().partition(" ")
+        if not name:
+            for attribute in self.get_names():
+                if attribute.startswith("set_"):
+                    self.stdout.write(f"{attribute[4:]} = {getattr(self, attribute)(None)}\n")
+            return False
+        try:
+            setting = getattr(self, f"set_{name}")
+        except AttributeError:
+            self.write_error(f"Error: setting '{name}' does not exist\n")
+            return False
+        try:
+            self.stdout.write(f"{name} = {setting(value.strip() or None)}\n")
+        except ValueError as error:
+            self.write_error(f"Error: invalid value: {error}\n")
         return False
 
+    def set_steps(self, value: str | None) -> str:
+        """maximum number of steps performed by an evaluation or 'none'"""
+        if value is not None:
+            self.limits.steps = parse_limit(value, int)
+        return str(self.limits.steps).lower()
+
+    def set_timeout(self, value: str | None) -> str:
+        """maximum number of seconds used by an evaluation or 'none'"""
+        if value is not None:
+            self.limits.timeout = parse_limit(value, float)
+        return str(self.limits.timeout).lower()
+
+    def set_size(self, value: str | None) -> str:
+        """maximum number of nodes of terms produced by an evaluation or 'none'"""
+        if value is not None:
+            self.limits.size = parse_limit(value, int)
+        return str(self.limits.size).lower()
+
+    def set_cache(self, value: str | None) -> str:
+        """maximum number of cached normal forms, 0 disables caching"""
+        if value is not None:
+            maxsize = int(value)
+            if maxsize < 0:
+                raise ValueError(f"size {value} is negative")
+            self.cache.resize(maxsize)
+        return str(self.cache.maxsize)
+
+    def set_numerals(self, value: str | None) -> str:
+        """if numeric literals are church numerals displayed as numbers (true or false)"""
+        match value:
+            case "true":
+                self.transformer.numerals = True
+            case "false":
+                self.transformer.numerals = False
+            case None:
+                pass
+            case _:
+                raise ValueError(f"{value} is not true or false")
+        return str(self.transformer.numerals).lower()
+
+    def set_arithmetic(self, value: str | None) -> str:
+        """if church arithmetic is calculated with integers before evaluating (true or false)"""
+        match value:
+            case "true":
+                self.session.use_arithmetic(True)
+            case "false":
+                self.session.use_arithmetic(False)
+            case None:
+                pass
+            case _:
+                raise ValueError(f"{value} is not true or false")
+        return str(self.session.arithmetic).lower()
+
+    def set_output(self, value: str | None) -> str:
+        """format of displayed terms (full, minimal or debruijn)"""
+        if value is not None:
+            if value not in self.formatters:
+                raise ValueError(f"unknown output format {value}")
+            self.output = value
+        return self.output
+
+    def set_width(self, value: str | None) -> str:
+        """maximum number of characters of displayed terms before they are summarised or 'none'"""
+        if value is not None:
+            self.width = parse_limit(value, int)
+        return str(self.width).lower()
+
+    def set_trace(self, value: str | None) -> str:
+        """what trace displays for steps (full, redex or counts)"""
+        if value is not None:
+            if value not in ("full", "redex", "counts"):
+                raise ValueError(f"unknown trace mode {value}")
+            self.trace_mode = value
+        return self.trace_mode
+
+    def set_interval(self, value: str | None) -> str:
+        """number of steps between steps displayed by trace"""
+        if value is not None:
+            interval = int(value)
+            if interval <= 0:
+                raise ValueError(f"interval {value} is not positive")
+            self.trace_interval = interval
+        return str(self.trace_interval)
+
+    def set_tracefile(self, value: str | None) -> str:
+        """file which trace appends to instead of displaying steps or 'none'"""
+        if value is not None:
+            self.trace_file = None if value.lower() == "none" else value
+        return "none" if self.trace_file is None else self.trace_file
+
+    def set_stats(self, value: str | None) -> str:
+        """if statistics about evaluate and trace are displayed (true or false)"""
+        match value:
+            case "true":
+                self.stats = True
+            case "false":
+                self.stats = False
+            case None:
+                pass
+            case _:
+                raise ValueError(f"{value} is not true or false")
+        return str(self.stats).lower()
+
+    def set_statsfile(self, value: str | None) -> str:
+        """file which statistics are appended to as JSON lines instead of shown or 'none'"""
+        if value is not None:
+            self.stats_file = None if value.lower() == "none" else value
+        return "none" if self.stats_file is None else self.stats_file
+
+    def set_strategy(self, value: str | None) -> str:
+        """reduction strategy used by trace and evaluate (normal, applicative, name or need)"""
+        if value is not None:
+            self.session.use_strategy(value)
+        return self.strategy
+
     def do_exit(self, _: object) -> bool:
         """exit the repl"""
         self.stdout.write("Exiting REPL...\n")
@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+
+"""Calculation of church arithmetic with Python integers"""
+
+from __future__ import annotations
+from collections.abc import Callable
+from typing import Any, Final
+from lambda_calculus.terms import Abstraction, Application, Term, arithmetic
+from . import interning
+from .debruijn import Fingerprint, fingerprint
+from .numerals import numeral, numeral_value
+
+__all__ = (
+    "MAXIMUM",
+    "OPERATIONS",
+    "calculate",
+    "accelerate"
+)
+
+# largest number produced by calculations, larger results are left to reduction
+MAXIMUM: Final = 1 << 20
+
+# markers used on the stack when rebuilding terms
+_VISIT: Final = 0
+
+_ABSTRACT: Final = 1
+
+_APPLY: Final = 2
+
+
+def _power(base: int, exponent: int, maximum: int) -> int | None:
+    # e b reduces to the identity instead of a numeral if e is zero
+    if exponent == 0 or (base > 1 and exponent > maximum.bit_length()):
+        return None
+    result: int = base ** exponent
+    return result
+
+
+# arity and implementation of recognised combinators by their fingerprint,
+# implementations return None if the normal form is no numeral
+OPERATIONS: Final[dict[Fingerprint, tuple[int, Callable[..., int | None]]]] = {
+    fingerprint(arithmetic.SUCCESSOR): (1, lambda n, _: n + 1),
+    fingerprint(arithmetic.PREDECESSOR): (1, lambda n, _: max(n - 1, 0)),
+    fingerprint(arithmetic.ADD): (2, lambda m, n, _: m + n),
+    fingerprint(arithmetic.SUBTRACT): (2, lambda m, n, _: max(m - n, 0)),
+    fingerprint(arithmetic.MULTIPLY): (2, lambda m, n, _: m * n),
+    fingerprint(arithmetic.POWER): (2, _power)
+}
+
+# sizes of the recognised combinators to avoid creating most fingerprints
+_SIZES: Final = frozenset(map(len, OPERATIONS))
+
+
+def calculate(application: Application[str], maximum: int = MAXIMUM) -> Term[str] | None:
+    """
+    return the numeral which an application of a recognised combinator
+    to church numerals reduces to or None if it does not match exactly
+    """
+    arguments: list[Term[str]] = [application.argument]
+    head = application.abstraction
+    for arity in (1, 2):
+        if isinstance(head, Abstraction):
+            key = fingerprint(head) if interning.size(head) in _SIZES else None
+            operation = OPERATIONS.get(key) if key is not None else None
+            if operation is not None and operation[0] == arity:
+                values = []
+                for argument in reversed(arguments):
+                    value = numeral_value(argument)
+                    if value is None:
+                        return None
+                    values.append(value)
+                result = operation[1](*values, maximum)
+                if result is None or result > maximum:
+                    return None
+                return numeral(result)
+            return None
+        elif isinstance(head, Application):
+            arguments.append(head.argument)
+            head = head.abstraction
+        else:
+            return None
+    return None
+
+
+def accelerate(term: Term[str], maximum: int = MAXIMUM) -> Term[str]:
+    """
+    replace applications of recognised arithmetic combinators to church numerals
+    in a term with the numerals they reduce to, starting with the innermost ones
+
+    Since the replaced subterms are reduced to their normal form the result
+    has the same normal form as the term if it has one.
+    """
+    output: list[Term[str]] = []
+    stack: list[tuple[int, Any]] = [(_VISIT, term)]
+    while stack:
+        action, item = stack.pop()
+        if action == _VISIT:
+            if isinstance(item, Abstraction):
+                stack.append((_ABSTRACT, item))
+                stack.append((_VISIT, item.body))
+            elif isinstance(item, Application):
+                stack.append((_APPLY, item))
+                stack.append((_VISIT, item.argument))
+                stack.append((_VISIT, item.abstraction))
+            else:
+                output.append(item)
+        elif action == _ABSTRACT:
+            body = output.pop()
+            output.append(item if body is item.body else interning.abstraction(item.bound, body))
+        else:
+            argument = output.pop()
+            function = output.pop()
+            if function is not item.abstraction or argument is not item.argument:
+                item = interning.application(function, argument)
+            result = calculate(item, maximum)
+            output.append(item if result is None else result)
+    return output[0]
@@ -5,19 +5,130 @@
 from __future__ import annotations
 from abc import abstractmethod
 from collections import OrderedDict
-from collections.abc import MutableMapping, Iterator
-from typing import TypeVar, Type
-from lambda_calculus.terms import Term
+from collections.abc import Callable, Iterable, Mapping, MutableMapping, Iterator, Set
+from itertools import count
+from typing import Generic, TypeVar, Type
+from lambda_calculus.terms import Abstraction, Application, Term, Variable
 from lambda_calculus.visitors.substitution import Substitution
+from .interning import intern_term
 
 __all__ = (
     "Aliases",
-    "LetAliases"
+    "LetAliases",
+    "LazyAliases",
+    "Definition",
+    "Reference",
+    "substitute",
+    "references"
 )
 
 V = TypeVar("V")
 
 
+def substitute(
+    term: Term[V],
+    values: Mapping[V, Term[V]],
+    captures: Mapping[V, Set[V]],
+    fallback: Callable[[Term[V], Set[V]], Term[V]]
+) -> Term[V]:
+    """
+    substitute free variables simultaneously in a single traversal
+
+    captures maps variables to the substituted variables whose values contain them freely,
+    abstractions which would capture them are passed to fallback
+    together with the variables not to substitute because they are bound
+    """
+    output: list[Term[V]] = []
+    # None marks the end of a compound term
+    stack: list[tuple[Term[V] | None, frozenset[V]]] = [(term, frozenset())]
+    while stack:
+        item, shadowed = stack.pop()
+        if item is None:
+            original, _ = stack.pop()
+            # reuse terms without substitutions
+            if isinstance(original, Abstraction):
+                body = output[-1]
+                if body is original.body:
+                    output[-1] = original
+                else:
+                    output[-1] = Abstraction(original.bound, body)
+            elif isinstance(original, Application):
+                argument = output.pop()
+                abstraction = output[-1]
+                if abstraction is original.abstraction and argument is original.argument:
+                    output[-1] = original
+                else:
+                    output[-1] = Application(abstraction, argument)
+        elif isinstance(item, Variable):
+            if item.name in values and item.name not in shadowed:
+                output.append(values[item.name])
+            else:
+                output.append(item)
+        elif isinstance(item, Abstraction):
+            captured = captures.get(item.bound)
+            if captured:
+                used = item.body.free_variables()
+                if any(variable in used and variable not in shadowed for variable in captured):
+                    output.append(fallback(item, shadowed))
+                    continue
+            if item.bound in values and item.bound not in shadowed:
+                shadowed = shadowed | {item.bound}
+            stack.append((item, shadowed))
+            stack.append((None, shadowed))
+            stack.append((item.body, shadowed))
+        elif isinstance(item, Application):
+            stack.append((item, shadowed))
+            stack.append((None, shadowed))
+            stack.append((item.argument, shadowed))
+            stack.append((item.abstraction, shadowed))
+    return output[0]
+
+
+def _dependency_order(
+    order: Iterable[V],
+    selected: Set[V],
+    uses: Callable[[V], Iterable[V]]
+) -> list[V]:
+    """
+    sort aliases after the aliases they use, keeping their order
+    where possible and breaking cycles at the earliest alias
+    """
+    candidates = [alias for alias in order if alias in selected]
+    positions = {alias: position for position, alias in enumerate(candidates)}
+
+    def pending(alias: V) -> Iterator[V]:
+        used = (used for used in uses(alias) if used in positions)
+        return iter(sorted(used, key=positions.__getitem__))
+
+    result: list[V] = []
+    visited: set[V] = set()
+    for alias in candidates:
+        if alias in visited:
+            continue
+        visited.add(alias)
+        stack = [(alias, pending(alias))]
+        while stack:
+            current, remaining = stack[-1]
+            for used in remaining:
+                if used not in visited:
+                    visited.add(used)
+                    stack.append((used, pending(used)))
+                    break
+            else:
+                stack.pop()
+                result.append(current)
+    return result
+
+
+def _index_captures(values: Mapping[V, Term[V]]) -> dict[V, set[V]]:
+    """map free variables of values to the variables substituted with them"""
+    captures: dict[V, set[V]] = {}
+    for variable, value in values.items():
+        for free in value.free_variables():
+            captures.setdefault(free, set()).add(variable)
+    return captures
+
+
 class Aliases(MutableMapping[V, Term[V]]):
     """ABC for alias implementations"""
 
@@ -28,22 +139,105 @@ class Aliases(MutableMapping[V, Term[V]]):
         """apply the aliases to a term"""
         raise NotImplementedError()
 
+    @abstractmethod
+    def define(self, alias: V, value: Term[V]) -> None:
+        """set an alias to a term which already had the aliases applied"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def restore(
+        self,
+        alias: V,
+        value: Term[V],
+        source: Term[V],
+        previous: Term[V] | None,
+        uses: Iterable[V]
+    ) -> None:
+        """set an alias to its expanded value and the definition it was created from"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def source(self, alias: V) -> tuple[Term[V], Term[V] | None]:
+        """
+        return the definition of an alias before applying the aliases it uses
+        and the expanded earlier value of the alias if the definition uses it
+        """
+        raise NotImplementedError()
+
+    def extend(self, definitions: Iterable[tuple[V, Term[V]]]) -> None:
+        """set aliases to terms in order like assigning them one after another"""
+        for alias, term in definitions:
+            self[alias] = term
+
+    def expand(self, term: Term[V]) -> Term[V]:
+        """expand references to aliases left by apply"""
+        return term
+
+    @abstractmethod
+    def fork(self) -> Aliases[V]:
+        """create aliases sharing the current definitions until either of them changes"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def dependencies(self, alias: V) -> list[V]:
+        """return the aliases used by the definition of an alias in definition order"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def dependents(self, alias: V) -> list[V]:
+        """return the aliases using an alias directly or indirectly in the order to update them"""
+        raise NotImplementedError()
+
 
 class LetAliases(Aliases[V]):
-    """Alias implementations with no self reference"""
+    """
+    Alias implementations with no self reference
+
+    Aliases using other aliases are rebuilt from their definitions
+    when the aliases they use change, keeping their position.
+    """
 
     aliases: OrderedDict[V, Term[V]]
 
     substitution: Type[Substitution[V]]
 
+    captures: dict[V, set[V]]
+
+    # terms which aliases were defined with before applying aliases
+    sources: dict[V, Term[V]]
+
+    # earlier values of aliases used by their own definition
+    previous: dict[V, Term[V]]
+
+    # aliases used by the definition of an alias
+    uses: dict[V, set[V]]
+
+    # aliases whose definition uses an alias
+    users: dict[V, set[V]]
+
+    # if the containers are shared with other instances and have to be copied before changing them
+    shared: bool
+
     __slots__ = (
         "aliases",
-        "substitution"
+        "substitution",
+        "captures",
+        "sources",
+        "previous",
+        "uses",
+        "users",
+        "shared"
     )
 
     def __init__(self, substitution: Type[Substitution[V]]) -> None:
         self.aliases = OrderedDict()
         self.substitution = substitution
+        self.captures = {}
+        self.sources = {}
+        self.previous = {}
+        self.uses = {}
+        self.users = {}
+        self.shared = False
 
     def __len__(self) -> int:
         return len(self.aliases)
@@ -55,15 +249,522 @@ class LetAliases(Aliases[V]):
         return self.aliases[alias]
 
     def __setitem__(self, alias: V, term: Term[V]) -> None:
-        self.aliases[alias] = self.apply(term)
-        self.aliases.move_to_end(alias, last=True)
+        used = term.free_variables() & self.aliases.keys()
+        # the current value of a self reference is part of the new one
+        previous = self.aliases[alias] if alias in used else None
+        self.redefine(alias, self.apply(term), term, previous, used - {alias})
 
     def __delitem__(self, alias: V) -> None:
+        dependents = self.dependents(alias)
+        self.forget(alias)
         del self.aliases[alias]
+        for dependent in dependents:
+            self.rebuild(dependent)
 
-    def apply(self, term: Term[V]) -> Term[V]:
-        """apply the aliases to a term"""
+    def clear(self) -> None:
+        self.aliases = OrderedDict()
+        self.captures = {}
+        self.sources = {}
+        self.previous = {}
+        self.uses = {}
+        self.users = {}
+        self.shared = False
+
+    def fork(self) -> LetAliases[V]:
+        """create aliases sharing the current definitions until either of them changes"""
+        aliases: LetAliases[V] = LetAliases(self.substitution)
+        aliases.aliases = self.aliases
+        aliases.captures = self.captures
+        aliases.sources = self.sources
+        aliases.previous = self.previous
+        aliases.uses = self.uses
+        aliases.users = self.users
+        aliases.shared = self.shared = True
+        return aliases
+
+    def unshare(self) -> None:
+        """copy containers shared with other instances before changing them"""
+        if self.shared:
+            self.aliases = self.aliases.copy()
+            self.captures = {
+                variable: aliases.copy()
+                for variable, aliases in self.captures.items()
+            }
+            self.sources = self.sources.copy()
+            self.previous = self.previous.copy()
+            self.uses = {alias: uses.copy() for alias, uses in self.uses.items()}
+            self.users = {alias: users.copy() for alias, users in self.users.items()}
+            self.shared = False
+
+    def define(self, alias: V, value: Term[V]) -> None:
+        """set an alias to a term which already had the aliases applied"""
+        self.redefine(alias, value, value, None, set())
+
+    def restore(
+        self,
+        alias: V,
+        value: Term[V],
+        source: Term[V],
+        previous: Term[V] | None,
+        uses: Iterable[V]
+    ) -> None:
+        """set an alias to its expanded value and the definition it was created from"""
+        self.redefine(alias, value, source, previous, (set(uses) & self.aliases.keys()) - {alias})
+
+    def source(self, alias: V) -> tuple[Term[V], Term[V] | None]:
+        """
+        return the definition of an alias before applying the aliases it uses
+        and the expanded earlier value of the alias if the definition uses it
+        """
+        return self.sources[alias], self.previous.get(alias)
+
+    def extend(self, definitions: Iterable[tuple[V, Term[V]]]) -> None:
+        """set aliases to terms in order, rebuilding the aliases depending on them once"""
+        stale: set[V] = set()
+        for alias, term in definitions:
+            used = term.free_variables() & self.aliases.keys()
+            # aliases used by the definition have to be current
+            if not stale.isdisjoint(used):
+                self.rebuild_all(stale)
+                stale.clear()
+            stale.update(self.dependents(alias))
+            stale.discard(alias)
+            previous = self.aliases[alias] if alias in used else None
+            self.store(alias, self.apply(term), term, previous, used - {alias})
+            self.aliases.move_to_end(alias, last=True)
+        self.rebuild_all(stale)
+
+    def rebuild_all(self, aliases: Set[V]) -> None:
+        """rebuild aliases after the aliases they use"""
+        if aliases:
+            for alias in _dependency_order(self.aliases, aliases, self.uses.__getitem__):
+                self.rebuild(alias)
+
+    def redefine(
+        self,
+        alias: V,
+        value: Term[V],
+        source: Term[V],
+        previous: Term[V] | None,
+        uses: set[V]
+    ) -> None:
+        """set an alias as the last one and rebuild the aliases depending on it"""
+        dependents = self.dependents(alias)
+        self.store(alias, value, source, previous, uses)
+        self.aliases.move_to_end(alias, last=True)
+        for dependent in dependents:
+            self.rebuild(dependent)
+
+    def store(
+        self,
+        alias: V,
+        value: Term[V],
+        source: Term[V],
+        previous: Term[V] | None,
+        uses: set[V]
+    ) -> None:
+        """set an alias without changing its position or updating the aliases depending on it"""
+        self.unshare()
+        if alias in self.aliases:
+            self.forget(alias)
+        self.aliases[alias] = value
+        for variable in value.free_variables():
+            self.captures.setdefault(variable, set()).add(alias)
+        self.sources[alias] = source
+        if previous is not None:
+            self.previous[alias] = previous
+        self.uses[alias] = uses
+        for used in uses:
+            self.users.setdefault(used, set()).add(alias)
+
+    def forget(self, alias: V) -> None:
+        """remove the captures and dependencies of an alias"""
+        self.unshare()
+        self.forget_captures(alias)
+        del self.sources[alias]
+        self.previous.pop(alias, None)
+        for used in self.uses.pop(alias):
+            users = self.users[used]
+            users.discard(alias)
+            if not users:
+                del self.users[used]
+
+    def rebuild(self, alias: V) -> None:
+        """apply the current values of the aliases used by an alias to its definition again"""
+        values = {
+            used: self.aliases[used]
+            for used in self.uses[alias]
+            if used in self.aliases
+        }
+        uses = set(values)
+        previous = self.previous.get(alias)
+        if previous is not None:
+            values[alias] = previous
+
+        def fallback(term: Term[V], shadowed: Set[V]) -> Term[V]:
+            for used in reversed(self.aliases):
+                if used in uses and used not in shadowed:
+                    term = term.accept(self.substitution.from_substitution(used, values[used]))
+            # the earlier value was applied before all current aliases
+            if previous is not None and alias not in shadowed:
+                term = term.accept(self.substitution.from_substitution(alias, previous))
+            return term
+
+        source = self.sources[alias]
+        value = intern_term(substitute(source, values, _index_captures(values), fallback))
+        self.store(alias, value, source, previous, uses)
+
+    def dependencies(self, alias: V) -> list[V]:
+        """return the aliases used by the definition of an alias in definition order"""
+        uses = self.uses[alias]
+        return [used for used in self.aliases if used in uses]
+
+    def dependents(self, alias: V) -> list[V]:
+        """return the aliases using an alias directly or indirectly in the order to rebuild them"""
+        found: set[V] = set()
+        stack = [alias]
+        while stack:
+            for user in self.users.get(stack.pop(), ()):
+                if user not in found and user != alias:
+                    found.add(user)
+                    stack.append(user)
+        if not found:
+            return []
+        return _dependency_order(self.aliases, found, self.uses.__getitem__)
+
+    def forget_captures(self, alias: V) -> None:
+        """remove the free variables of an alias from the variables which could be captured"""
+        for variable in self.aliases[alias].free_variables():
+            aliases = self.captures[variable]
+            aliases.discard(alias)
+            if not aliases:
+                del self.captures[variable]
+
+    def substitute_sequentially(self, term: Term[V], shadowed: Set[V]) -> Term[V]:
+        """apply aliases which are not shadowed one after another"""
         # dont substitute free variables with later defined aliases
         for alias, value in reversed(self.aliases.items()):
-            term = term.accept(self.substitution.from_substitution(alias, value))
+            if alias not in shadowed:
+                term = term.accept(self.substitution.from_substitution(alias, value))
         return term
+
+    def apply(self, term: Term[V]) -> Term[V]:
+        """apply the aliases to a term in a single traversal"""
+        return intern_term(substitute(
+            term,
+            self.aliases,
+            self.captures,
+            self.substitute_sequentially
+        ))
+
+
+class Definition(Generic[V]):
+    """immutable version of an alias referencing earlier aliases"""
+
+    name: V
+
+    term: Term[V]
+
+    index: int
+
+    references: dict[V, Reference[V]]
+
+    expansion: Term[V] | None
+
+    __slots__ = (
+        "name",
+        "term",
+        "index",
+        "references",
+        "expansion",
+        "__weakref__"
+    )
+
+    def __init__(self, name: V, term: Term[V], index: int) -> None:
+        self.name = name
+        self.term = term
+        self.index = index
+        self.references = references(term)
+        self.expansion = None if self.references else term
+
+    def __repr__(self) -> str:
+        return f"Definition({self.name!r}, {self.index})"
+
+
+class Reference(Variable[V]):
+    """Variable referencing the definition of an alias"""
+
+    definition: Definition[V]
+
+    __slots__ = ("definition",)
+
+    def __init__(self, definition: Definition[V]) -> None:
+        super().__init__(definition.name)
+        self.definition = definition
+
+    def __hash__(self) -> int:
+        return hash((self.name, id(self.definition)))
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Reference) and other.definition is self.definition
+
+    def __reduce__(self) -> tuple[object, ...]:
+        return Reference, (self.definition,)
+
+
+def references(term: Term[V]) -> dict[V, Reference[V]]:
+    """collect the references contained in a term"""
+    found: dict[V, Reference[V]] = {}
+    stack = [term]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, Reference):
+            found[item.name] = item
+        elif isinstance(item, Application):
+            stack.append(item.argument)
+            stack.append(item.abstraction)
+        elif isinstance(item, Abstraction):
+            stack.append(item.body)
+    return found
+
+
+class _ReferenceMapping(Mapping[V, Term[V]]):
+    """view of the references to the current definitions"""
+
+    definitions: Mapping[V, Definition[V]]
+
+    __slots__ = ("definitions",)
+
+    def __init__(self, definitions: Mapping[V, Definition[V]]) -> None:
+        self.definitions = definitions
+
+    def __len__(self) -> int:
+        return len(self.definitions)
+
+    def __iter__(self) -> Iterator[V]:
+        return iter(self.definitions)
+
+    def __getitem__(self, alias: V) -> Term[V]:
+        return Reference(self.definitions[alias])
+
+    def __contains__(self, alias: object) -> bool:
+        return alias in self.definitions
+
+
+class LazyAliases(Aliases[V]):
+    """
+    Alias implementation with no self reference which keeps references to other aliases
+
+    References are replaced with ones to the current definitions
+    when the aliases they reference change.
+    """
+
+    definitions: OrderedDict[V, Definition[V]]
+
+    substitution: Type[Substitution[V]]
+
+    counter: Iterator[int]
+
+    # if the definitions are shared with other instances and have to be copied before changing them
+    shared: bool
+
+    __slots__ = (
+        "definitions",
+        "substitution",
+        "counter",
+        "shared"
+    )
+
+    def __init__(self, substitution: Type[Substitution[V]]) -> None:
+        self.definitions = OrderedDict()
+        self.substitution = substitution
+        self.counter = count()
+        self.shared = False
+
+    def __len__(self) -> int:
+        return len(self.definitions)
+
+    def __iter__(self) -> Iterator[V]:
+        return iter(self.definitions)
+
+    def __getitem__(self, alias: V) -> Term[V]:
+        return self.definitions[alias].term
+
+    def __setitem__(self, alias: V, term: Term[V]) -> None:
+        dependents = self.dependents(alias)
+        self.define(alias, self.apply(term))
+        self.rebind(dependents)
+
+    def __delitem__(self, alias: V) -> None:
+        dependents = self.dependents(alias)
+        self.unshare()
+        del self.definitions[alias]
+        self.rebind(dependents)
+
+    def clear(self) -> None:
+        self.definitions = OrderedDict()
+        self.shared = False
+
+    def define(self, alias: V, value: Term[V]) -> None:
+        """set an alias to a term which already had the aliases applied"""
+        self.unshare()
+        self.definitions[alias] = Definition(alias, value, next(self.counter))
+        self.definitions.move_to_end(alias, last=True)
+
+    def restore(
+        self,
+        alias: V,
+        value: Term[V],
+        source: Term[V],
+        previous: Term[V] | None,
+        uses: Iterable[V]
+    ) -> None:
+        """set an alias to its expanded value and the definition it was created from"""
+        dependents = self.dependents(alias)
+        values: dict[V, Term[V]] = {
+            used: Reference(self.definitions[used])
+            for used in uses
+            if used in self.definitions and used != alias
+        }
+        if previous is not None:
+            # the earlier value was applied before all current aliases
+            values[alias] = Reference(Definition(alias, previous, -1))
+        self.define(alias, intern_term(substitute(source, values, {}, lambda t, _: t)))
+        # the expansion does not change since the referenced definitions are restored first
+        self.definitions[alias].expansion = value
+        self.rebind(dependents)
+
+    def source(self, alias: V) -> tuple[Term[V], Term[V] | None]:
+        """
+        return the definition of an alias with names instead of references
+        and the expanded earlier value of the alias if the definition uses it
+        """
+        definition = self.definitions[alias]
+        if not definition.references:
+            return definition.term, None
+        previous = definition.references.get(alias)
+        names = {used: Variable(used) for used in definition.references}
+        return (
+            intern_term(substitute(definition.term, names, {}, lambda t, _: t)),
+            None if previous is None else self.expand(previous)
+        )
+
+    def rebind(self, aliases: Iterable[V]) -> None:
+        """
+        define aliases again in order without changing their position,
+        referencing the current definitions of the aliases they use
+        """
+        for alias in aliases:
+            definition = self.definitions[alias]
+            values: dict[V, Term[V]] = {}
+            for used, reference in definition.references.items():
+                current = self.definitions.get(used)
+                # the current value of a self reference is part of the definition
+                if used != alias and reference.definition is not current:
+                    values[used] = Variable(used) if current is None else Reference(current)
+            if values:
+                term = intern_term(substitute(definition.term, values, {}, lambda t, _: t))
+                self.unshare()
+                # the index orders the definition before later aliases like before
+                self.definitions[alias] = Definition(alias, term, definition.index)
+
+    def fork(self) -> LazyAliases[V]:
+        """create aliases sharing the current definitions until either of them changes"""
+        aliases: LazyAliases[V] = LazyAliases(self.substitution)
+        # definitions are immutable and their indices have to stay unique
+        aliases.definitions = self.definitions
+        aliases.counter = self.counter
+        aliases.shared = self.shared = True
+        return aliases
+
+    def unshare(self) -> None:
+        """copy the definitions if they are shared with other instances before changing them"""
+        if self.shared:
+            self.definitions = self.definitions.copy()
+            self.shared = False
+
+    def dependencies(self, alias: V) -> list[V]:
+        """return the aliases whose current definitions an alias references in definition order"""
+        found = self.definitions[alias].references
+        return [
+            used for used, definition in self.definitions.items()
+            if used in found and found[used].definition is definition
+        ]
+
+    def dependents(self, alias: V) -> list[V]:
+        """return the aliases referencing the current definition of an alias in rebinding order"""
+        if alias not in self.definitions:
+            return []
+        users: dict[Definition[V], list[V]] = {}
+        for user, definition in self.definitions.items():
+            for reference in definition.references.values():
+                users.setdefault(reference.definition, []).append(user)
+        found: set[V] = set()
+        stack = [alias]
+        while stack:
+            for user in users.get(self.definitions[stack.pop()], ()):
+                if user not in found and user != alias:
+                    found.add(user)
+                    stack.append(user)
+        if not found:
+            return []
+        return _dependency_order(
+            self.definitions,
+            found,
+            lambda user: self.definitions[user].references.keys()
+        )
+
+    def apply(self, term: Term[V]) -> Term[V]:
+        """replace free variables with references to the current definitions"""
+        # references can not be captured since they are named like the aliases
+        return intern_term(substitute(
+            term,
+            _ReferenceMapping(self.definitions),
+            {},
+            lambda t, _: t
+        ))
+
+    def expand_references(self, term: Term[V], found: Mapping[V, Reference[V]]) -> Term[V]:
+        """substitute references whose definitions are already expanded"""
+        values = {
+            alias: reference.definition.expansion
+            for alias, reference in found.items()
+        }
+
+        def fallback(term: Term[V], shadowed: Set[V]) -> Term[V]:
+            # definitions created later can reference variables named like earlier aliases
+            for reference in sorted(found.values(), key=lambda r: r.definition.index, reverse=True):
+                if reference.name not in shadowed:
+                    term = term.accept(self.substitution.from_substitution(
+                        reference.name,
+                        reference.definition.expansion  # type: ignore[arg-type]
+                    ))
+            return term
+
+        return intern_term(substitute(
+            term,
+            values,     # type: ignore[arg-type]
+            _index_captures(values),    # type: ignore[arg-type]
+            fallback
+        ))
+
+    def expand(self, term: Term[V]) -> Term[V]:
+        """expand references to aliases, caching the expansions of definitions"""
+        found = references(term)
+        if not found:
+            return term
+        # expand definitions before the definitions referencing them
+        stack = [(reference.definition, False) for reference in found.values()]
+        while stack:
+            definition, ready = stack.pop()
+            if definition.expansion is not None:
+                continue
+            elif ready:
+                definition.expansion = self.expand_references(
+                    definition.term,
+                    definition.references
+                )
+            else:
+                stack.append((definition, True))
+                stack.extend((r.definition, False) for r in definition.references.values())
+        return self.expand_references(term, found)
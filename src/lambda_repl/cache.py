@@ -0,0 +1,103 @@
+#!/usr/bin/python3
+
+"""Cache for normal forms"""
+
+from __future__ import annotations
+from collections import OrderedDict
+from collections.abc import Set
+from lambda_calculus.terms import Term
+from .debruijn import Fingerprint, fingerprint
+
+__all__ = (
+    "NormalFormCache",
+)
+
+
+class NormalFormCache:
+    """LRU cache of normal forms of alpha equivalent terms"""
+
+    maxsize: int
+
+    hits: int
+
+    misses: int
+
+    entries: OrderedDict[Fingerprint, tuple[Term[str], frozenset[str]]]
+
+    dependents: dict[str, set[Fingerprint]]
+
+    __slots__ = (
+        "maxsize",
+        "hits",
+        "misses",
+        "entries",
+        "dependents"
+    )
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.entries = OrderedDict()
+        self.dependents = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def key(self, term: Term[str]) -> Fingerprint | None:
+        """calculate the key of a term or None if caching is disabled"""
+        if self.maxsize <= 0:
+            return None
+        return fingerprint(term)
+
+    def get(self, key: Fingerprint) -> Term[str] | None:
+        """return a cached normal form and update the statistics"""
+        try:
+            term, _ = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key, last=True)
+        self.hits += 1
+        return term
+
+    def put(self, key: Fingerprint, term: Term[str], dependencies: Set[str]) -> None:
+        """add a normal form which depends on some aliases"""
+        if self.maxsize <= 0:
+            return
+        self.discard(key)
+        self.entries[key] = (term, frozenset(dependencies))
+        for alias in dependencies:
+            self.dependents.setdefault(alias, set()).add(key)
+        while len(self.entries) > self.maxsize:
+            self.discard(next(iter(self.entries)))
+
+    def discard(self, key: Fingerprint) -> None:
+        """remove an entry if it exists"""
+        try:
+            _, dependencies = self.entries.pop(key)
+        except KeyError:
+            return
+        for alias in dependencies:
+            keys = self.dependents[alias]
+            keys.discard(key)
+            if not keys:
+                del self.dependents[alias]
+
+    def invalidate(self, alias: str) -> None:
+        """remove all entries which depend on an alias"""
+        for key in tuple(self.dependents.get(alias, ())):
+            self.discard(key)
+
+    def resize(self, maxsize: int) -> None:
+        """change the maximum number of entries"""
+        self.maxsize = maxsize
+        while len(self.entries) > max(maxsize, 0):
+            self.discard(next(iter(self.entries)))
+
+    def clear(self) -> None:
+        """remove all entries and reset the statistics"""
+        self.entries.clear()
+        self.dependents.clear()
+        self.hits = 0
+        self.misses = 0
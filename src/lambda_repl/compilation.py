@@ -0,0 +1,331 @@
+#!/usr/bin/python3
+
+"""Evaluation of closed terms by compiling their abstractions into Python functions"""
+
+from __future__ import annotations
+from collections import OrderedDict
+from collections.abc import Callable
+from functools import partial
+from types import CodeType
+from typing import Any, Final, TypeAlias
+from weakref import WeakKeyDictionary
+from lambda_calculus.terms import Abstraction, Application, Term, Variable
+from .debruijn import ABSTRACTION, APPLICATION, DeBruijnTerm, to_term
+from .interning import intern_term
+from .limits import Budget
+from .normalisation import EvaluatingVisitor
+
+__all__ = (
+    "CompilationError",
+    "Promise",
+    "Stuck",
+    "Compiler",
+    "CompilingVisitor"
+)
+
+# compiled abstraction
+Function: TypeAlias = Callable[["Promise"], "Value"]
+
+Value: TypeAlias = "Function | Stuck"
+
+# kinds of tasks used by the code generator
+_VALUE: Final = 0
+
+_PROMISE: Final = 1
+
+_CALL: Final = 2
+
+_DEFINE: Final = 3
+
+_UNBIND: Final = 4
+
+# markers used on the stack when reading back values
+_READ: Final = 0
+
+_FORCE: Final = 1
+
+_ABSTRACT: Final = 2
+
+_APPLY: Final = 3
+
+
+class CompilationError(Exception):
+    """Exception raised when a term can not be compiled"""
+
+
+class Promise:
+    """delayed evaluation performed at most once"""
+
+    code: Callable[[], Value] | None
+
+    value: Value | None
+
+    __slots__ = ("code", "value")
+
+    def __init__(self, code: Callable[[], Value] | None, value: Value | None = None) -> None:
+        self.code = code
+        self.value = value
+
+    def force(self) -> Value:
+        """perform the evaluation if it was not already performed"""
+        code = self.code
+        if code is not None:
+            self.value = code()
+            self.code = None
+        return self.value   # type: ignore[return-value]
+
+
+class Stuck:
+    """variable bound while reading back a value applied to arguments"""
+
+    level: int
+
+    arguments: tuple[Promise, ...]
+
+    __slots__ = ("level", "arguments")
+
+    def __init__(self, level: int, arguments: tuple[Promise, ...]) -> None:
+        self.level = level
+        self.arguments = arguments
+
+    def __call__(self, argument: Promise) -> Stuck:
+        return Stuck(self.level, self.arguments + (argument,))
+
+
+def _ignore() -> None:
+    """count no beta reductions"""
+
+
+class Compiler:
+    """
+    Compiler translating closed abstractions into Python functions
+    which evaluate lazily like EvaluatingVisitor
+
+    The functions of the most recently used abstractions are cached
+    and shared by the functions of abstractions containing them.
+    Every beta reduction calls tick, which records it in the budget
+    of the current evaluation.
+    """
+
+    maxsize: int
+
+    # LRU cache of functions, None if the abstraction can not be compiled
+    functions: OrderedDict[Term[str], Function | None]
+
+    # names of the bound variables of generated functions
+    names: WeakKeyDictionary[CodeType, str]
+
+    # globals of the generated functions
+    namespace: dict[str, Any]
+
+    __slots__ = ("maxsize", "functions", "names", "namespace")
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self.functions = OrderedDict()
+        self.names = WeakKeyDictionary()
+        self.namespace = {"Promise": Promise, "tick": _ignore}
+
+    def function(self, abstraction: Abstraction[str]) -> Function:
+        """return the compiled function of a closed abstraction"""
+        abstraction = intern_term(abstraction)  # type: ignore[assignment]
+        try:
+            function = self.functions[abstraction]
+        except KeyError:
+            try:
+                function = self.compile(abstraction)
+            except (SyntaxError, RecursionError, MemoryError):
+                function = None
+            self.functions[abstraction] = function
+            while len(self.functions) > self.maxsize:
+                self.functions.popitem(last=False)
+        else:
+            self.functions.move_to_end(abstraction, last=True)
+        if function is None:
+            raise CompilationError(f"abstraction of {abstraction.bound} is too deeply nested")
+        return function
+
+    def compile(self, abstraction: Abstraction[str]) -> Function:
+        """translate a closed abstraction into a new function"""
+        lines, names, constants = self.generate(abstraction)
+        code = compile("\n".join(lines), "<lambda term>", "exec")
+        # the code of functions is nested in the code of their factory
+        stack = [code]
+        while stack:
+            for constant in stack.pop().co_consts:
+                if isinstance(constant, CodeType):
+                    if constant.co_name.startswith("f"):
+                        self.names[constant] = names[int(constant.co_name[1:])]
+                    stack.append(constant)
+        exec(code, self.namespace)  # pylint: disable=W0122
+        function: Function = self.namespace.pop("make")(*constants)
+        return function
+
+    def generate(self, abstraction: Abstraction[str]) -> tuple[list[str], list[str], list[object]]:
+        """
+        generate the source of a factory receiving constants and returning the function
+        of an abstraction, the names of the bound variables of the functions fn and the constants
+        """
+        names: list[str] = []
+        constants: list[object] = []
+        levels: dict[str, list[int]] = {}
+        depth = 0
+        promises = 0
+        lines: list[str] = []
+        results: list[str] = []
+        stack: list[tuple[Any, ...]] = [(_VALUE, abstraction, lines, "    ")]
+        while stack:
+            task = stack.pop()
+            kind = task[0]
+            if kind == _VALUE or kind == _PROMISE:
+                _, term, block, indent = task
+                if isinstance(term, Variable):
+                    name = f"v{levels[term.name][-1]}"
+                    results.append(f"{name}.force()" if kind == _VALUE else name)
+                elif isinstance(term, Abstraction):
+                    # closed abstractions which are already compiled are shared
+                    function = None
+                    if term is not abstraction:
+                        function = self.functions.get(intern_term(term))
+                    if function is not None:
+                        constants.append(function if kind == _VALUE else Promise(None, function))
+                        results.append(f"c{len(constants) - 1}")
+                        continue
+                    index = len(names)
+                    names.append(term.bound)
+                    body: list[str] = []
+                    stack.append((_DEFINE, index, depth, kind, block, indent, body))
+                    stack.append((_UNBIND, term.bound))
+                    levels.setdefault(term.bound, []).append(depth)
+                    depth += 1
+                    stack.append((_VALUE, term.body, body, indent + "    "))
+                else:
+                    # the arguments are collected starting with the last one
+                    arguments = []
+                    while isinstance(term, Application):
+                        arguments.append(term.argument)
+                        term = term.abstraction
+                    stack.append((_CALL, len(arguments), kind, block, indent))
+                    stack.extend((_PROMISE, argument, block, indent) for argument in arguments)
+                    stack.append((_VALUE, term, block, indent))
+            elif kind == _CALL:
+                _, count, mode, block, indent = task
+                applied = "".join(f"({argument})" for argument in results[-count:])
+                call = results[-count - 1] + applied
+                del results[-count - 1:]
+                if mode == _VALUE:
+                    results.append(call)
+                else:
+                    block.append(f"{indent}def t{promises}():")
+                    block.append(f"{indent}    return {call}")
+                    results.append(f"Promise(t{promises})")
+                    promises += 1
+            elif kind == _DEFINE:
+                _, index, level, mode, block, indent, body = task
+                block.append(f"{indent}def f{index}(v{level}):")
+                block.append(f"{indent}    tick()")
+                block.extend(body)
+                block.append(f"{indent}    return {results.pop()}")
+                results.append(f"f{index}" if mode == _VALUE else f"Promise(None, f{index})")
+            else:
+                levels[task[1]].pop()
+                depth -= 1
+        parameters = ", ".join(f"c{index}" for index in range(len(constants)))
+        return [f"def make({parameters}):", *lines, f"    return {results[0]}"], names, constants
+
+    def evaluate(self, term: Term[str]) -> Value:
+        """evaluate a closed term into its weak head normal form"""
+        arguments = []
+        while isinstance(term, Application):
+            argument = term.argument
+            if isinstance(argument, Abstraction):
+                arguments.append(Promise(None, self.function(argument)))
+            else:
+                arguments.append(Promise(partial(self.evaluate, argument)))
+            term = term.abstraction
+        if not isinstance(term, Abstraction):
+            raise CompilationError(f"variable {term} is free")
+        value: Value = self.function(term)
+        for promise in reversed(arguments):
+            value = value(promise)
+        return value
+
+    def read_back(self, value: Value, budget: Budget | None = None) -> DeBruijnTerm:
+        """convert a value into its beta normal form, checking its size"""
+        output: list[DeBruijnTerm] = []
+        tasks: list[tuple[int, Any, int]] = [(_READ, value, 0)]
+        size = 0
+        while tasks:
+            action, item, depth = tasks.pop()
+            if action == _FORCE:
+                tasks.append((_READ, item.force(), depth))
+            elif action == _READ:
+                if isinstance(item, Stuck):
+                    if budget is not None:
+                        size += 1 + len(item.arguments)
+                        budget.check_size(size)
+                    if item.arguments:
+                        tasks.append((_APPLY, depth - 1 - item.level, len(item.arguments)))
+                        tasks.extend(
+                            (_FORCE, argument, depth) for argument in reversed(item.arguments)
+                        )
+                    else:
+                        output.append(depth - 1 - item.level)
+                else:
+                    if budget is not None:
+                        size += 1
+                        budget.check_size(size)
+                    tasks.append((_ABSTRACT, self.names[item.__code__], depth))
+                    tasks.append((_READ, item(Promise(None, Stuck(depth, ()))), depth + 1))
+            elif action == _ABSTRACT:
+                output[-1] = (ABSTRACTION, item, output[-1])
+            else:
+                # depth is the number of arguments when applying
+                result: DeBruijnTerm = item
+                for argument in output[len(output) - depth:]:
+                    result = (APPLICATION, result, argument)
+                del output[len(output) - depth:]
+                output.append(result)
+        return output[0]
+
+    def normalise(self, term: Term[str], budget: Budget | None = None) -> DeBruijnTerm:
+        """calculate the beta normal form of a closed term, recording reductions in the budget"""
+        self.namespace["tick"] = _ignore if budget is None else budget.step
+        try:
+            return self.read_back(self.evaluate(term), budget)
+        finally:
+            self.namespace["tick"] = _ignore
+
+
+class CompilingVisitor(EvaluatingVisitor):
+    """
+    Visitor which evaluates closed terms like EvaluatingVisitor
+    by calling their abstractions compiled into Python functions
+
+    Other terms, terms which can not be compiled and evaluations
+    exceeding the recursion limit are handled by EvaluatingVisitor.
+    Reading back an abstraction applies it and is counted as a step.
+    """
+
+    expands_references = False
+
+    compiler: Compiler
+
+    __slots__ = ("compiler",)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.compiler = Compiler()
+
+    def skip_intermediate(self, term: Term[str], budget: Budget | None = None) -> Term[str]:
+        """calculate the beta normal form directly, recording beta reductions in the budget"""
+        term = intern_term(term)
+        if term.free_variables():
+            return super().skip_intermediate(term, budget)
+        steps = 0 if budget is None else budget.steps
+        try:
+            return to_term(self.compiler.normalise(term, budget))
+        except (CompilationError, RecursionError):
+            if budget is not None:
+                budget.steps = steps
+        return super().skip_intermediate(term, budget)
@@ -0,0 +1,201 @@
+#!/usr/bin/python3
+
+"""Nameless term representation using de Bruijn indices"""
+
+from __future__ import annotations
+from collections.abc import Sequence
+from itertools import count
+from typing import Final, TypeAlias
+from lambda_calculus.terms import Abstraction, Application, Term, Variable
+
+__all__ = (
+    "ABSTRACTION",
+    "APPLICATION",
+    "DeBruijnTerm",
+    "from_term",
+    "to_term",
+    "alpha_equivalent",
+    "fingerprint"
+)
+
+ABSTRACTION: Final = 0
+
+APPLICATION: Final = 1
+
+# bound variables are represented by their index, free variables by their name,
+# abstractions keep the name of their bound variable as a hint for naming
+DeBruijnTerm: TypeAlias = "int | str | tuple[int, str, DeBruijnTerm] " \
+    "| tuple[int, DeBruijnTerm, DeBruijnTerm]"
+
+FreeVariables: TypeAlias = tuple[int, frozenset[str]]
+
+Fingerprint: TypeAlias = tuple[int | str, ...]
+
+_NO_NAMES: Final[frozenset[str]] = frozenset()
+
+# markers for the end of compound terms during iterative traversals
+_JOIN: Final = object()
+
+_BIND: Final = object()
+
+
+def from_term(term: Term[str], context: Sequence[str] = ()) -> DeBruijnTerm:
+    """convert a term into its nameless representation, context being names bound outside"""
+    levels = {name: [level] for level, name in enumerate(context, -len(context))}
+    depth = 0
+    output: list[DeBruijnTerm] = []
+    stack: list[Term[str] | object] = [term]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, Variable):
+            bound = levels.get(item.name)
+            output.append(depth - 1 - bound[-1] if bound else item.name)
+        elif isinstance(item, Application):
+            stack.append(_JOIN)
+            stack.append(item.argument)
+            stack.append(item.abstraction)
+        elif isinstance(item, Abstraction):
+            levels.setdefault(item.bound, []).append(depth)
+            depth += 1
+            stack.append(item.bound)
+            stack.append(_BIND)
+            stack.append(item.body)
+        elif item is _JOIN:
+            argument = output.pop()
+            output[-1] = (APPLICATION, output[-1], argument)
+        else:
+            name = stack.pop()
+            assert isinstance(name, str)
+            levels[name].pop()
+            depth -= 1
+            output[-1] = (ABSTRACTION, name, output[-1])
+    return output[0]
+
+
+def _free_variables(term: DeBruijnTerm, cache: dict[int, FreeVariables]) -> FreeVariables:
+    """return the free indices as bitmask and the free names of a term"""
+    if isinstance(term, int):
+        return 1 << term, _NO_NAMES
+    elif isinstance(term, str):
+        return 0, frozenset((term,))
+    return cache[id(term)]
+
+
+def _collect_free_variables(term: DeBruijnTerm) -> dict[int, FreeVariables]:
+    """calculate the free variables of every compound subterm"""
+    cache: dict[int, FreeVariables] = {}
+    stack: list[tuple[DeBruijnTerm, bool]] = [(term, False)]
+    while stack:
+        item, visited = stack.pop()
+        if isinstance(item, (int, str)) or (not visited and id(item) in cache):
+            continue
+        elif not visited:
+            stack.append((item, True))
+            stack.extend((child, False) for child in item[1:] if not isinstance(child, str))
+        elif item[0] == ABSTRACTION:
+            mask, names = _free_variables(item[2], cache)
+            cache[id(item)] = (mask >> 1, names)
+        else:
+            mask1, names1 = _free_variables(item[1], cache)
+            mask2, names2 = _free_variables(item[2], cache)
+            if names2 <= names1:
+                names = names1
+            elif names1 <= names2:
+                names = names2
+            else:
+                names = names1 | names2
+            cache[id(item)] = (mask1 | mask2, names)
+    return cache
+
+
+def to_term(term: DeBruijnTerm) -> Term[str]:
+    """convert a nameless term into a term, renaming bound variables only when necessary"""
+    cache = _collect_free_variables(term)
+    names: list[str] = []
+    output: list[Term[str]] = []
+    stack: list[DeBruijnTerm | object] = [term]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, int):
+            output.append(Variable(names[-1 - item]))
+        elif isinstance(item, str):
+            output.append(Variable(item))
+        elif item is _JOIN:
+            argument = output.pop()
+            output[-1] = Application(output[-1], argument)
+        elif item is _BIND:
+            output[-1] = Abstraction(names.pop(), output[-1])
+        elif isinstance(item, tuple) and item[0] == APPLICATION:
+            stack.append(_JOIN)
+            stack.append(item[2])
+            stack.append(item[1])
+        elif isinstance(item, tuple):
+            names.append(_choose_name(item[1], names, *_free_variables(item[2], cache)))
+            stack.append(_BIND)
+            stack.append(item[2])
+    return output[0]
+
+
+def _choose_name(hint: str, names: list[str], mask: int, free: frozenset[str]) -> str:
+    """choose a name for a bound variable which does not capture variables used by the body"""
+    mask >>= 1
+    if not mask and hint not in free:
+        return hint
+    used = set(free)
+    while mask:
+        lowest = mask & -mask
+        used.add(names[-lowest.bit_length()])
+        mask ^= lowest
+    if hint not in used:
+        return hint
+    return next(n for n in map(lambda i: f"{hint}{i}", count(1)) if n not in used)
+
+
+def alpha_equivalent(first: DeBruijnTerm, second: DeBruijnTerm) -> bool:
+    """check if two nameless terms only differ in the names of their bound variables"""
+    stack = [(first, second)]
+    while stack:
+        a, b = stack.pop()
+        if a is b:
+            continue
+        elif isinstance(a, tuple) and isinstance(b, tuple):
+            if a[0] != b[0]:
+                return False
+            elif a[0] == ABSTRACTION:
+                stack.append((a[2], b[2]))
+            else:
+                stack.append((a[2], b[2]))
+                stack.append((a[1], b[1]))
+        elif isinstance(a, tuple) or isinstance(b, tuple) or type(a) is not type(b) or a != b:
+            return False
+    return True
+
+
+def fingerprint(term: Term[str]) -> Fingerprint:
+    """create a flat key which is equal for alpha equivalent terms"""
+    levels: dict[str, list[int]] = {}
+    depth = 0
+    output: list[int | str] = []
+    stack: list[Term[str] | str | None] = [term]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, Variable):
+            bound = levels.get(item.name)
+            output.append(depth - 1 - bound[-1] if bound else item.name)
+        elif isinstance(item, Application):
+            # abstractions and applications are encoded as negative numbers in prefix order
+            output.append(-2)
+            stack.append(item.argument)
+            stack.append(item.abstraction)
+        elif isinstance(item, Abstraction):
+            output.append(-1)
+            levels.setdefault(item.bound, []).append(depth)
+            depth += 1
+            stack.append(item.bound)
+            stack.append(None)
+            stack.append(item.body)
+        elif item is None:
+            name = stack.pop()
+            levels[name].pop()     # type: ignore[index]
+            depth -= 1
+    return tuple(output)
@@ -0,0 +1,270 @@
+#!/usr/bin/python3
+
+"""Term graphs reduced in place with shared nodes"""
+
+from __future__ import annotations
+from collections.abc import Iterator
+from typing import Any, Final
+from lambda_calculus.terms import Abstraction, Application, Term, Variable
+from . import debruijn
+from .debruijn import DeBruijnTerm, to_term
+from .limits import Budget
+from .normalisation import TracingVisitor
+
+__all__ = (
+    "VARIABLE",
+    "PARAMETER",
+    "ABSTRACTION",
+    "APPLICATION",
+    "INDIRECTION",
+    "Node",
+    "follow",
+    "to_graph",
+    "read_back",
+    "instantiate",
+    "reduce",
+    "normalise",
+    "GraphReducingVisitor"
+)
+
+# kinds of nodes
+VARIABLE: Final = 0
+
+PARAMETER: Final = 1
+
+ABSTRACTION: Final = 2
+
+APPLICATION: Final = 3
+
+INDIRECTION: Final = 4
+
+_NO_PARAMETERS: Final[frozenset[Node]] = frozenset()
+
+# markers for the end of compound terms during iterative traversals
+_JOIN: Final = object()
+
+_BIND: Final = object()
+
+
+class Node:
+    """
+    mutable node of a term graph
+
+    Variables store their name, parameters the name of their abstraction,
+    abstractions their parameter and body, applications their abstraction
+    and argument and indirections the node they were reduced to.
+    """
+
+    kind: int
+
+    first: Any
+
+    second: Any
+
+    # superset of the parameters occurring in the node
+    parameters: frozenset[Node]
+
+    __slots__ = ("kind", "first", "second", "parameters")
+
+    def __init__(self, kind: int, first: Any, second: Any = None) -> None:
+        self.kind = kind
+        self.first = first
+        self.second = second
+        if kind == PARAMETER:
+            self.parameters = frozenset((self,))
+        elif kind == ABSTRACTION:
+            self.parameters = second.parameters - {first}
+        elif kind == APPLICATION:
+            if not second.parameters:
+                self.parameters = first.parameters
+            elif not first.parameters:
+                self.parameters = second.parameters
+            else:
+                self.parameters = first.parameters | second.parameters
+        else:
+            self.parameters = _NO_PARAMETERS
+
+
+def follow(node: Node) -> Node:
+    """skip indirections left by reduced nodes, shortening them"""
+    target = node
+    while target.kind == INDIRECTION:
+        target = target.first
+    while node is not target:
+        node.first, node = target, node.first
+    return target
+
+
+def to_graph(term: Term[str]) -> Node:
+    """convert a term into a graph whose variables point to their parameter"""
+    parameters: dict[str, list[Node]] = {}
+    output: list[Node] = []
+    stack: list[Term[str] | Node | object] = [term]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, Variable):
+            bound = parameters.get(item.name)
+            output.append(bound[-1] if bound else Node(VARIABLE, item.name))
+        elif isinstance(item, Application):
+            stack.append(_JOIN)
+            stack.append(item.argument)
+            stack.append(item.abstraction)
+        elif isinstance(item, Abstraction):
+            parameter = Node(PARAMETER, item.bound)
+            parameters.setdefault(item.bound, []).append(parameter)
+            stack.append(parameter)
+            stack.append(_BIND)
+            stack.append(item.body)
+        elif item is _JOIN:
+            argument = output.pop()
+            output[-1] = Node(APPLICATION, output[-1], argument)
+        else:
+            parameter = stack.pop()     # type: ignore[assignment]
+            parameters[parameter.first].pop()
+            output[-1] = Node(ABSTRACTION, parameter, output[-1])
+    return output[0]
+
+
+def read_back(root: Node) -> DeBruijnTerm:
+    """convert a graph into a nameless term, unsharing shared nodes"""
+    levels: dict[Node, list[int]] = {}
+    depth = 0
+    output: list[DeBruijnTerm] = []
+    stack: list[Node | object] = [root]
+    while stack:
+        item = stack.pop()
+        if item is _JOIN:
+            argument = output.pop()
+            output[-1] = (debruijn.APPLICATION, output[-1], argument)
+        elif item is _BIND:
+            parameter = stack.pop()
+            assert isinstance(parameter, Node)
+            levels[parameter].pop()
+            depth -= 1
+            output[-1] = (debruijn.ABSTRACTION, parameter.first, output[-1])
+        else:
+            assert isinstance(item, Node)
+            node = follow(item)
+            if node.kind == VARIABLE:
+                output.append(node.first)
+            elif node.kind == PARAMETER:
+                output.append(depth - 1 - levels[node][-1])
+            elif node.kind == ABSTRACTION:
+                levels.setdefault(node.first, []).append(depth)
+                depth += 1
+                stack.append(node.first)
+                stack.append(_BIND)
+                stack.append(node.second)
+            else:
+                stack.append(_JOIN)
+                stack.append(node.second)
+                stack.append(node.first)
+    return output[0]
+
+
+def instantiate(abstraction: Node, argument: Node) -> Node:
+    """
+    copy the body of an abstraction, replacing its parameter with a shared argument
+
+    Only nodes containing the parameter are copied, other nodes
+    are shared between the abstraction and the copy.
+    """
+    # copied abstractions receive fresh parameters to prevent capturing them
+    replacements = {abstraction.first: argument}
+    # map nodes to their copies or themselves if they do not contain replaced parameters
+    copies: dict[Node, Node] = {}
+    body = follow(abstraction.second)
+    stack = [(body, False)]
+    while stack:
+        node, ready = stack.pop()
+        if ready:
+            second = copies[node.second]
+            if node.kind == APPLICATION:
+                first = copies[node.first]
+                if first is node.first and second is node.second:
+                    copies[node] = node
+                else:
+                    copies[node] = Node(APPLICATION, first, second)
+            elif second is node.second:
+                copies[node] = node
+            else:
+                copies[node] = Node(ABSTRACTION, replacements[node.first], second)
+        elif node in copies:
+            continue
+        elif all(parameter not in node.parameters for parameter in replacements):
+            copies[node] = node
+        elif node.kind == PARAMETER:
+            copies[node] = replacements[node]
+        else:
+            # children are replaced by the targets of their indirections
+            node.second = follow(node.second)
+            stack.append((node, True))
+            stack.append((node.second, False))
+            if node.kind == APPLICATION:
+                node.first = follow(node.first)
+                stack.append((node.first, False))
+            else:
+                replacements[node.first] = Node(PARAMETER, node.first.first)
+    return copies[body]
+
+
+def reduce(root: Node) -> Iterator[None]:
+    """reduce a graph to its weak head normal form in place, yielding after every beta reduction"""
+    while True:
+        redex = None
+        node = follow(root)
+        while node.kind == APPLICATION:
+            redex = node
+            node = follow(node.first)
+        if redex is None or node.kind != ABSTRACTION:
+            return
+        # update the redex in place to share the result with all of its users
+        result = instantiate(node, follow(redex.second))
+        redex.kind = INDIRECTION
+        redex.first = follow(result)
+        redex.second = None
+        yield None
+
+
+def normalise(root: Node) -> Iterator[None]:
+    """reduce a graph to its beta normal form in place, yielding after every beta reduction"""
+    normalised: set[Node] = set()
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        yield from reduce(node)
+        node = follow(node)
+        if node in normalised:
+            continue
+        # shared nodes including the bodies of shared abstractions are normalised once
+        normalised.add(node)
+        if node.kind == ABSTRACTION:
+            stack.append(node.second)
+        else:
+            while node.kind == APPLICATION:
+                stack.append(node.second)
+                node = follow(node.first)
+
+
+class GraphReducingVisitor(TracingVisitor):
+    """
+    Visitor which calculates beta normal forms by reducing a graph
+    which shares arguments and the parts of abstraction bodies
+    not depending on their parameter
+
+    Abstractions are normalised in place, which shares the
+    reductions of their bodies between all of their users.
+    Intermediate steps are not available and delegated to a BetaNormalisingVisitor.
+    """
+
+    records_alpha = False
+
+    __slots__ = ()
+
+    def skip_intermediate(self, term: Term[str], budget: Budget | None = None) -> Term[str]:
+        """calculate the beta normal form directly, recording beta reductions in the budget"""
+        root = to_graph(term)
+        for _ in normalise(root):
+            if budget is not None:
+                budget.step()
+        return to_term(read_back(root))
@@ -0,0 +1,282 @@
+#!/usr/bin/python3
+
+"""Hash-consed terms sharing identical subterms"""
+
+from __future__ import annotations
+from collections.abc import Set
+from threading import Lock
+from typing import Any, TypeVar
+from weakref import WeakValueDictionary
+from lambda_calculus.terms import Abstraction, Application, Term, Variable
+
+__all__ = (
+    "InternedVariable",
+    "InternedAbstraction",
+    "InternedApplication",
+    "variable",
+    "abstraction",
+    "application",
+    "intern_term",
+    "is_interned",
+    "size"
+)
+
+V = TypeVar("V")
+
+# interned terms are only kept alive by their users
+_VARIABLES: WeakValueDictionary[Any, InternedVariable[Any]] = WeakValueDictionary()
+
+_ABSTRACTIONS: WeakValueDictionary[
+    tuple[Any, Term[Any]],
+    InternedAbstraction[Any]
+] = WeakValueDictionary()
+
+_APPLICATIONS: WeakValueDictionary[
+    tuple[Term[Any], Term[Any]],
+    InternedApplication[Any]
+] = WeakValueDictionary()
+
+# protects inserting terms, which would otherwise be created twice by concurrent threads
+_LOCK = Lock()
+
+T = TypeVar("T")
+
+
+def _equal(first: Term[V], second: object) -> bool:
+    """compare terms structurally without recursion"""
+    stack: list[tuple[Term[V], object]] = [(first, second)]
+    while stack:
+        a, b = stack.pop()
+        if a is b:
+            continue
+        if is_interned(a) and is_interned(b):
+            # equal interned terms are identical
+            return False
+        if isinstance(a, Variable) and isinstance(b, Variable):
+            if a.name != b.name:
+                return False
+            if type(a) not in _VARIABLES_TYPES or type(b) not in _VARIABLES_TYPES:
+                # subclasses of Variable carrying additional information
+                if type(a) is not type(b) or a != b:
+                    return False
+        elif isinstance(a, Abstraction) and isinstance(b, Abstraction):
+            if a.bound != b.bound:
+                return False
+            stack.append((a.body, b.body))
+        elif isinstance(a, Application) and isinstance(b, Application):
+            stack.append((a.argument, b.argument))
+            stack.append((a.abstraction, b.abstraction))
+        else:
+            return False
+    return True
+
+
+class InternedVariable(Variable[V]):
+    """Variable which is shared by all equal terms"""
+
+    cached_hash: int
+
+    size: int
+
+    # shared with children having the same free variables
+    free: frozenset[V]
+
+    __slots__ = ("cached_hash", "size", "free")
+
+    def __hash__(self) -> int:
+        return self.cached_hash
+
+    def __eq__(self, other: object) -> bool:
+        return _equal(self, other)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return variable, (self.name,)
+
+    def free_variables(self) -> Set[V]:
+        """return the cached free variables"""
+        return self.free
+
+
+class InternedAbstraction(Abstraction[V]):
+    """Abstraction which is shared by all equal terms"""
+
+    cached_hash: int
+
+    size: int
+
+    # shared with children having the same free variables
+    free: frozenset[V]
+
+    __slots__ = ("cached_hash", "size", "free")
+
+    def __hash__(self) -> int:
+        return self.cached_hash
+
+    def __eq__(self, other: object) -> bool:
+        return _equal(self, other)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return abstraction, (self.bound, self.body)
+
+    def free_variables(self) -> Set[V]:
+        """return the cached free variables"""
+        return self.free
+
+
+class InternedApplication(Application[V]):
+    """Application which is shared by all equal terms"""
+
+    cached_hash: int
+
+    size: int
+
+    # shared with children having the same free variables
+    free: frozenset[V]
+
+    __slots__ = ("cached_hash", "size", "free")
+
+    def __hash__(self) -> int:
+        return self.cached_hash
+
+    def __eq__(self, other: object) -> bool:
+        return _equal(self, other)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return application, (self.abstraction, self.argument)
+
+    def free_variables(self) -> Set[V]:
+        """return the cached free variables"""
+        return self.free
+
+
+_INTERNED = (InternedVariable, InternedAbstraction, InternedApplication)
+
+_VARIABLES_TYPES = (Variable, InternedVariable)
+
+
+def is_interned(term: object) -> bool:
+    """check if a term is hash-consed"""
+    return isinstance(term, _INTERNED)
+
+
+def _free_variables(term: Term[V]) -> frozenset[V]:
+    """return the free variables of an interned term or variable"""
+    if is_interned(term):
+        free: frozenset[V] = term.free     # type: ignore[attr-defined]
+        return free
+    return frozenset(term.free_variables())
+
+
+def _insert(table: WeakValueDictionary[Any, T], key: Any, term: T) -> T:
+    """insert a new term or return the term inserted for the same key by another thread"""
+    with _LOCK:
+        existing = table.get(key)
+        if existing is None:
+            table[key] = term
+            return term
+        return existing
+
+
+def variable(name: V) -> InternedVariable[V]:
+    """create a shared variable"""
+    term = _VARIABLES.get(name)
+    if term is None:
+        term = InternedVariable(name)
+        # same hash as an equal Variable
+        term.cached_hash = hash((name,))
+        term.size = 1
+        term.free = frozenset((name,))
+        term = _insert(_VARIABLES, name, term)
+    return term
+
+
+def abstraction(bound: V, body: Term[V]) -> InternedAbstraction[V]:
+    """create a shared abstraction"""
+    key = (bound, intern_term(body))
+    term = _ABSTRACTIONS.get(key)
+    if term is None:
+        term = InternedAbstraction(*key)
+        term.cached_hash = hash(key)
+        term.size = 1 + size(key[1])
+        free = _free_variables(key[1])
+        term.free = free - {bound} if bound in free else free
+        term = _insert(_ABSTRACTIONS, key, term)
+    return term
+
+
+# pylint: disable-next=W0621
+def application(abstraction: Term[V], argument: Term[V]) -> InternedApplication[V]:
+    """create a shared application"""
+    key = (intern_term(abstraction), intern_term(argument))
+    term = _APPLICATIONS.get(key)
+    if term is None:
+        term = InternedApplication(*key)
+        term.cached_hash = hash(key)
+        term.size = 1 + size(key[0]) + size(key[1])
+        first = _free_variables(key[0])
+        second = _free_variables(key[1])
+        if second <= first:
+            term.free = first
+        elif first <= second:
+            term.free = second
+        else:
+            term.free = first | second
+        term = _insert(_APPLICATIONS, key, term)
+    return term
+
+
+def intern_term(term: Term[V]) -> Term[V]:
+    """return the shared instance of a term"""
+    if is_interned(term) or isinstance(term, Variable) and type(term) is not Variable:
+        return term
+    output: list[Term[V]] = []
+    stack: list[Term[V] | None] = [term]
+    while stack:
+        item = stack.pop()
+        if item is None:
+            # the children of the previous compound term are interned
+            parent = stack.pop()
+            if isinstance(parent, Abstraction):
+                output[-1] = abstraction(parent.bound, output[-1])
+            else:
+                argument = output.pop()
+                output[-1] = application(output[-1], argument)
+        elif is_interned(item):
+            output.append(item)
+        elif type(item) is Variable:
+            output.append(variable(item.name))
+        elif isinstance(item, Variable):
+            # keep subclasses carrying additional information
+            output.append(item)
+        elif isinstance(item, Abstraction):
+            stack.append(item)
+            stack.append(None)
+            stack.append(item.body)
+        elif isinstance(item, Application):
+            stack.append(item)
+            stack.append(None)
+            stack.append(item.argument)
+            stack.append(item.abstraction)
+        else:
+            raise TypeError(f"unknown term: {item!r}")
+    return output[0]
+
+
+def size(term: Term[V]) -> int:
+    """calculate the number of nodes of a term, using cached sizes if possible"""
+    result = 0
+    stack = [term]
+    while stack:
+        item = stack.pop()
+        if is_interned(item):
+            result += item.size     # type: ignore[attr-defined]
+        elif isinstance(item, Application):
+            result += 1
+            stack.append(item.argument)
+            stack.append(item.abstraction)
+        elif isinstance(item, Abstraction):
+            result += 1
+            stack.append(item.body)
+        else:
+            result += 1
+    return result
@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+
+"""Limits for evaluating terms"""
+
+from __future__ import annotations
+from collections.abc import Callable
+from dataclasses import dataclass
+from time import monotonic
+from typing import TypeVar
+from lambda_calculus.terms import Term
+from .interning import size
+
+__all__ = (
+    "LimitExceeded",
+    "Limits",
+    "Budget",
+    "parse_limit"
+)
+
+N = TypeVar("N", int, float)
+
+
+def parse_limit(value: str, convert: Callable[[str], N]) -> N | None:
+    """parse a positive limit or 'none'"""
+    if value.lower() == "none":
+        return None
+    limit = convert(value)
+    if limit <= 0:
+        raise ValueError(f"limit {value} is not positive")
+    return limit
+
+
+class LimitExceeded(Exception):
+    """Exception raised when a limit is reached during evaluation"""
+
+    budget: Budget
+
+    def __init__(self, message: str, budget: Budget) -> None:
+        super().__init__(message)
+        self.budget = budget
+
+
+@dataclass
+class Limits:
+    """limits for evaluating terms, None meaning no limit"""
+
+    steps: int | None = None
+
+    timeout: float | None = None
+
+    size: int | None = None
+
+    def start(self, term: Term[str]) -> Budget:
+        """start tracking the evaluation of a term"""
+        return Budget(self, term)
+
+
+class Budget:
+    """resources used by an evaluation"""
+
+    limits: Limits
+
+    term: Term[str]
+
+    steps: int
+
+    deadline: float | None
+
+    __slots__ = ("limits", "term", "steps", "deadline")
+
+    def __init__(self, limits: Limits, term: Term[str]) -> None:
+        self.limits = limits
+        self.term = term
+        self.steps = 0
+        self.deadline = None if limits.timeout is None else monotonic() + limits.timeout
+
+    def step(self, term: Term[str] | None = None) -> None:
+        """record a step resulting in a term if it is known"""
+        if self.limits.steps is not None and self.steps >= self.limits.steps:
+            raise LimitExceeded(f"step limit of {self.limits.steps} reached", self)
+        self.steps += 1
+        if term is not None:
+            self.term = term
+            if self.limits.size is not None:
+                self.check_size(size(term))
+        if self.deadline is not None and monotonic() > self.deadline:
+            raise LimitExceeded(f"timeout of {self.limits.timeout} seconds reached", self)
+
+    def check_size(self, size: int) -> None:
+        """check the size of a term produced by the evaluation"""
+        if self.limits.size is not None and size > self.limits.size:
+            raise LimitExceeded(f"size limit of {self.limits.size} nodes reached", self)
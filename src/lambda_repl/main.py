@@ -2,19 +2,72 @@
 
 """CLI entry point utilities"""
 
-from argparse import ArgumentParser, Namespace, FileType
+import asyncio
+import sys
+from argparse import ArgumentParser, ArgumentTypeError, Namespace, FileType
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any
 from lambda_calculus.visitors.normalisation import BetaNormalisingVisitor
 from lambda_calculus.visitors.substitution.renaming import CountingSubstitution
 from . import LambdaREPL, __doc__ as description, __version__
-from .aliases import LetAliases
+from .aliases import Aliases, LazyAliases, LetAliases
+from .limits import Limits, parse_limit
+from .compilation import CompilingVisitor
+from .graph import GraphReducingVisitor
+from .normalisation import Normaliser, EvaluatingVisitor
+from .parallel import ParallelExecutor
 from .parsing import LambdaTransformer
+from .printing import FORMATTERS
+from .server import TIMEOUT, LambdaServer
+from .strategies import STRATEGIES
+from .zipper import ZipperNormalisingVisitor
 
 __all__ = (
+    "ENGINES",
+    "ALIASES",
     "ARGUMENT_PARSER",
+    "limit",
+    "positive",
+    "create_repl",
+    "serve",
     "main",
     "main_cli"
 )
 
+ENGINES: dict[str, Callable[[], Normaliser]] = {
+    "visitor": BetaNormalisingVisitor,
+    "zipper": ZipperNormalisingVisitor,
+    "fast": EvaluatingVisitor,
+    "graph": GraphReducingVisitor,
+    "compiled": CompilingVisitor
+}
+
+ALIASES: dict[str, Callable[[Any], Aliases[str]]] = {
+    "let": LetAliases,
+    "lazy": LazyAliases
+}
+
+
+def limit(convert: Callable[[str], Any]) -> Callable[[str], Any]:
+    """create an argument type accepting the same limits as the set command"""
+    def parse(value: str) -> Any:
+        try:
+            return parse_limit(value, convert)
+        except ValueError as error:
+            raise ArgumentTypeError(str(error)) from None
+    return parse
+
+
+def positive(value: str) -> int:
+    """argument type accepting the same positive integers as the set command"""
+    number = int(value)
+    if number <= 0:
+        raise ArgumentTypeError(f"{value} is not positive")
+    return number
+
+
 ARGUMENT_PARSER = ArgumentParser(description=description)
 ARGUMENT_PARSER.add_argument(
     "-v",
@@ -29,20 +82,208 @@ ARGUMENT_PARSER.add_argument(
     action="append",
     help="add file which should be executed in the REPL"
 )
+ARGUMENT_PARSER.add_argument(
+    "--snapshot",
+    help="load aliases from a snapshot file created with the save command"
+)
+ARGUMENT_PARSER.add_argument(
+    "-b",
+    "--batch",
+    type=FileType("r"),
+    nargs="*",
+    metavar="FILE",
+    help="execute files or stdin without prompting and exit, failing if errors occurred"
+)
+ARGUMENT_PARSER.add_argument(
+    "-j",
+    "--jobs",
+    type=int,
+    default=1,
+    help="number of processes evaluating consecutive evaluate commands in batch mode "
+    "or the terms of all connections"
+)
+ARGUMENT_PARSER.add_argument(
+    "--listen",
+    metavar="[HOST:]PORT",
+    help="serve a REPL to every TCP connection on HOST or 127.0.0.1, "
+    "files given with --file define their aliases"
+)
+ARGUMENT_PARSER.add_argument(
+    "--unix-socket",
+    metavar="PATH",
+    help="serve a REPL to every connection to a unix socket like --listen"
+)
+ARGUMENT_PARSER.add_argument(
+    "-e",
+    "--engine",
+    choices=ENGINES.keys(),
+    default="visitor",
+    help="engine used for evaluating terms"
+)
+ARGUMENT_PARSER.add_argument(
+    "-s",
+    "--strategy",
+    choices=STRATEGIES.keys(),
+    default="normal",
+    help="reduction strategy, the engine is used for normal order"
+)
+ARGUMENT_PARSER.add_argument(
+    "--aliases",
+    choices=ALIASES.keys(),
+    default="let",
+    help="alias implementation, lazy keeps references to other aliases"
+)
+ARGUMENT_PARSER.add_argument(
+    "--numerals",
+    action="store_true",
+    help="parse numeric literals as church numerals and display church numerals as numbers"
+)
+ARGUMENT_PARSER.add_argument(
+    "--arithmetic",
+    action="store_true",
+    help="calculate arithmetic on church numerals with integers before evaluating terms"
+)
+ARGUMENT_PARSER.add_argument(
+    "-o",
+    "--output",
+    choices=FORMATTERS.keys(),
+    default="full",
+    help="format of displayed terms"
+)
+ARGUMENT_PARSER.add_argument(
+    "--width",
+    type=limit(int),
+    help="maximum number of characters of displayed terms before they are summarised"
+)
+ARGUMENT_PARSER.add_argument(
+    "--trace",
+    choices=("full", "redex", "counts"),
+    default="full",
+    help="what trace displays for steps"
+)
+ARGUMENT_PARSER.add_argument(
+    "--interval",
+    type=positive,
+    default=1,
+    help="number of steps between steps displayed by trace"
+)
+ARGUMENT_PARSER.add_argument(
+    "--trace-file",
+    help="file which trace appends to instead of displaying steps"
+)
+ARGUMENT_PARSER.add_argument(
+    "--stats",
+    action="store_true",
+    help="display statistics about evaluate and trace commands"
+)
+ARGUMENT_PARSER.add_argument(
+    "--stats-file",
+    help="file which statistics are appended to as JSON lines, implies --stats"
+)
+ARGUMENT_PARSER.add_argument(
+    "--max-steps",
+    type=limit(int),
+    help="maximum number of steps performed by an evaluation"
+)
+ARGUMENT_PARSER.add_argument(
+    "--timeout",
+    type=limit(float),
+    help=f"maximum number of seconds used by an evaluation, defaults to {TIMEOUT} for connections"
+)
+ARGUMENT_PARSER.add_argument(
+    "--max-size",
+    type=limit(int),
+    help="maximum number of nodes of terms produced by an evaluation"
+)
+ARGUMENT_PARSER.add_argument(
+    "--cache-size",
+    type=int,
+    default=128,
+    help="maximum number of cached normal forms, 0 disables caching"
+)
 
 
-def main(args: Namespace) -> int:
-    """Entry point for the REPL"""
+def create_repl(args: Namespace, aliases: Aliases[str]) -> LambdaREPL:
+    """create a REPL configured by the arguments"""
+    stats = args.stats or args.stats_file is not None
     repl = LambdaREPL(
-        LetAliases(CountingSubstitution),
-        LambdaTransformer(),
-        BetaNormalisingVisitor()
+        aliases,
+        LambdaTransformer(args.numerals),
+        ENGINES[args.engine]()
     )
+    repl.strategies["normal"] = ENGINES[args.engine]
+    repl.set_strategy(args.strategy)
+    repl.limits = Limits(args.max_steps, args.timeout, args.max_size)
+    repl.session.arithmetic = args.arithmetic
+    repl.output = args.output
+    repl.width = args.width
+    repl.trace_mode = args.trace
+    repl.trace_interval = args.interval
+    repl.trace_file = args.trace_file
+    repl.stats = stats
+    repl.stats_file = args.stats_file
+    repl.cache.resize(args.cache_size)
+    return repl
+
+
+async def serve(args: Namespace, prelude: Aliases[str]) -> None:
+    """serve REPLs sharing the prelude until cancelled"""
+    with ProcessPoolExecutor(args.jobs) as executor:
+        server = LambdaServer(
+            prelude,
+            partial(create_repl, args),
+            executor,
+            Limits(args.max_steps, TIMEOUT if args.timeout is None else args.timeout, args.max_size)
+        )
+        if args.listen is not None:
+            host, _, port = args.listen.rpartition(":")
+            socket = await server.start_tcp(host or "127.0.0.1", int(port))
+        else:
+            socket = await server.start_unix(args.unix_socket)
+        async with socket:
+            await socket.serve_forever()
+
+
+def main(args: Namespace) -> int:
+    """Entry point for the REPL"""
+    repl = create_repl(args, ALIASES[args.aliases](CountingSubstitution))
+    if args.snapshot is not None:
+        repl.do_load(args.snapshot)
+    if args.listen is not None or args.unix_socket is not None:
+        # files define the prelude of all connections
+        for file in args.file or ():
+            if repl.execute(file):
+                break
+        try:
+            asyncio.run(serve(args, repl.aliases))
+        except KeyboardInterrupt:
+            pass
+        return 1 if repl.errors else 0
+    if args.batch is not None:
+        files = (args.file or []) + (args.batch or [sys.stdin])
+        if args.jobs > 1:
+            with ProcessPoolExecutor(args.jobs) as executor:
+                execute = ParallelExecutor(repl, executor).execute
+                for file in files:
+                    if execute(file):
+                        break
+        else:
+            for file in files:
+                if repl.execute(file):
+                    break
+        return 1 if repl.errors else 0
     for file in args.file or ():
         for line in file:
             repl.cmdqueue.append(line)
-    repl.cmdloop()
-    return 0
+    while True:
+        try:
+            repl.cmdloop()
+        except KeyboardInterrupt:
+            # only stop the current input, not the whole REPL
+            repl.stdout.write("\n")
+            repl.intro = None
+        else:
+            return 0
 
 
 def main_cli() -> int:
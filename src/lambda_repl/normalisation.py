@@ -0,0 +1,316 @@
+#!/usr/bin/python3
+
+"""Normalisation engines"""
+
+from __future__ import annotations
+from collections.abc import Iterator, Mapping
+from typing import ClassVar, Final, TypeAlias, cast
+from weakref import WeakKeyDictionary
+from lambda_calculus.terms import Abstraction, Application, Term, Variable
+from lambda_calculus.visitors import Visitor
+from lambda_calculus.visitors.normalisation import BetaNormalisingVisitor, Conversion
+from .aliases import Definition, Reference, references
+from .debruijn import ABSTRACTION, APPLICATION, DeBruijnTerm, from_term, to_term
+from .limits import Budget
+
+__all__ = (
+    "Step",
+    "Normaliser",
+    "NormalisingVisitor",
+    "TracingVisitor",
+    "skip_intermediate",
+    "Closure",
+    "Neutral",
+    "Thunk",
+    "EvaluatingVisitor"
+)
+
+Step: TypeAlias = tuple[Conversion, Term[str]]
+
+Environment: TypeAlias = "tuple[Thunk, Environment] | None"
+
+
+class NormalisingVisitor(Visitor[Iterator[Step], str]):
+    """ABC for visitors which transform a term into its beta normal form"""
+
+    # if references to aliases do not have to be expanded before normalisation
+    expands_references: ClassVar[bool] = False
+
+    # if skip_intermediate records alpha conversions in the budget besides beta reductions
+    records_alpha: ClassVar[bool] = True
+
+    __slots__ = ()
+
+    def skip_intermediate(self, term: Term[str], budget: Budget | None = None) -> Term[str]:
+        """calculate the beta normal form directly, recording steps in the budget"""
+        return _last_step(term, term.accept(self), budget)
+
+
+class TracingVisitor(NormalisingVisitor):
+    """ABC for visitors delegating intermediate steps to a BetaNormalisingVisitor"""
+
+    tracer: BetaNormalisingVisitor
+
+    __slots__ = ("tracer",)
+
+    def __init__(self) -> None:
+        self.tracer = BetaNormalisingVisitor()
+
+    def visit_variable(self, variable: Variable[str]) -> Iterator[Step]:
+        """delegate tracing a variable"""
+        return self.tracer.visit_variable(variable)
+
+    def visit_abstraction(self, abstraction: Abstraction[str]) -> Iterator[Step]:
+        """delegate tracing an abstraction"""
+        return self.tracer.visit_abstraction(abstraction)
+
+    def visit_application(self, application: Application[str]) -> Iterator[Step]:
+        """delegate tracing an application"""
+        return self.tracer.visit_application(application)
+
+
+Normaliser: TypeAlias = BetaNormalisingVisitor | NormalisingVisitor
+
+
+def _last_step(term: Term[str], steps: Iterator[Step], budget: Budget | None) -> Term[str]:
+    """consume steps and return the last term"""
+    result = term
+    for _, result in steps:
+        if budget is not None:
+            budget.step(result)
+    return result
+
+
+def skip_intermediate(visitor: Normaliser, term: Term[str],
+                      budget: Budget | None = None) -> Term[str]:
+    """calculate the beta normal form directly with any normaliser"""
+    if isinstance(visitor, NormalisingVisitor):
+        return visitor.skip_intermediate(term, budget)
+    return _last_step(term, term.accept(visitor), budget)
+
+
+class Closure:
+    """abstraction together with the environment it was evaluated in"""
+
+    name: str
+
+    body: DeBruijnTerm
+
+    environment: Environment
+
+    __slots__ = ("name", "body", "environment")
+
+    def __init__(self, name: str, body: DeBruijnTerm, environment: Environment) -> None:
+        self.name = name
+        self.body = body
+        self.environment = environment
+
+
+class Neutral:
+    """variable which can not be reduced applied to arguments"""
+
+    head: int | str
+
+    arguments: tuple[Thunk, ...]
+
+    __slots__ = ("head", "arguments")
+
+    def __init__(self, head: int | str, arguments: tuple[Thunk, ...]) -> None:
+        self.head = head
+        self.arguments = arguments
+
+
+Value: TypeAlias = Closure | Neutral
+
+
+class Thunk:
+    """delayed evaluation of a term which is performed at most once"""
+
+    term: DeBruijnTerm
+
+    environment: Environment
+
+    value: Value | None
+
+    __slots__ = ("term", "environment", "value")
+
+    def __init__(self, term: DeBruijnTerm, environment: Environment) -> None:
+        self.term = term
+        self.environment = environment
+        self.value = None
+
+    @classmethod
+    def evaluated(cls, value: Value) -> Thunk:
+        """create an instance which is already evaluated"""
+        thunk = cls(0, None)
+        thunk.value = value
+        return thunk
+
+
+# markers used on the stacks of the evaluator
+_UPDATE: Final = object()
+
+_READ: Final = 0
+
+_FORCE: Final = 1
+
+_ABSTRACT: Final = 2
+
+_APPLY: Final = 3
+
+
+class EvaluatingVisitor(TracingVisitor):
+    """
+    Visitor which calculates beta normal forms by evaluating
+    terms with shared, lazily evaluated arguments and reading back the result
+
+    Intermediate steps are not available and delegated to a BetaNormalisingVisitor.
+    References to aliases are evaluated at most once and shared between evaluations.
+    """
+
+    expands_references = True
+
+    records_alpha = False
+
+    thunks: WeakKeyDictionary[Definition[str], Thunk]
+
+    __slots__ = ("thunks",)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.thunks = WeakKeyDictionary()
+
+    def skip_intermediate(self, term: Term[str], budget: Budget | None = None) -> Term[str]:
+        """calculate the beta normal form directly, recording beta reductions in the budget"""
+        context, environment = self.reference_environment(references(term))
+        return to_term(self.normalise(from_term(term, context), budget, environment))
+
+    def reference_environment(
+        self,
+        found: Mapping[str, Reference[str]]
+    ) -> tuple[list[str], Environment]:
+        """create the context and environment for evaluating terms containing references"""
+        environment: Environment = None
+        for reference in found.values():
+            environment = (self.definition_thunk(reference.definition), environment)
+        return list(found), environment
+
+    def definition_thunk(self, definition: Definition[str]) -> Thunk:
+        """return the shared thunk evaluating a definition"""
+        # create thunks of referenced definitions first
+        stack = [(definition, False)]
+        while stack:
+            current, ready = stack.pop()
+            if current in self.thunks:
+                continue
+            elif ready:
+                context, environment = self.reference_environment(current.references)
+                self.thunks[current] = Thunk(from_term(current.term, context), environment)
+            else:
+                stack.append((current, True))
+                stack.extend((r.definition, False) for r in current.references.values())
+        return self.thunks[definition]
+
+    def evaluate(self, term: DeBruijnTerm, environment: Environment,
+                 budget: Budget | None = None) -> Value:
+        """evaluate a term into its weak head normal form"""
+        stack: list[object] = []
+        while True:
+            if isinstance(term, tuple):
+                if term[0] == APPLICATION:
+                    stack.append(Thunk(term[2], environment))
+                    term = term[1]
+                    continue
+                value: Value = Closure(term[1], term[2], environment)    # type: ignore[arg-type]
+            elif isinstance(term, int):
+                index = term
+                while index:
+                    environment = environment[1]    # type: ignore[index]
+                    index -= 1
+                thunk = environment[0]  # type: ignore[index]
+                if thunk.value is None:
+                    stack.append(thunk)
+                    stack.append(_UPDATE)
+                    term, environment = thunk.term, thunk.environment
+                    continue
+                value = thunk.value
+            else:
+                value = Neutral(term, ())
+            # apply the value to the arguments on the stack
+            while stack:
+                item = stack.pop()
+                if item is _UPDATE:
+                    thunk = cast(Thunk, stack.pop())
+                    thunk.value = value
+                    thunk.environment = None
+                elif isinstance(value, Closure):
+                    if budget is not None:
+                        budget.step()
+                    term = value.body
+                    environment = (item, value.environment)     # type: ignore[assignment]
+                    break
+                else:
+                    arguments = [item]
+                    while stack and stack[-1] is not _UPDATE:
+                        arguments.append(stack.pop())
+                    value = Neutral(
+                        value.head,
+                        value.arguments + tuple(arguments)  # type: ignore[arg-type]
+                    )
+            else:
+                return value
+
+    def force(self, thunk: Thunk, budget: Budget | None = None) -> Value:
+        """evaluate a thunk if it was not already evaluated"""
+        if thunk.value is None:
+            thunk.value = self.evaluate(thunk.term, thunk.environment, budget)
+            thunk.environment = None
+        return thunk.value
+
+    def normalise(self, term: DeBruijnTerm, budget: Budget | None = None,
+                  environment: Environment = None) -> DeBruijnTerm:
+        """calculate the beta normal form of a nameless term"""
+        output: list[DeBruijnTerm] = []
+        value = self.evaluate(term, environment, budget)
+        tasks: list[tuple[int, object, int]] = [(_READ, value, 0)]
+        size = 0
+        while tasks:
+            action, item, depth = tasks.pop()
+            if action == _FORCE:
+                tasks.append((_READ, self.force(item, budget), depth))     # type: ignore[arg-type]
+            elif action == _READ:
+                if budget is not None:
+                    # count the variable or abstraction and the applications
+                    if isinstance(item, Closure):
+                        size += 1
+                    else:
+                        size += 1 + len(item.arguments)     # type: ignore[attr-defined]
+                    budget.check_size(size)
+                if isinstance(item, Closure):
+                    tasks.append((_ABSTRACT, item.name, depth))
+                    variable = Thunk.evaluated(Neutral(depth, ()))
+                    tasks.append((
+                        _READ,
+                        self.evaluate(item.body, (variable, item.environment), budget),
+                        depth + 1
+                    ))
+                else:
+                    head = item.head    # type: ignore[attr-defined]
+                    if isinstance(head, int):
+                        head = depth - 1 - head
+                    arguments = item.arguments  # type: ignore[attr-defined]
+                    if arguments:
+                        tasks.append((_APPLY, head, len(arguments)))
+                        tasks.extend((_FORCE, argument, depth) for argument in reversed(arguments))
+                    else:
+                        output.append(head)
+            elif action == _ABSTRACT:
+                output[-1] = (ABSTRACTION, item, output[-1])    # type: ignore[assignment]
+            else:
+                # depth is the number of arguments when applying
+                result = item
+                for argument in output[len(output) - depth:]:
+                    result = (APPLICATION, result, argument)
+                del output[len(output) - depth:]
+                output.append(result)   # type: ignore[arg-type]
+        return output[0]
@@ -0,0 +1,50 @@
+#!/usr/bin/python3
+
+"""Church numerals written as numeric literals"""
+
+from __future__ import annotations
+from typing import Any
+from lambda_calculus.terms import Abstraction, Application, Term, Variable
+from . import interning
+
+__all__ = (
+    "is_literal",
+    "numeral",
+    "numeral_value"
+)
+
+
+def is_literal(name: str) -> bool:
+    """check if a variable name is a numeric literal"""
+    return name.isascii() and name.isdigit()
+
+
+def numeral(n: int) -> Abstraction[str]:
+    """create the church numeral of a natural number without parsing it"""
+    if n < 0:
+        raise ValueError("number is not natural")
+    f = interning.variable("f")
+    body: Term[str] = interning.variable("x")
+    for _ in range(n):
+        body = interning.application(f, body)
+    return interning.abstraction("f", interning.abstraction("x", body))
+
+
+def numeral_value(term: Term[Any]) -> int | None:
+    """return the natural number encoded by a church numeral or None if it is none"""
+    if not isinstance(term, Abstraction) or not isinstance(term.body, Abstraction):
+        return None
+    f = term.bound
+    x = term.body.bound
+    if f == x:
+        return None
+    body = term.body.body
+    n = 0
+    while isinstance(body, Application):
+        if not isinstance(body.abstraction, Variable) or body.abstraction.name != f:
+            return None
+        body = body.argument
+        n += 1
+    if isinstance(body, Variable) and body.name == x:
+        return n
+    return None
@@ -0,0 +1,177 @@
+#!/usr/bin/python3
+
+"""Parallel evaluation of independent terms"""
+
+from __future__ import annotations
+from collections import deque
+from collections.abc import Callable, Iterable, Set
+from concurrent.futures import Executor, Future
+from io import StringIO
+from typing import TypeAlias
+from lambda_calculus.visitors.substitution.renaming import CountingSubstitution
+from . import LambdaREPL
+from .aliases import LetAliases
+from .debruijn import Fingerprint
+from .limits import Budget, LimitExceeded, Limits
+from .normalisation import Normaliser
+from .parsing import LambdaTransformer
+from .serialisation import Encoded, decode, encode
+from .session import Interrupted
+from .stats import Statistics
+
+__all__ = (
+    "Interruption",
+    "Outcome",
+    "ParallelExecutor",
+    "normalise"
+)
+
+# message of the exceeded limit or None if interrupted by the user and the number of steps
+Interruption: TypeAlias = tuple["str | None", int]
+
+# normal form or partial term, why the evaluation was interrupted and statistics if requested
+Outcome: TypeAlias = tuple[Encoded, "Interruption | None", "Statistics | None"]
+
+# REPLs used by worker processes for each engine
+_REPLS: dict[Callable[[], Normaliser], LambdaREPL] = {}
+
+
+def normalise(factory: Callable[[], Normaliser], limits: Limits, encoded: Encoded,
+              statistics: bool = False, arithmetic: bool = False) -> Outcome:
+    """calculate the normal form of a term without aliases, usually in a worker process"""
+    repl = _REPLS.get(factory)
+    if repl is None:
+        repl = LambdaREPL(LetAliases(CountingSubstitution), LambdaTransformer(), factory())
+        _REPLS[factory] = repl
+    repl.limits = limits
+    repl.session.arithmetic = arithmetic
+    repl.session.statistics = collected = Statistics("evaluate") if statistics else None
+    try:
+        return encode(repl.session.normalise(decode(encoded)).term), None, collected
+    except Interrupted as error:
+        # the partial term is displayed with the settings of the parent
+        message = str(error.reason) if isinstance(error.reason, LimitExceeded) else None
+        return encode(error.term), (message, error.steps), collected
+    finally:
+        repl.session.statistics = None
+
+
+class ParallelExecutor:
+    """
+    Executor of REPL commands which evaluates consecutive evaluate commands in parallel
+
+    All other commands wait for the evaluations before them to finish
+    and results are displayed in the order of the commands.
+    """
+
+    repl: LambdaREPL
+
+    executor: Executor
+
+    # evaluations or None if their output is known, output of the command,
+    # cache key, used aliases and statistics if they are collected
+    pending: deque[tuple[
+        Future[Outcome] | None,
+        str,
+        Fingerprint | None,
+        Set[str],
+        Statistics | None
+    ]]
+
+    __slots__ = ("repl", "executor", "pending")
+
+    def __init__(self, repl: LambdaREPL, executor: Executor) -> None:
+        self.repl = repl
+        self.executor = executor
+        self.pending = deque()
+
+    def execute(self, lines: Iterable[str]) -> bool:
+        """execute commands without prompting, returning if the REPL was exited"""
+        for line in lines:
+            line = self.repl.precmd(line.rstrip("\r\n"))
+            command, arg, _ = self.repl.parseline(line)
+            if command in ("evaluate", "eval") and arg is not None:
+                self.submit(arg)
+                self.write_results(False)
+            else:
+                # other commands can change the aliases or settings
+                self.write_results(True)
+                stop = self.repl.postcmd(self.repl.onecmd(line), line)
+                self.repl.stdout.flush()
+                if stop:
+                    return True
+        self.write_results(True)
+        return False
+
+    def submit(self, arg: str) -> None:
+        """start evaluating a term in the background"""
+        # keep errors and cached results in order
+        stdout = self.repl.stdout
+        self.repl.stdout = StringIO()
+        statistics = Statistics("evaluate") if self.repl.stats else None
+        self.repl.session.statistics = statistics
+        try:
+            term = self.repl.parse_term(arg)
+            if term is not None:
+                term, key, dependencies = self.repl.session.resolve(term)
+                result = None if key is None else self.repl.cache.get(key)
+                if result is None:
+                    self.pending.append((
+                        self.executor.submit(
+                            normalise,
+                            self.repl.strategies[self.repl.strategy],
+                            self.repl.limits,
+                            encode(self.repl.aliases.expand(term)),
+                            statistics is not None,
+                            self.repl.session.accelerates()
+                        ),
+                        "",
+                        key,
+                        dependencies,
+                        statistics
+                    ))
+                    return
+                if statistics is not None:
+                    statistics.record_term(result)
+                self.repl.write_term(result)
+            self.pending.append(
+                (None, self.repl.stdout.getvalue(), None, frozenset(), statistics)
+            )
+        finally:
+            self.repl.session.statistics = None
+            self.repl.stdout = stdout
+
+    def write_results(self, wait: bool) -> None:
+        """display the results of finished evaluations in order, waiting for all if requested"""
+        while self.pending and (wait or self.pending[0][0] is None or self.pending[0][0].done()):
+            future, output, key, dependencies, statistics = self.pending.popleft()
+            self.repl.stdout.write(output)
+            if future is not None:
+                self.write_outcome(future.result(), key, dependencies, statistics)
+            if statistics is not None:
+                self.repl.write_statistics(statistics)
+            self.repl.stdout.flush()
+
+    def write_outcome(self, outcome: Outcome, key: Fingerprint | None,
+                      dependencies: Set[str], statistics: Statistics | None) -> None:
+        """display the normal form or partial term calculated by a worker"""
+        encoded, interruption, collected = outcome
+        if statistics is not None and collected is not None:
+            statistics.merge(collected)
+        self.repl.session.statistics = statistics
+        try:
+            result = decode(encoded)
+            if interruption is None:
+                if key is not None:
+                    self.repl.cache.put(key, result, dependencies)
+                self.repl.write_term(result)
+            else:
+                message, steps = interruption
+                reason: BaseException
+                if message is None:
+                    reason = KeyboardInterrupt()
+                else:
+                    reason = LimitExceeded(message, Budget(self.repl.limits, result))
+                self.repl.handle_interruption(Interrupted(reason, steps, result), True)
+        finally:
+            self.repl.session.statistics = None
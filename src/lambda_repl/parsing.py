@@ -3,61 +3,84 @@
 """Utilities for parsing lambda terms"""
 
 from __future__ import annotations
-from collections import deque
-from collections.abc import Iterator
-from itertools import chain
+from functools import cache
 from lambda_calculus.terms import Abstraction, Application, Term, Variable
 from lark import Lark, Token
 from lark.exceptions import UnexpectedInput, UnexpectedToken
-from lark.lark import PostLex
-from lark.visitors import Transformer, v_args
+from lark.visitors import Transformer_NonRecursive, v_args
+from . import interning
+from .aliases import substitute
+from .numerals import is_literal, numeral
 
 __all__ = (
     "PARSER",
-    "WhitespacePostLex",
+    "get_parser",
     "LambdaTransformer"
 )
 
 
-class WhitespacePostLex(PostLex):
-    """PostLex removing unnecessary whitespace"""
+@cache
+def get_parser() -> Lark:
+    """build the parser on first use, reusing the parser tables cached by previous processes"""
+    return Lark.open_from_package(
+        __name__,
+        "grammar.lark",
+        start="term",
+        parser="lalr",
+        lexer="basic",
+        cache=True
+    )
 
-    __slots__ = ()
 
-    def is_unnecessary(self, before: Token | None, after: Token | None) -> bool:
-        """check if whitespace is unnecessary"""
-        return before in {"\\", "λ", ".", "(", None} or after in {".", ")", None}
+# created on first access by __getattr__
+PARSER: Lark
 
-    def process(self, stream: Iterator[Token]) -> Iterator[Token]:
-        """process the tokens generated by the lexer"""
-        try:
-            first = next(stream)
-        except StopIteration:
-            return
-        buffer: deque[Token | None] = deque((None,) * 2, maxlen=3)
-        buffer.append(first)
-        for token in chain(stream, (None,)):
-            buffer.append(token)
-            if buffer[1] is not None:
-                if buffer[1].type == "_WHITESPACE" \
-                        and self.is_unnecessary(buffer[0], buffer[2]):
-                    continue
-                yield buffer[1]
 
+def __getattr__(name: str) -> Lark:
+    """build PARSER lazily"""
+    if name == "PARSER":
+        return get_parser()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-class LambdaTransformer(Transformer[Token, Term[str]]):
-    """Transformer transforming an AST into a lambda term"""
+
+class LambdaTransformer(Transformer_NonRecursive[Token, Term[str]]):
+    """
+    Transformer transforming an AST into a lambda term
+
+    Numeric literals are transformed into church numerals if numerals is set.
+    """
+
+    numerals: bool
+
+    def __init__(self, numerals: bool = False) -> None:
+        super().__init__()
+        self.numerals = numerals
 
     def transform_string(self, string: str) -> Term[str]:
         """parse a string and return the transformed lambda term"""
         # the parser sometimes return tokens directly instead of a tree
-        match PARSER.parse(string):
+        match get_parser().parse(string):
             case Token(type="VARIABLE") as name:
-                return self.VARIABLE(name)
+                term: Term[str] = self.VARIABLE(name)
             case Token() as token:
                 raise UnexpectedToken(token, {"VARIABLE", })
             case tree:
-                return self.transform(tree)
+                term = self.transform(tree)
+        if self.numerals:
+            return self.expand_literals(term)
+        return term
+
+    def expand_literals(self, term: Term[str]) -> Term[str]:
+        """replace free numeric literals with church numerals"""
+        values = {
+            name: numeral(int(name))
+            for name in term.free_variables()
+            if is_literal(name)
+        }
+        if not values:
+            return term
+        # numerals have no free variables which could be captured
+        return interning.intern_term(substitute(term, values, {}, lambda t, _: t))
 
     def __default__(self, data: object, children: object, meta: object) -> Term[str]:
         """handle unknown nodes"""
@@ -69,25 +92,14 @@ class LambdaTransformer(Transformer[Token, Term[str]]):
 
     def VARIABLE(self, name: Token) -> Variable[str]:
         """transform a variable node"""
-        return Variable(name.value)
+        return interning.variable(name.value)
 
     @v_args(inline=True)
     def abstraction(self, variable: Variable[str], body: Term[str]) -> Abstraction[str]:
         """transform an abstraction"""
-        return Abstraction(variable.name, body)
+        return interning.abstraction(variable.name, body)
 
     @v_args(inline=True)
     def application(self, abstraction: Term[str], argument: Term[str]) -> Application[str]:
         """transform an application"""
-        return Application(abstraction, argument)
-
-
-PARSER = Lark.open_from_package(
-    __name__,
-    "grammar.lark",
-    start="term",
-    parser="lalr",
-    lexer="basic",
-    postlex=WhitespacePostLex(),
-    propagate_positions=True
-)
+        return interning.application(abstraction, argument)
@@ -0,0 +1,188 @@
+#!/usr/bin/python3
+
+"""Conversion of terms into strings without recursion"""
+
+from __future__ import annotations
+from collections.abc import Callable, Iterable, Iterator
+from typing import IO, Any, Final, TypeAlias
+from lambda_calculus.terms import Abstraction, Application, Term
+from .debruijn import ABSTRACTION, APPLICATION, DeBruijnTerm, from_term
+from .interning import size
+from .numerals import numeral_value
+
+__all__ = (
+    "Formatter",
+    "FORMATTERS",
+    "tokens",
+    "minimal_tokens",
+    "debruijn_tokens",
+    "truncate",
+    "depth",
+    "write_tokens",
+    "format_term"
+)
+
+# generates the parts of the representation of a term, optionally displaying numerals
+Formatter: TypeAlias = Callable[[Term[Any], bool], Iterator[str]]
+
+# number of parts written at once
+_CHUNK_SIZE: Final = 4096
+
+
+def tokens(term: Term[Any], numerals: bool = False) -> Iterator[str]:
+    """
+    generate the parts of the string representation of a term from left to right
+
+    Church numerals are represented by their value if numerals is set.
+    """
+    # strings are emitted after the subterms pushed before them
+    stack: list[Term[Any] | str] = [term]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            yield item
+        elif isinstance(item, Abstraction):
+            value = numeral_value(item) if numerals else None
+            if value is not None:
+                yield str(value)
+                continue
+            yield f"(λ{item.bound}."
+            stack.append(")")
+            stack.append(item.body)
+        elif isinstance(item, Application):
+            yield "("
+            stack.append(")")
+            stack.append(item.argument)
+            stack.append(" ")
+            stack.append(item.abstraction)
+        else:
+            yield str(item)
+
+
+def minimal_tokens(term: Term[Any], numerals: bool = False) -> Iterator[str]:
+    """generate the parts of a representation which only uses brackets required by the parser"""
+    # flags mark terms which extend to the end of their enclosing brackets
+    stack: list[tuple[Term[Any] | str, bool]] = [(term, True)]
+    while stack:
+        item, last = stack.pop()
+        if isinstance(item, str):
+            yield item
+        elif isinstance(item, Abstraction):
+            value = numeral_value(item) if numerals else None
+            if value is not None:
+                yield str(value)
+            elif last:
+                # the body would include everything following it
+                yield f"λ{item.bound}."
+                stack.append((item.body, True))
+            else:
+                yield f"(λ{item.bound}."
+                stack.append((")", True))
+                stack.append((item.body, True))
+        elif isinstance(item, Application):
+            # applications are left associative
+            if isinstance(item.argument, Application):
+                stack.append((")", True))
+                stack.append((item.argument, True))
+                stack.append((" (", True))
+            else:
+                stack.append((item.argument, last))
+                stack.append((" ", True))
+            stack.append((item.abstraction, False))
+        else:
+            yield str(item)
+
+
+def _nameless_numeral_value(term: DeBruijnTerm) -> int | None:
+    """return the natural number encoded by a nameless church numeral or None if it is none"""
+    if not isinstance(term, tuple) or term[0] != ABSTRACTION \
+            or not isinstance(term[2], tuple) or term[2][0] != ABSTRACTION:
+        return None
+    body = term[2][2]
+    n = 0
+    while isinstance(body, tuple) and body[0] == APPLICATION and body[1] == 1:
+        body = body[2]
+        n += 1
+    if body == 0:
+        return n
+    return None
+
+
+def debruijn_tokens(term: Term[Any], numerals: bool = False) -> Iterator[str]:
+    """generate the parts of a representation using de Bruijn indices instead of bound variables"""
+    # flags mark terms which extend to the end of their enclosing brackets, None marks text
+    stack: list[tuple[DeBruijnTerm, bool | None]] = [(from_term(term), True)]
+    while stack:
+        item, last = stack.pop()
+        if last is None or not isinstance(item, tuple):
+            yield str(item)
+            continue
+        value = _nameless_numeral_value(item) if numerals else None
+        if value is not None:
+            yield str(value)
+        elif item[0] == ABSTRACTION:
+            if last:
+                yield "λ "
+            else:
+                yield "(λ "
+                stack.append((")", None))
+            stack.append((item[2], True))
+        elif isinstance(item[2], tuple) and item[2][0] == APPLICATION:
+            stack.append((")", None))
+            stack.append((item[2], True))
+            stack.append((" (", None))
+            stack.append((item[1], False))
+        else:
+            stack.append((item[2], last))
+            stack.append((" ", None))
+            stack.append((item[1], False))
+
+
+FORMATTERS: dict[str, Formatter] = {
+    "full": tokens,
+    "minimal": minimal_tokens,
+    "debruijn": debruijn_tokens
+}
+
+
+def depth(term: Term[Any]) -> int:
+    """calculate the maximum nesting of a term"""
+    result = 0
+    stack = [(term, 1)]
+    while stack:
+        item, level = stack.pop()
+        result = max(result, level)
+        if isinstance(item, Application):
+            stack.append((item.argument, level + 1))
+            stack.append((item.abstraction, level + 1))
+        elif isinstance(item, Abstraction):
+            stack.append((item.body, level + 1))
+    return result
+
+
+def truncate(term: Term[Any], parts: Iterable[str], width: int) -> Iterator[str]:
+    """limit the parts of a representation to width characters, describing cut terms"""
+    remaining = width
+    for part in parts:
+        if len(part) > remaining:
+            yield part[:remaining]
+            yield f"… ({size(term)} nodes, depth {depth(term)})"
+            return
+        remaining -= len(part)
+        yield part
+
+
+def write_tokens(parts: Iterable[str], file: IO[str]) -> None:
+    """write parts to a file in chunks without joining all of them"""
+    chunk: list[str] = []
+    for part in parts:
+        chunk.append(part)
+        if len(chunk) >= _CHUNK_SIZE:
+            file.write("".join(chunk))
+            chunk.clear()
+    file.write("".join(chunk))
+
+
+def format_term(term: Term[Any], numerals: bool = False) -> str:
+    """convert a term into the same string as str without being limited by the recursion limit"""
+    return "".join(tokens(term, numerals))
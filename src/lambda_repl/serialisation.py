@@ -0,0 +1,229 @@
+#!/usr/bin/python3
+
+"""Flat serialisation of terms"""
+
+from __future__ import annotations
+import marshal
+from hashlib import sha256
+from struct import Struct
+from typing import BinaryIO, Final, TypeAlias
+from lambda_calculus.terms import Abstraction, Application, Term, Variable
+from .aliases import Aliases
+from .interning import abstraction, application, variable
+
+__all__ = (
+    "Encoded",
+    "SNAPSHOT_MAGIC",
+    "SNAPSHOT_VERSION",
+    "SnapshotError",
+    "encode",
+    "decode",
+    "dump_aliases",
+    "load_aliases"
+)
+
+SNAPSHOT_MAGIC: Final = b"LAMBDA\x00S"
+
+SNAPSHOT_VERSION: Final = 3
+
+# magic, version and SHA-256 digest of the payload
+_HEADER: Final = Struct(f">{len(SNAPSHOT_MAGIC)}sH32s")
+
+# terms in prefix order with names of variables as strings,
+# which can be serialised without recursion
+Encoded: TypeAlias = tuple[int | str, ...]
+
+_ABSTRACTION: Final = -1
+
+_APPLICATION: Final = -2
+
+# name, expanded value, source, earlier value and dependencies of a restored alias
+_Definition: TypeAlias = tuple[str, Term[str], Term[str], "Term[str] | None", tuple[str, ...]]
+
+# unique nodes of a snapshot, which are names of variables, abstractions as the name
+# of their variable and the index of their body or applications as two indices
+_Node: TypeAlias = str | tuple[str, int] | tuple[int, int]
+
+
+def encode(term: Term[str]) -> Encoded:
+    """encode a term, abstractions being followed by the name of their variable"""
+    output: list[int | str] = []
+    stack = [term]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, Variable):
+            output.append(item.name)
+        elif isinstance(item, Application):
+            output.append(_APPLICATION)
+            stack.append(item.argument)
+            stack.append(item.abstraction)
+        elif isinstance(item, Abstraction):
+            output.append(_ABSTRACTION)
+            output.append(item.bound)
+            stack.append(item.body)
+        else:
+            raise TypeError(f"unknown term: {item!r}")
+    return tuple(output)
+
+
+def decode(encoded: Encoded) -> Term[str]:
+    """decode a term into shared terms"""
+    # the reversed prefix order is the postfix order of the mirrored term
+    output: list[Term[str]] = []
+    try:
+        for item in reversed(encoded):
+            if isinstance(item, str):
+                output.append(variable(item))
+            elif item == _APPLICATION:
+                function = output.pop()
+                output[-1] = application(function, output[-1])
+            elif item == _ABSTRACTION:
+                name = output.pop()
+                if not isinstance(name, Variable):
+                    raise ValueError("invalid abstraction")
+                output[-1] = abstraction(name.name, output[-1])
+            else:
+                raise ValueError(f"invalid item: {item!r}")
+    except IndexError:
+        raise ValueError("missing terms") from None
+    if len(output) != 1:
+        raise ValueError("invalid number of terms")
+    return output[0]
+
+
+class SnapshotError(ValueError):
+    """Exception raised when a snapshot can not be loaded"""
+
+    __slots__ = ()
+
+
+class _NodeTable:
+    """table of unique nodes, each node being added after the nodes it references"""
+
+    nodes: list[_Node]
+
+    indices: dict[_Node, int]
+
+    # indices of added terms by their identity, which keeps shared terms from being visited again
+    seen: dict[int, int]
+
+    # added terms, which keeps their identities from being reused
+    terms: list[Term[str]]
+
+    __slots__ = ("nodes", "indices", "seen", "terms")
+
+    def __init__(self) -> None:
+        self.nodes = []
+        self.indices = {}
+        self.seen = {}
+        self.terms = []
+
+    def add(self, term: Term[str]) -> int:
+        """add the nodes of a term and return the index of its root"""
+        stack = [(term, False)]
+        while stack:
+            item, visited = stack.pop()
+            if id(item) in self.seen:
+                continue
+            node: _Node
+            if isinstance(item, Variable):
+                node = item.name
+            elif isinstance(item, Application):
+                if not visited:
+                    stack.extend(((item, True), (item.argument, False), (item.abstraction, False)))
+                    continue
+                node = (self.seen[id(item.abstraction)], self.seen[id(item.argument)])
+            elif isinstance(item, Abstraction):
+                if not visited:
+                    stack.extend(((item, True), (item.body, False)))
+                    continue
+                node = (item.bound, self.seen[id(item.body)])
+            else:
+                raise TypeError(f"unknown term: {item!r}")
+            index = self.indices.get(node)
+            if index is None:
+                index = self.indices[node] = len(self.nodes)
+                self.nodes.append(node)
+            self.seen[id(item)] = index
+            self.terms.append(item)
+        return self.seen[id(term)]
+
+
+def _decode_nodes(nodes: tuple[_Node, ...]) -> list[Term[str]]:
+    """decode a table of unique nodes into shared terms"""
+    terms: list[Term[str]] = []
+    for node in nodes:
+        if isinstance(node, str):
+            terms.append(variable(node))
+            continue
+        if not isinstance(node, tuple) or len(node) != 2:
+            raise ValueError(f"invalid node: {node!r}")
+        first, second = node
+        if not isinstance(second, int) or not 0 <= second < len(terms):
+            raise ValueError(f"invalid reference: {second!r}")
+        if isinstance(first, str):
+            terms.append(abstraction(first, terms[second]))
+        elif isinstance(first, int) and 0 <= first < len(terms):
+            terms.append(application(terms[first], terms[second]))
+        else:
+            raise ValueError(f"invalid reference: {first!r}")
+    return terms
+
+
+def _decode_definitions(payload: bytes) -> list[_Definition]:
+    """decode the definitions of aliases contained in the payload of a snapshot"""
+    nodes, entries = marshal.loads(payload)
+    terms = _decode_nodes(nodes)
+    definitions: list[_Definition] = []
+    for alias, value, source, previous, uses in entries:
+        if not all(isinstance(used, str) for used in uses):
+            raise ValueError("invalid dependencies")
+        definitions.append((
+            alias,
+            terms[value],
+            terms[source],
+            None if previous is None else terms[previous],
+            uses
+        ))
+    return definitions
+
+
+def dump_aliases(aliases: Aliases[str], file: BinaryIO) -> None:
+    """write a snapshot of expanded aliases and their definitions in definition order"""
+    # expanded aliases share most of their nodes
+    table = _NodeTable()
+    definitions = []
+    for alias in aliases:
+        source, previous = aliases.source(alias)
+        definitions.append((
+            alias,
+            table.add(aliases.expand(aliases[alias])),
+            table.add(source),
+            None if previous is None else table.add(previous),
+            tuple(aliases.dependencies(alias))
+        ))
+    payload = marshal.dumps((tuple(table.nodes), tuple(definitions)), 4)
+    file.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, sha256(payload).digest()))
+    file.write(payload)
+
+
+def load_aliases(aliases: Aliases[str], file: BinaryIO) -> list[str]:
+    """restore the aliases of a snapshot without applying aliases and return their names"""
+    header = file.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise SnapshotError("file is too short")
+    magic, version, digest = _HEADER.unpack(header)
+    if magic != SNAPSHOT_MAGIC:
+        raise SnapshotError("file is not a snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise SnapshotError(f"unsupported version {version}, expected {SNAPSHOT_VERSION}")
+    payload = file.read()
+    if sha256(payload).digest() != digest:
+        raise SnapshotError("snapshot is corrupted")
+    try:
+        definitions = _decode_definitions(payload)
+    except (TypeError, ValueError, IndexError, EOFError) as error:
+        raise SnapshotError(f"invalid snapshot: {error}") from error
+    for alias, value, source, previous, uses in definitions:
+        aliases.restore(alias, value, source, previous, uses)
+    return [alias for alias, *_ in definitions]
@@ -0,0 +1,187 @@
+#!/usr/bin/python3
+
+"""Network server giving every connection its own REPL"""
+
+from __future__ import annotations
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import Executor
+from io import StringIO
+from typing import Any, Final
+from . import LambdaREPL
+from .aliases import Aliases
+from .limits import Limits
+from .parallel import ParallelExecutor
+
+__all__ = (
+    "COMMANDS",
+    "SETTINGS",
+    "TIMEOUT",
+    "LambdaServer"
+)
+
+# commands available to connections, which excludes accessing files and modules
+COMMANDS: Final = frozenset((
+    "evaluate",
+    "eval",
+    "trace",
+    "alias",
+    "aliases",
+    "deps",
+    "clear",
+    "cache",
+    "set",
+    "help",
+    "exit"
+))
+
+# settings which connections can change, which excludes files and the size of the cache
+SETTINGS: Final = frozenset((
+    "steps",
+    "timeout",
+    "size",
+    "numerals",
+    "arithmetic",
+    "output",
+    "width",
+    "trace",
+    "interval",
+    "stats",
+    "strategy"
+))
+
+# timeout in seconds used by servers created without limits
+TIMEOUT: Final = 10.0
+
+
+class LambdaServer:
+    """
+    Server executing the commands of each connection in a separate REPL
+
+    REPLs start with a copy-on-write fork of the prelude and
+    evaluate terms in the executor, which should be a pool of workers.
+    Other commands are executed in threads and all commands
+    are restricted to COMMANDS and the limits of the server.
+    """
+
+    prelude: Aliases[str]
+
+    factory: Callable[[Aliases[str]], LambdaREPL]
+
+    executor: Executor
+
+    # limits which the limits of connections can not exceed
+    limits: Limits
+
+    # REPLs of the current connections
+    repls: set[LambdaREPL]
+
+    __slots__ = ("prelude", "factory", "executor", "limits", "repls")
+
+    def __init__(
+        self,
+        prelude: Aliases[str],
+        factory: Callable[[Aliases[str]], LambdaREPL],
+        executor: Executor,
+        limits: Limits | None = None
+    ) -> None:
+        self.prelude = prelude
+        self.factory = factory
+        self.executor = executor
+        self.limits = Limits(timeout=TIMEOUT) if limits is None else limits
+        self.repls = set()
+
+    async def start_tcp(self, host: str | None, port: int, **kwargs: Any) -> asyncio.Server:
+        """start accepting connections on a TCP port"""
+        return await asyncio.start_server(self.handle, host, port, **kwargs)
+
+    async def start_unix(self, path: str, **kwargs: Any) -> asyncio.Server:
+        """start accepting connections on a unix socket"""
+        return await asyncio.start_unix_server(self.handle, path, **kwargs)
+
+    def create_repl(self) -> LambdaREPL:
+        """create a REPL for a new connection"""
+        repl = self.factory(self.prelude.fork())
+        repl.stdout = StringIO()
+        repl.use_rawinput = False
+        self.restrict(repl)
+        return repl
+
+    def restrict(self, repl: LambdaREPL) -> None:
+        """lower the limits of a REPL which exceed the limits of the server"""
+        for name in ("steps", "timeout", "size"):
+            maximum = getattr(self.limits, name)
+            if maximum is not None:
+                value = getattr(repl.limits, name)
+                if value is None or value > maximum:
+                    setattr(repl.limits, name, maximum)
+
+    @staticmethod
+    def check(repl: LambdaREPL, command: str | None, arg: str | None) -> str | None:
+        """return why a command can not be executed by a connection or None"""
+        if command is None or not hasattr(repl, f"do_{command}"):
+            # unknown commands are handled by the REPL
+            return None
+        if command not in COMMANDS:
+            return f"command '{command}' is not available"
+        if command == "set":
+            name = (arg or "").strip().partition(" ")[0]
+            if name and name not in SETTINGS:
+                return f"setting '{name}' is not available"
+        return None
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """execute the commands received from a connection until it exits or is closed"""
+        repl = self.create_repl()
+        self.repls.add(repl)
+        try:
+            if repl.intro:
+                repl.stdout.write(f"{repl.intro}\n")
+            while True:
+                repl.stdout.write(repl.prompt)
+                await self.flush(repl, writer)
+                line = await reader.readline()
+                if not line:
+                    break
+                if await self.execute(repl, line.decode("utf8", errors="replace")):
+                    await self.flush(repl, writer)
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.repls.discard(repl)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def execute(self, repl: LambdaREPL, line: str) -> bool:
+        """execute a command, returning if the REPL was exited"""
+        line = repl.precmd(line.rstrip("\r\n"))
+        command, arg, _ = repl.parseline(line)
+        error = self.check(repl, command, arg)
+        if error is not None:
+            repl.write_error(f"Error: {error}\n")
+            return False
+        if command in ("evaluate", "eval") and arg is not None:
+            executor = ParallelExecutor(repl, self.executor)
+            # parsing, expanding and printing large terms would block the other connections
+            await asyncio.to_thread(executor.submit, arg)
+            future = executor.pending[-1][0]
+            if future is not None:
+                await asyncio.wrap_future(future)
+            await asyncio.to_thread(executor.write_results, True)
+            return False
+        # traces and large aliases would block the other connections
+        stop = await asyncio.to_thread(repl.onecmd, line)
+        self.restrict(repl)
+        return repl.postcmd(stop, line)
+
+    @staticmethod
+    async def flush(repl: LambdaREPL, writer: asyncio.StreamWriter) -> None:
+        """send the output of a REPL to its connection"""
+        output = repl.stdout.getvalue()     # type: ignore[attr-defined]
+        repl.stdout = StringIO()
+        writer.write(output.encode("utf8"))
+        await writer.drain()
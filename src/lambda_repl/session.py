@@ -0,0 +1,436 @@
+#!/usr/bin/python3
+
+"""Programmatic evaluation of lambda terms returning structured results"""
+
+from __future__ import annotations
+from collections.abc import Callable, Iterable, Iterator, Set
+from contextlib import AbstractContextManager, ExitStack, contextmanager
+from dataclasses import dataclass
+from importlib import import_module
+from io import BytesIO
+from typing import Any, BinaryIO, Final
+from lambda_calculus.terms import Term
+from lambda_calculus.visitors.normalisation import Conversion
+from lark.exceptions import UnexpectedInput
+from .acceleration import MAXIMUM, accelerate
+from .aliases import Aliases
+from .cache import NormalFormCache
+from .debruijn import Fingerprint
+from .limits import Budget, LimitExceeded, Limits
+from .normalisation import Normaliser, NormalisingVisitor, skip_intermediate
+from .parsing import LambdaTransformer
+from .serialisation import SNAPSHOT_MAGIC, dump_aliases, load_aliases
+from .stats import Statistics
+from .strategies import NORMAL_FORMS, STRATEGIES
+
+__all__ = (
+    "SessionError",
+    "ParseError",
+    "TermImportError",
+    "DefinitionError",
+    "Interrupted",
+    "Evaluation",
+    "TraceStep",
+    "Session"
+)
+
+# characters which can not be part of alias names
+RESERVED: Final = frozenset("().λ\\")
+
+
+class SessionError(Exception):
+    """Exception raised when a session can not perform an operation"""
+
+
+class ParseError(SessionError):
+    """Exception raised when the text of a term can not be parsed"""
+
+    text: str
+
+    error: UnexpectedInput
+
+    def __init__(self, text: str, error: UnexpectedInput) -> None:
+        super().__init__(str(error))
+        self.text = text
+        self.error = error
+
+    def context(self) -> str:
+        """return the part of the text where parsing failed"""
+        return self.error.get_context(self.text)
+
+
+class TermImportError(SessionError):
+    """Exception raised when a term can not be imported, caused by the original error if any"""
+
+    location: str
+
+    def __init__(self, message: str, location: str) -> None:
+        super().__init__(message)
+        self.location = location
+
+
+class DefinitionError(SessionError):
+    """Exception raised when a file of definitions is invalid"""
+
+    # number of the invalid line if known
+    line: int | None
+
+    def __init__(self, message: str, line: int | None) -> None:
+        super().__init__(message if line is None else f"line {line}: {message}")
+        self.line = line
+
+
+class Interrupted(SessionError):
+    """Exception raised when an evaluation is stopped by a limit or a keyboard interrupt"""
+
+    # LimitExceeded or KeyboardInterrupt
+    reason: BaseException
+
+    steps: int
+
+    # last term reached by the evaluation
+    term: Term[str]
+
+    def __init__(self, reason: BaseException, steps: int, term: Term[str]) -> None:
+        super().__init__(str(reason) or "interrupted")
+        self.reason = reason
+        self.steps = steps
+        self.term = term
+
+    @classmethod
+    def from_budget(cls, reason: BaseException, budget: Budget) -> Interrupted:
+        """create an instance from the budget of the evaluation"""
+        return cls(reason, budget.steps, budget.term)
+
+
+@dataclass(frozen=True)
+class Evaluation:
+    """result of evaluating a term"""
+
+    # normal form of the term
+    term: Term[str]
+
+    # steps recorded by the engine, 0 if the result was cached
+    steps: int
+
+    cached: bool
+
+
+@dataclass(frozen=True)
+class TraceStep:
+    """step of tracing the evaluation of a term"""
+
+    # number of steps performed including this one
+    number: int
+
+    conversion: Conversion
+
+    before: Term[str]
+
+    after: Term[str]
+
+
+class Session:
+    """
+    State of evaluating lambda terms with aliases
+
+    Operations return terms and results instead of displaying them
+    and raise instances of SessionError if they fail.
+    """
+
+    aliases: Aliases[str]
+
+    transformer: LambdaTransformer
+
+    visitor: Normaliser
+
+    strategy: str
+
+    strategies: dict[str, Callable[[], Normaliser]]
+
+    limits: Limits
+
+    cache: NormalFormCache
+
+    # if arithmetic on church numerals is calculated before evaluating terms
+    arithmetic: bool
+
+    # statistics of the current operation if they are collected
+    statistics: Statistics | None
+
+    # called with the name of a phase to create a context manager surrounding it
+    hooks: list[Callable[[str], AbstractContextManager[Any]]]
+
+    __slots__ = (
+        "aliases",
+        "transformer",
+        "visitor",
+        "strategy",
+        "strategies",
+        "limits",
+        "cache",
+        "arithmetic",
+        "statistics",
+        "hooks"
+    )
+
+    def __init__(
+        self,
+        aliases: Aliases[str],
+        transformer: LambdaTransformer,
+        visitor: Normaliser
+    ) -> None:
+        self.aliases = aliases
+        self.transformer = transformer
+        self.visitor = visitor
+        self.strategy = "normal"
+        self.strategies = STRATEGIES.copy()
+        self.limits = Limits()
+        self.cache = NormalFormCache(128)
+        self.arithmetic = False
+        self.statistics = None
+        self.hooks = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """surround a phase of an operation with the hooks, measuring it for statistics"""
+        with ExitStack() as stack:
+            for hook in self.hooks:
+                stack.enter_context(hook(name))
+            if self.statistics is not None:
+                stack.enter_context(self.statistics.timing(name))
+            yield None
+
+    def parse(self, text: str) -> Term[str]:
+        """parse a term"""
+        try:
+            with self.phase("parse"):
+                return self.transformer.transform_string(text)
+        except UnexpectedInput as error:
+            raise ParseError(text, error) from error
+
+    def import_term(self, location: str) -> Term[str]:
+        """import a term from a module with module.name"""
+        module, _, name = location.strip().rpartition(".")
+        try:
+            term = getattr(import_module(module), name)
+        except Exception as error:  # pylint: disable=W0718
+            raise TermImportError(str(error), location) from error
+        if not isinstance(term, Term):
+            raise TermImportError(f"object {term} is not a lambda term", location)
+        return term
+
+    def invalidate(self, aliases: Iterable[str]) -> None:
+        """remove cached normal forms using aliases which changed"""
+        for alias in aliases:
+            self.cache.invalidate(alias)
+
+    def define(self, alias: str, term: Term[str] | str) -> None:
+        """define an alias, rebuilding the aliases depending on it"""
+        if isinstance(term, str):
+            term = self.parse(term)
+        dependents = self.aliases.dependents(alias)
+        self.aliases[alias] = term
+        self.invalidate((alias, *dependents))
+
+    def import_alias(self, alias: str, location: str) -> Term[str]:
+        """define an alias for a term imported from a module with module.name and return it"""
+        term = self.import_term(location)
+        self.define(alias, term)
+        return term
+
+    def import_all(self, module: str) -> list[str]:
+        """define aliases for all terms exported by a module and return their names"""
+        try:
+            namespace = import_module(module.strip())
+        except Exception as error:  # pylint: disable=W0718
+            raise TermImportError(str(error), module) from error
+        names = getattr(namespace, "__all__", None)
+        if names is None:
+            names = [name for name in vars(namespace) if not name.startswith("_")]
+        definitions = [
+            (name, term)
+            for name in names
+            if isinstance(term := getattr(namespace, name, None), Term)
+        ]
+        self.define_all(definitions)
+        return [name for name, _ in definitions]
+
+    def define_all(self, definitions: Iterable[tuple[str, Term[str]]]) -> None:
+        """define aliases in order as a single batch"""
+        definitions = list(definitions)
+        changed = {alias for alias, _ in definitions}
+        for alias in tuple(changed):
+            if alias in self.aliases:
+                changed.update(self.aliases.dependents(alias))
+        self.aliases.extend(definitions)
+        self.invalidate(changed)
+
+    def parse_definitions(self, lines: Iterable[str]) -> list[tuple[str, Term[str]]]:
+        """parse lines of the form name = term, ignoring empty lines and comments starting with #"""
+        definitions = []
+        with self.phase("parse"):
+            for number, line in enumerate(lines, 1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                alias, equals, text = line.partition("=")
+                alias = alias.strip()
+                if not equals:
+                    raise DefinitionError("missing alias value", number)
+                if not alias or any(c.isspace() or c in RESERVED for c in alias):
+                    raise DefinitionError(f"invalid alias '{alias}'", number)
+                try:
+                    term = self.transformer.transform_string(text)
+                except UnexpectedInput as error:
+                    raise DefinitionError(str(error).strip(), number) from error
+                definitions.append((alias, term))
+        return definitions
+
+    def load_definitions(self, lines: Iterable[str]) -> list[str]:
+        """define the aliases of lines of definitions as a single batch and return their names"""
+        definitions = self.parse_definitions(lines)
+        self.define_all(definitions)
+        return [alias for alias, _ in definitions]
+
+    def delete(self, alias: str) -> None:
+        """delete an alias, raising KeyError if it does not exist"""
+        dependents = self.aliases.dependents(alias)
+        try:
+            del self.aliases[alias]
+        finally:
+            self.invalidate((alias, *dependents))
+
+    def clear(self) -> None:
+        """delete all aliases"""
+        self.aliases.clear()
+        self.cache.clear()
+
+    def save(self, file: BinaryIO) -> None:
+        """write a snapshot of the aliases"""
+        dump_aliases(self.aliases, file)
+
+    def load(self, file: BinaryIO) -> list[str]:
+        """define the aliases of a snapshot or file of definitions and return their names"""
+        data = file.read()
+        if not data.startswith(SNAPSHOT_MAGIC):
+            try:
+                text = data.decode("utf8")
+            except UnicodeDecodeError:
+                raise DefinitionError("file is not a snapshot or text", None) from None
+            return self.load_definitions(text.splitlines())
+        dependents = {alias: self.aliases.dependents(alias) for alias in self.aliases}
+        aliases = load_aliases(self.aliases, BytesIO(data))
+        for alias in aliases:
+            self.invalidate((alias, *dependents.get(alias, ())))
+        return aliases
+
+    def use_strategy(self, strategy: str) -> None:
+        """change the reduction strategy, raising ValueError if it is unknown"""
+        if strategy != self.strategy:
+            try:
+                factory = self.strategies[strategy]
+            except KeyError:
+                raise ValueError(f"unknown strategy {strategy}") from None
+            self.visitor = factory()
+            self.strategy = strategy
+            # normal forms of other strategies are not valid anymore
+            self.cache.clear()
+
+    def use_arithmetic(self, arithmetic: bool) -> None:
+        """change if arithmetic on church numerals is calculated before evaluating terms"""
+        if arithmetic != self.arithmetic:
+            self.arithmetic = arithmetic
+            # arithmetic can change the names of bound variables in normal forms
+            self.cache.clear()
+
+    def accelerates(self) -> bool:
+        """return if arithmetic is calculated, which would also reduce terms under abstractions"""
+        return self.arithmetic and self.strategy in NORMAL_FORMS
+
+    def resolve(self, term: Term[str]) -> tuple[Term[str], Fingerprint | None, Set[str]]:
+        """apply the aliases to a term and return it with its cache key and free variables"""
+        with self.phase("aliases"):
+            # references of lazy aliases have the same key as free variables of the same name
+            dependencies = term.free_variables()
+            term = self.aliases.apply(term)
+        return term, self.cache.key(term), dependencies
+
+    def evaluate(self, term: Term[str] | str) -> Evaluation:
+        """calculate the normal form of a term using the cache"""
+        if isinstance(term, str):
+            term = self.parse(term)
+        term, key, dependencies = self.resolve(term)
+        result = None if key is None else self.cache.get(key)
+        if result is not None:
+            if self.statistics is not None:
+                self.statistics.record_term(result)
+            return Evaluation(result, 0, True)
+        evaluation = self.normalise(term)
+        if key is not None:
+            self.cache.put(key, evaluation.term, dependencies)
+        return evaluation
+
+    def normalise(self, term: Term[str]) -> Evaluation:
+        """calculate the normal form of a term with applied aliases without using the cache"""
+        expands = isinstance(self.visitor, NormalisingVisitor) and self.visitor.expands_references
+        accelerates = self.accelerates()
+        if accelerates or not expands:
+            with self.phase("aliases"):
+                term = self.aliases.expand(term)
+        if accelerates:
+            with self.phase("arithmetic"):
+                # numerals exceeding the size limit are left to the engine
+                size = self.limits.size
+                term = accelerate(term, MAXIMUM if size is None else min(MAXIMUM, (size - 3) // 2))
+        budget = self.limits.start(term)
+        try:
+            with self.phase("normalise"):
+                if self.statistics is None:
+                    result = skip_intermediate(self.visitor, term, budget)
+                else:
+                    result = self.normalise_measured(term, budget, self.statistics)
+        except (LimitExceeded, KeyboardInterrupt) as error:
+            raise Interrupted.from_budget(error, budget) from error
+        return Evaluation(result, budget.steps, False)
+
+    def normalise_measured(
+        self,
+        term: Term[str],
+        budget: Budget,
+        statistics: Statistics
+    ) -> Term[str]:
+        """calculate the normal form of a term, recording its steps in the statistics if possible"""
+        statistics.record_term(term)
+        if isinstance(self.visitor, NormalisingVisitor) and not self.visitor.records_alpha:
+            # engines skipping intermediate steps only record beta reductions in the budget
+            result = self.visitor.skip_intermediate(term, budget)
+            statistics.beta += budget.steps
+        else:
+            result = term
+            for conversion, result in term.accept(self.visitor):
+                budget.step(result)
+                statistics.record_step(conversion, result)
+        statistics.record_term(result)
+        return result
+
+    def trace(self, term: Term[str] | str) -> Iterator[TraceStep]:
+        """generate the steps of evaluating a term while they are performed"""
+        if isinstance(term, str):
+            term = self.parse(term)
+        with self.phase("aliases"):
+            term = self.aliases.expand(self.aliases.apply(term))
+        budget = self.limits.start(term)
+        if self.statistics is not None:
+            self.statistics.record_term(term)
+        previous = term
+        try:
+            with self.phase("normalise"):
+                for conversion, step in term.accept(self.visitor):
+                    budget.step(step)
+                    if self.statistics is not None:
+                        self.statistics.record_step(conversion, step)
+                    yield TraceStep(budget.steps, conversion, previous, step)
+                    previous = step
+        except (LimitExceeded, KeyboardInterrupt) as error:
+            raise Interrupted.from_budget(error, budget) from error
@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+
+"""Statistics about the execution of commands"""
+
+from __future__ import annotations
+import json
+from collections.abc import Iterator
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Any
+from lambda_calculus.terms import Term
+from lambda_calculus.visitors.normalisation import Conversion
+from .interning import size
+from .printing import depth
+
+__all__ = (
+    "Statistics",
+)
+
+
+class Statistics:
+    """statistics about the execution of a command"""
+
+    command: str
+
+    alpha: int
+
+    beta: int
+
+    peak_size: int
+
+    peak_depth: int
+
+    # exclusive time spent in each phase
+    timings: dict[str, float]
+
+    # time spent in phases nested in the running phases
+    nested: list[float]
+
+    __slots__ = (
+        "command",
+        "alpha",
+        "beta",
+        "peak_size",
+        "peak_depth",
+        "timings",
+        "nested"
+    )
+
+    def __init__(self, command: str) -> None:
+        self.command = command
+        self.alpha = 0
+        self.beta = 0
+        self.peak_size = 0
+        self.peak_depth = 0
+        self.timings = {}
+        self.nested = []
+
+    @contextmanager
+    def timing(self, phase: str) -> Iterator[None]:
+        """measure the time spent in a phase, excluding nested phases"""
+        start = perf_counter()
+        self.nested.append(0.0)
+        try:
+            yield None
+        finally:
+            elapsed = perf_counter() - start
+            self.timings[phase] = self.timings.get(phase, 0.0) + elapsed - self.nested.pop()
+            if self.nested:
+                self.nested[-1] += elapsed
+
+    def record_term(self, term: Term[str]) -> None:
+        """update the peak size and depth with an intermediate term"""
+        self.peak_size = max(self.peak_size, size(term))
+        self.peak_depth = max(self.peak_depth, depth(term))
+
+    def record_step(self, conversion: Conversion, term: Term[str]) -> None:
+        """count a step and record the resulting term"""
+        if conversion is Conversion.ALPHA:
+            self.alpha += 1
+        else:
+            self.beta += 1
+        self.record_term(term)
+
+    def merge(self, other: Statistics) -> None:
+        """add the statistics of a part of the command executed elsewhere"""
+        self.alpha += other.alpha
+        self.beta += other.beta
+        self.peak_size = max(self.peak_size, other.peak_size)
+        self.peak_depth = max(self.peak_depth, other.peak_depth)
+        for phase, seconds in other.timings.items():
+            self.timings[phase] = self.timings.get(phase, 0.0) + seconds
+
+    def summary(self) -> dict[str, Any]:
+        """return the statistics as a mapping"""
+        return {
+            "command": self.command,
+            "alpha": self.alpha,
+            "beta": self.beta,
+            "size": self.peak_size,
+            "depth": self.peak_depth,
+            "timings": self.timings.copy()
+        }
+
+    def to_json(self) -> str:
+        """convert the statistics into a single line of JSON"""
+        return json.dumps(self.summary(), ensure_ascii=False)
@@ -0,0 +1,130 @@
+#!/usr/bin/python3
+
+"""Reduction strategies"""
+
+from __future__ import annotations
+from collections.abc import Callable, Iterator
+from typing import Final
+from lambda_calculus.terms import Abstraction, Application, Term, Variable
+from lambda_calculus.visitors.normalisation import BetaNormalisingVisitor, Conversion
+from .debruijn import to_term
+from .graph import read_back, reduce, to_graph
+from .limits import Budget
+from .normalisation import Normaliser, NormalisingVisitor, Step, TracingVisitor
+
+__all__ = (
+    "STRATEGIES",
+    "NORMAL_FORMS",
+    "ApplicativeOrderVisitor",
+    "CallByNameVisitor",
+    "CallByNeedVisitor"
+)
+
+
+class _ReducingVisitor(TracingVisitor):
+    """ABC for visitors performing beta reductions like BetaNormalisingVisitor"""
+
+    __slots__ = ()
+
+    def visit_variable(self, variable: Variable[str]) -> Iterator[Step]:
+        """visit a variable, which is already in normal form"""
+        return iter(())
+
+
+class ApplicativeOrderVisitor(_ReducingVisitor):
+    """
+    Visitor which transforms a term into its beta normal form
+    by reducing the leftmost innermost redex first
+
+    Arguments are normalised before being substituted, which
+    prevents some terms with a normal form from reaching it.
+    """
+
+    __slots__ = ()
+
+    def visit_abstraction(self, abstraction: Abstraction[str]) -> Iterator[Step]:
+        """reduce the body of an abstraction"""
+        for conversion, body in abstraction.body.accept(self):
+            yield (conversion, Abstraction(abstraction.bound, body))
+
+    def visit_application(self, application: Application[str]) -> Iterator[Step]:
+        """reduce the abstraction and argument of an application before reducing it"""
+        abstraction = application.abstraction
+        for conversion, abstraction in abstraction.accept(self):
+            yield (conversion, Application(abstraction, application.argument))
+        argument = application.argument
+        for conversion, argument in argument.accept(self):
+            yield (conversion, Application(abstraction, argument))
+        if isinstance(abstraction, Abstraction):
+            reduced = yield from self.tracer.beta_reducation(abstraction, argument)
+            yield from reduced.accept(self)
+
+
+class CallByNameVisitor(_ReducingVisitor):
+    """
+    Visitor which transforms a term into its weak head normal form
+    by reducing the leftmost outermost redex first
+
+    Abstractions and arguments are not reduced.
+    """
+
+    __slots__ = ()
+
+    def visit_abstraction(self, abstraction: Abstraction[str]) -> Iterator[Step]:
+        """visit an abstraction, which is already in weak head normal form"""
+        return iter(())
+
+    def visit_application(self, application: Application[str]) -> Iterator[Step]:
+        """reduce the abstraction of an application until it can be reduced"""
+        abstraction = application.abstraction
+        for conversion, abstraction in abstraction.accept(self):
+            yield (conversion, Application(abstraction, application.argument))
+        if isinstance(abstraction, Abstraction):
+            reduced = yield from self.tracer.beta_reducation(abstraction, application.argument)
+            yield from reduced.accept(self)
+
+
+class CallByNeedVisitor(NormalisingVisitor):
+    """
+    Visitor which transforms a term into its weak head normal form
+    by reducing a graph whose arguments are shared and reduced at most once
+
+    Intermediate steps are read back into terms, which duplicates shared arguments.
+    """
+
+    records_alpha = False
+
+    __slots__ = ()
+
+    def visit_variable(self, variable: Variable[str]) -> Iterator[Step]:
+        """visit a variable, which is already in weak head normal form"""
+        return iter(())
+
+    def visit_abstraction(self, abstraction: Abstraction[str]) -> Iterator[Step]:
+        """visit an abstraction, which is already in weak head normal form"""
+        return iter(())
+
+    def visit_application(self, application: Application[str]) -> Iterator[Step]:
+        """reduce an application, reading back every step"""
+        root = to_graph(application)
+        for _ in reduce(root):
+            yield (Conversion.BETA, to_term(read_back(root)))
+
+    def skip_intermediate(self, term: Term[str], budget: Budget | None = None) -> Term[str]:
+        """calculate the weak head normal form directly, recording beta reductions in the budget"""
+        root = to_graph(term)
+        for _ in reduce(root):
+            if budget is not None:
+                budget.step()
+        return to_term(read_back(root))
+
+
+STRATEGIES: dict[str, Callable[[], Normaliser]] = {
+    "normal": BetaNormalisingVisitor,
+    "applicative": ApplicativeOrderVisitor,
+    "name": CallByNameVisitor,
+    "need": CallByNeedVisitor
+}
+
+# strategies which calculate beta normal forms instead of weak head normal forms
+NORMAL_FORMS: Final = frozenset(("normal", "applicative"))
@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+
+"""Utilities for summarising the steps of a trace"""
+
+from __future__ import annotations
+from collections.abc import Sequence
+from typing import Any, Final
+from lambda_calculus.terms import Abstraction, Application, Term
+from lambda_calculus.visitors.normalisation import Conversion
+
+__all__ = (
+    "SYMBOLS",
+    "locate",
+    "format_position"
+)
+
+SYMBOLS: Final = {
+    Conversion.ALPHA: "α",
+    Conversion.BETA: "β"
+}
+
+
+def locate(
+    before: Term[Any],
+    after: Term[Any],
+    conversion: Conversion
+) -> tuple[list[int], Term[Any]]:
+    """
+    find the position and subterm of before which was converted into after
+
+    Positions are the indices of the children leading to the subterm,
+    abstractions and arguments being the first and second child of applications.
+    Subterms shared between both terms are assumed to be unchanged.
+    """
+    position: list[int] = []
+    path: list[Term[Any]] = []
+    while before is not after:
+        if isinstance(before, Application) and isinstance(after, Application):
+            if before.abstraction is after.abstraction:
+                index = 1
+            elif before.argument is after.argument:
+                index = 0
+            else:
+                break
+            position.append(index)
+            path.append(before)
+            if index:
+                before, after = before.argument, after.argument
+            else:
+                before, after = before.abstraction, after.abstraction
+        elif (
+            isinstance(before, Abstraction)
+            and isinstance(after, Abstraction)
+            and before.bound == after.bound
+        ):
+            position.append(0)
+            path.append(before)
+            before, after = before.body, after.body
+        else:
+            break
+    if conversion is Conversion.BETA:
+        # the result of a reduction can share a part of the redex
+        while path and not (
+            isinstance(before, Application) and isinstance(before.abstraction, Abstraction)
+        ):
+            before = path.pop()
+            position.pop()
+    return position, before
+
+
+def format_position(position: Sequence[int]) -> str:
+    """convert a position into a path"""
+    return "/" + "/".join(map(str, position))
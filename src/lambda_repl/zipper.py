@@ -0,0 +1,182 @@
+#!/usr/bin/python3
+
+"""Normal order reduction which keeps its position in the term between steps"""
+
+from __future__ import annotations
+from collections.abc import Generator, Iterator
+from typing import Final, NamedTuple, TypeAlias
+from lambda_calculus.terms import Abstraction, Application, Term, Variable
+from lambda_calculus.visitors.normalisation import Conversion
+from lambda_calculus.visitors.substitution.renaming import CountingSubstitution
+from .interning import size
+from .limits import Budget, LimitExceeded
+from .normalisation import NormalisingVisitor, Step
+
+__all__ = (
+    "BODY",
+    "FUNCTION",
+    "ARGUMENT",
+    "Frame",
+    "Path",
+    "plug",
+    "contract",
+    "reduce",
+    "ZipperNormalisingVisitor"
+)
+
+# the hole is the body of an abstraction binding the value of the frame
+BODY: Final = 0
+
+# the hole is the abstraction of an application with the value of the frame as argument
+FUNCTION: Final = 1
+
+# the hole is the argument of an application with the value of the frame as normal abstraction
+ARGUMENT: Final = 2
+
+
+class Frame(NamedTuple):
+    """part of a term enclosing a hole"""
+
+    kind: int
+
+    # name of the variable of abstractions, the other subterm of applications
+    value: str | Term[str]
+
+    parent: Path
+
+
+# persistent path from a subterm to the root, shared by all steps of a reduction
+Path: TypeAlias = "Frame | None"
+
+# step performed on the subterm at a path, with the subterm before and after it
+Contraction: TypeAlias = tuple[Conversion, Term[str], Term[str], Path]
+
+
+def plug(term: Term[str], path: Path) -> Term[str]:
+    """rebuild the whole term from a subterm and the path leading to it"""
+    while path is not None:
+        value = path.value
+        if isinstance(value, str):
+            term = Abstraction(value, term)
+        elif path.kind == FUNCTION:
+            term = Application(term, value)
+        else:
+            term = Application(value, term)
+        path = path.parent
+    return term
+
+
+def contract(abstraction: Abstraction[str], argument: Term[str],
+             path: Path) -> Generator[Contraction, None, Term[str]]:
+    """perform beta reduction of a redex like BetaNormalisingVisitor, yielding alpha conversions"""
+    conversions = abstraction.body.accept(
+        CountingSubstitution.from_substitution(abstraction.bound, argument).trace()
+    )
+    before: Term[str] = Application(abstraction, argument)
+    reduced: Term[str] | None = None
+    while reduced is None:
+        try:
+            body = next(conversions)
+        except StopIteration as stop:
+            reduced = stop.value
+        else:
+            after = Application(Abstraction(abstraction.bound, body), argument)
+            yield (Conversion.ALPHA, before, after, path)
+            before = after
+    yield (Conversion.BETA, before, reduced, path)
+    return reduced
+
+
+def reduce(term: Term[str]) -> Generator[Contraction, None, Term[str]]:
+    """
+    perform normal order reduction, returning the beta normal form
+
+    The search for the next redex continues at the result of the last one,
+    which only has to consider the enclosing applications it is the abstraction of.
+    """
+    focus = term
+    path: Path = None
+    while True:
+        if isinstance(focus, Application):
+            if isinstance(focus.abstraction, Abstraction):
+                focus = yield from contract(focus.abstraction, focus.argument, path)
+                # abstractions can form a redex with the argument of their parent
+                while isinstance(focus, Abstraction) and path is not None and path.kind == FUNCTION:
+                    argument = path.value
+                    assert not isinstance(argument, str)
+                    path = path.parent
+                    focus = yield from contract(focus, argument, path)
+            else:
+                path = Frame(FUNCTION, focus.argument, path)
+                focus = focus.abstraction
+        elif isinstance(focus, Abstraction):
+            path = Frame(BODY, focus.bound, path)
+            focus = focus.body
+        else:
+            # the focus is normal, continue with the next argument
+            while path is not None:
+                frame = path
+                path = frame.parent
+                if isinstance(frame.value, str):
+                    focus = Abstraction(frame.value, focus)
+                elif frame.kind == FUNCTION:
+                    path = Frame(ARGUMENT, focus, path)
+                    focus = frame.value
+                    break
+                else:
+                    focus = Application(frame.value, focus)
+            else:
+                return focus
+
+
+class ZipperNormalisingVisitor(NormalisingVisitor):
+    """
+    Visitor which performs the same steps as BetaNormalisingVisitor
+    while keeping a zipper pointing at the last reduced redex
+
+    Finding the next redex does not search the term from the root
+    and steps are only assembled into whole terms when they are visited.
+    """
+
+    __slots__ = ()
+
+    def visit_variable(self, variable: Variable[str]) -> Iterator[Step]:
+        """visit a variable, which is already in normal form"""
+        return self.steps(variable)
+
+    def visit_abstraction(self, abstraction: Abstraction[str]) -> Iterator[Step]:
+        """reduce the body of an abstraction"""
+        return self.steps(abstraction)
+
+    def visit_application(self, application: Application[str]) -> Iterator[Step]:
+        """reduce an application in normal order"""
+        return self.steps(application)
+
+    def steps(self, term: Term[str]) -> Iterator[Step]:
+        """generate the whole term after every step"""
+        for conversion, _, after, path in reduce(term):
+            yield (conversion, plug(after, path))
+
+    def skip_intermediate(self, term: Term[str], budget: Budget | None = None) -> Term[str]:
+        """calculate the beta normal form directly, recording steps in the budget"""
+        contractions = reduce(term)
+        # sizes are only updated by the difference of the changed subterms
+        total = size(term) if budget is not None and budget.limits.size is not None else None
+        current: tuple[Term[str], Path] = (term, None)
+        try:
+            while True:
+                try:
+                    _, before, after, path = next(contractions)
+                except StopIteration as stop:
+                    result: Term[str] = stop.value
+                    return result
+                if budget is not None:
+                    budget.step()
+                    current = (after, path)
+                    if total is not None:
+                        total += size(after) - size(before)
+                        budget.check_size(total)
+        except (LimitExceeded, KeyboardInterrupt):
+            if budget is not None:
+                budget.term = plug(*current)
+            raise
@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+
+"""Tests for calculating church arithmetic with integers"""
+
+from unittest import TestCase
+from lambda_calculus.terms import Variable, arithmetic
+from lambda_repl import acceleration
+from lambda_repl.debruijn import alpha_equivalent, from_term
+from lambda_repl.normalisation import EvaluatingVisitor
+from .test_normalisation import TRANSFORMER
+
+
+class AccelerationTest(TestCase):
+    """Tests for recognising and calculating church arithmetic"""
+
+    def test_reference(self) -> None:
+        """test results against the normal forms of the combinators"""
+        visitor = EvaluatingVisitor()
+        for name in ("SUCCESSOR", "PREDECESSOR"):
+            for n in range(4):
+                term = getattr(arithmetic, name).apply_to(arithmetic.number(n))
+                with self.subTest(term=str(term)):
+                    result = acceleration.calculate(term)
+                    self.assertIsNotNone(result)
+                    self.assertTrue(alpha_equivalent(
+                        from_term(result),   # type: ignore[arg-type]
+                        from_term(visitor.skip_intermediate(term))
+                    ))
+        for name in ("ADD", "SUBTRACT", "MULTIPLY", "POWER"):
+            for m in range(4):
+                for n in range(4):
+                    term = getattr(arithmetic, name).apply_to(arithmetic.number(m), arithmetic.number(n))
+                    with self.subTest(term=str(term)):
+                        result = acceleration.calculate(term)
+                        normal_form = from_term(visitor.skip_intermediate(term))
+                        if result is None:
+                            self.assertEqual((name, n), ("POWER", 0))
+                        else:
+                            self.assertTrue(alpha_equivalent(from_term(result), normal_form))
+
+    def test_alpha(self) -> None:
+        """test recognising combinators with renamed variables"""
+        term = TRANSFORMER.transform_string(r"(\a.\b.\c.\d.a c (b c d)) (\f.\x.f x) (\g.\y.g (g y))")
+        self.assertEqual(acceleration.accelerate(term), arithmetic.number(3))
+
+    def test_nested(self) -> None:
+        """test calculating nested arithmetic and keeping other terms"""
+        term = Variable("a").apply_to(arithmetic.ADD.apply_to(
+            arithmetic.MULTIPLY.apply_to(arithmetic.number(2), arithmetic.number(3)),
+            arithmetic.SUCCESSOR.apply_to(arithmetic.number(1))
+        ).abstract("x"), arithmetic.ADD.apply_to(Variable("b"), arithmetic.number(1)))
+        self.assertEqual(
+            acceleration.accelerate(term),
+            Variable("a").apply_to(
+                arithmetic.number(8).abstract("x"),
+                arithmetic.ADD.apply_to(Variable("b"), arithmetic.number(1))
+            )
+        )
+
+    def test_mismatch(self) -> None:
+        """test terms not matching exactly being kept"""
+        for term in (
+            arithmetic.ADD.apply_to(arithmetic.number(1)),
+            arithmetic.ADD.apply_to(arithmetic.number(1), Variable("a")),
+            arithmetic.ADD.apply_to(arithmetic.number(1), TRANSFORMER.transform_string(r"\f.\x.f (f y)")),
+            TRANSFORMER.transform_string(r"(\m.\n.\f.\x.n f (m f x)) (\f.\x.f x) (\f.\x.x)"),
+            arithmetic.POWER.apply_to(arithmetic.number(2), arithmetic.number(0)),
+            arithmetic.POWER.apply_to(arithmetic.number(2), arithmetic.number(10))
+        ):
+            with self.subTest(term=str(term)):
+                self.assertIs(acceleration.accelerate(term, 1000), term)
+        self.assertEqual(
+            acceleration.accelerate(arithmetic.POWER.apply_to(arithmetic.number(2), arithmetic.number(10))),
+            arithmetic.number(1024)
+        )
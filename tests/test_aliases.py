@@ -3,7 +3,7 @@
 """Tests for alias implementations"""
 
 from unittest import TestCase
-from lambda_calculus.terms import Variable
+from lambda_calculus.terms import Abstraction, Variable
 from lambda_calculus.visitors.substitution.renaming import CountingSubstitution
 from lambda_repl import aliases
 
@@ -39,7 +39,7 @@ class LetAliasesTest(TestCase):
         self.assertEqual(
             list(self.aliases.items()),
             [
-                ("b", Variable("1").apply_to(Variable("c"))),
+                ("b", Variable("2").apply_to(Variable("c"))),
                 ("a", Variable("2"))
             ]
         )
@@ -55,7 +55,7 @@ class LetAliasesTest(TestCase):
                 Variable("a").apply_to(Variable("b"), Variable("c"))
             ),
             Variable("2").apply_to(
-                Variable("1").apply_to(Variable("c")), Variable("3")
+                Variable("2").apply_to(Variable("c")), Variable("3")
             )
         )
 
@@ -66,3 +66,289 @@ class LetAliasesTest(TestCase):
             self.aliases["a"],
             Variable("a").apply_to(Variable("b"))
         )
+
+    def test_capture(self) -> None:
+        """test renaming bound variables which would capture free variables of aliases"""
+        self.aliases["a"] = Variable("y")
+        self.aliases["b"] = Variable("z")
+        self.assertEqual(
+            self.aliases.apply(Variable("a").apply_to(Variable("y"), Variable("b")).abstract("y")),
+            Variable("y").apply_to(Variable("y1"), Variable("z")).abstract("y1")
+        )
+        self.assertEqual(
+            self.aliases.apply(Variable("b").apply_to(Variable("y")).abstract("y")),
+            Variable("z").apply_to(Variable("y")).abstract("y")
+        )
+
+    def test_shadowing(self) -> None:
+        """test not substituting bound variables"""
+        self.aliases["a"] = Variable("1")
+        self.aliases["b"] = Variable("2")
+        self.assertEqual(
+            self.aliases.apply(
+                Variable("a").apply_to(Variable("b")).abstract("a").apply_to(Variable("a"))
+            ),
+            Variable("a").apply_to(Variable("2")).abstract("a").apply_to(Variable("1"))
+        )
+
+    def test_unused(self) -> None:
+        """test terms without aliases being returned unchanged"""
+        for i in range(100):
+            self.aliases[str(i)] = Variable("x").abstract("x")
+        term = self.aliases.apply(Variable("a").apply_to(Variable("b")).abstract("a"))
+        self.assertIs(self.aliases.apply(term), term)
+
+    def test_deep(self) -> None:
+        """test applying aliases to terms exceeding the recursion limit"""
+        self.aliases["a"] = Variable("1")
+        term = Variable("a")
+        for _ in range(10000):
+            term = Abstraction("x", term)
+        result = self.aliases.apply(term)
+        for _ in range(10000):
+            result = result.body    # type: ignore[attr-defined]
+        self.assertEqual(result, Variable("1"))
+
+    def test_delete(self) -> None:
+        """test deleting aliases"""
+        self.aliases["a"] = Variable("y")
+        del self.aliases["a"]
+        self.assertEqual(self.aliases.captures, {})
+        self.assertEqual(
+            self.aliases.apply(Variable("a").abstract("y")),
+            Variable("a").abstract("y")
+        )
+
+    def test_dependencies(self) -> None:
+        """test tracking the aliases used by definitions"""
+        self.aliases["a"] = Variable("1")
+        self.aliases["b"] = Variable("c").apply_to(Variable("a"))
+        self.aliases["c"] = Variable("b").apply_to(Variable("a"))
+        self.aliases["d"] = Variable("c").abstract("c")
+        self.assertEqual(self.aliases.dependencies("a"), [])
+        self.assertEqual(self.aliases.dependencies("c"), ["a", "b"])
+        self.assertEqual(self.aliases.dependencies("d"), [])
+        self.assertEqual(self.aliases.dependents("a"), ["b", "c"])
+        self.assertEqual(self.aliases.dependents("b"), ["c"])
+        self.assertEqual(self.aliases.dependents("c"), [])
+
+    def test_rebuild(self) -> None:
+        """test rebuilding dependents at their position"""
+        self.aliases["a"] = Variable("1")
+        self.aliases["b"] = Variable("a").apply_to(Variable("y")).abstract("y")
+        self.aliases["c"] = Variable("b").apply_to(Variable("a"))
+        self.aliases["a"] = Variable("y")
+        self.assertEqual(
+            list(self.aliases.items()),
+            [
+                ("b", Variable("y").apply_to(Variable("y1")).abstract("y1")),
+                ("c", Variable("y").apply_to(Variable("y1")).abstract("y1").apply_to(Variable("y"))),
+                ("a", Variable("y"))
+            ]
+        )
+        self.assertEqual(self.aliases.captures, {"y": {"a", "b", "c"}})
+
+    def test_rebuild_order(self) -> None:
+        """test free variables of rebuilt aliases not being replaced by earlier aliases"""
+        for alias, term in (
+            ("C", Variable("c")),
+            ("A", Variable("B").apply_to(Variable("C")).abstract("z")),
+            ("B", Variable("b")),
+            ("C", Variable("c2"))
+        ):
+            self.aliases[alias] = term
+        expected = Variable("B").apply_to(Variable("c2")).abstract("z")
+        self.assertEqual(self.aliases.apply(Variable("A").abstract("y")), expected.abstract("y"))
+        self.assertEqual(self.aliases.apply(Variable("A").abstract("B")), expected.abstract("B1"))
+        self.aliases["D"] = Variable("A")
+        self.aliases["A"] = Variable("C")
+        self.aliases["C"] = Variable("c3")
+        self.assertEqual(self.aliases["D"], Variable("c3"))
+
+    def test_rebuild_self_reference(self) -> None:
+        """test rebuilding aliases which used their earlier value"""
+        for alias, term in (
+            ("A", Variable("a")),
+            ("X", Variable("z").abstract("z")),
+            ("X", Variable("X").apply_to(Variable("A"))),
+            ("A", Variable("b"))
+        ):
+            self.aliases[alias] = term
+        self.assertEqual(self.aliases["X"], Variable("z").abstract("z").apply_to(Variable("b")))
+        self.assertEqual(self.aliases.source("X")[1], Variable("z").abstract("z"))
+        del self.aliases["A"]
+        self.assertEqual(self.aliases["X"], Variable("z").abstract("z").apply_to(Variable("A")))
+
+    def test_extend(self) -> None:
+        """test setting aliases as a batch like one after another"""
+        other = aliases.LetAliases(CountingSubstitution)
+        for alias, term in (
+            ("a", Variable("1")),
+            ("b", Variable("a").apply_to(Variable("x"))),
+            ("c", Variable("b").apply_to(Variable("y")))
+        ):
+            self.aliases[alias] = term
+            other[alias] = term
+        definitions = [
+            ("a", Variable("2")),
+            ("d", Variable("b")),
+            ("a", Variable("3")),
+            ("e", Variable("d").apply_to(Variable("c")))
+        ]
+        self.aliases.extend(definitions)
+        for alias, term in definitions:
+            other[alias] = term
+        self.assertEqual(list(self.aliases.items()), list(other.items()))
+        self.assertEqual(self.aliases["d"], Variable("3").apply_to(Variable("x")))
+        self.assertEqual(self.aliases.dependents("a"), ["b", "c", "d", "e"])
+
+    def test_delete_dependency(self) -> None:
+        """test rebuilding dependents of deleted aliases"""
+        self.aliases["a"] = Variable("1")
+        self.aliases["b"] = Variable("a").apply_to(Variable("c"))
+        del self.aliases["a"]
+        self.assertEqual(list(self.aliases.items()), [("b", Variable("a").apply_to(Variable("c")))])
+        self.assertEqual(self.aliases.dependencies("b"), [])
+        self.aliases["a"] = Variable("2")
+        self.assertEqual(self.aliases["b"], Variable("a").apply_to(Variable("c")))
+
+    def test_cycle(self) -> None:
+        """test redefining aliases to use their dependents"""
+        self.aliases["a"] = Variable("1")
+        self.aliases["b"] = Variable("a").apply_to(Variable("x"))
+        self.aliases["a"] = Variable("b").apply_to(Variable("y"))
+        self.assertEqual(self.aliases["a"], Variable("1").apply_to(Variable("x"), Variable("y")))
+        self.assertEqual(self.aliases["b"], Variable("1").apply_to(Variable("x"), Variable("y"), Variable("x")))
+        self.aliases["b"] = Variable("2")
+        self.assertEqual(self.aliases["a"], Variable("2").apply_to(Variable("y")))
+        self.assertEqual(self.aliases.dependents("a"), [])
+
+    def test_clear(self) -> None:
+        """test removing all aliases"""
+        self.aliases["a"] = Variable("y")
+        self.aliases["b"] = Variable("a")
+        self.aliases.clear()
+        self.assertEqual(len(self.aliases), 0)
+        self.assertEqual(
+            (self.aliases.captures, self.aliases.sources, self.aliases.uses, self.aliases.users),
+            ({}, {}, {}, {})
+        )
+
+    def test_fork(self) -> None:
+        """test sharing definitions until they change"""
+        self.aliases["a"] = Variable("y")
+        self.aliases["b"] = Variable("a")
+        fork = self.aliases.fork()
+        self.assertIs(fork.aliases, self.aliases.aliases)
+        fork["a"] = Variable("z")
+        del self.aliases["b"]
+        self.assertEqual(dict(fork), {"a": Variable("z"), "b": Variable("z")})
+        self.assertEqual(dict(self.aliases), {"a": Variable("y")})
+        self.assertEqual(fork.captures, {"z": {"a", "b"}})
+        self.assertEqual(self.aliases.captures, {"y": {"a"}})
+        fork.clear()
+        self.assertEqual(dict(self.aliases), {"a": Variable("y")})
+
+
+class LazyAliasesTest(TestCase):
+    """Test for alias implementation keeping references"""
+
+    aliases: aliases.LazyAliases[str]
+
+    def setUp(self) -> None:
+        """create empty aliases"""
+        self.aliases = aliases.LazyAliases(CountingSubstitution)
+
+    def test_set(self) -> None:
+        """test storing references to other aliases"""
+        self.aliases["a"] = Variable("1")
+        self.aliases["b"] = Variable("a").apply_to(Variable("c"))
+        reference = self.aliases["b"].abstraction    # type: ignore[attr-defined]
+        self.assertIsInstance(reference, aliases.Reference)
+        self.assertIs(reference.definition, self.aliases.definitions["a"])
+        self.assertEqual(str(self.aliases["b"]), "(a c)")
+
+    def test_override(self) -> None:
+        """test overriding aliases"""
+        self.aliases["a"] = Variable("1")
+        self.aliases["b"] = Variable("a").apply_to(Variable("c"))
+        self.aliases["a"] = Variable("2")
+        self.assertEqual(list(self.aliases), ["b", "a"])
+        self.assertEqual(
+            self.aliases.expand(self.aliases.apply(Variable("a").apply_to(Variable("b")))),
+            Variable("2").apply_to(Variable("2").apply_to(Variable("c")))
+        )
+
+    def test_expand(self) -> None:
+        """test expanding references like LetAliases"""
+        let_aliases = aliases.LetAliases(CountingSubstitution)
+        for alias, term in (
+            ("a", Variable("y")),
+            ("b", Variable("a").apply_to(Variable("y")).abstract("y")),
+            ("c", Variable("b").apply_to(Variable("a"), Variable("b"))),
+            ("y", Variable("c").abstract("a"))
+        ):
+            self.aliases[alias] = term
+            let_aliases[alias] = term
+        term = Variable("y").apply_to(Variable("c"), Variable("x").abstract("a"))
+        self.assertEqual(
+            self.aliases.expand(self.aliases.apply(term)),
+            let_aliases.apply(term)
+        )
+
+    def test_delete(self) -> None:
+        """test deleting aliases used by other aliases"""
+        self.aliases["a"] = Variable("1")
+        self.aliases["b"] = Variable("a")
+        del self.aliases["a"]
+        self.assertEqual(
+            self.aliases.expand(self.aliases.apply(Variable("a").apply_to(Variable("b")))),
+            Variable("a").apply_to(Variable("a"))
+        )
+        self.assertNotIsInstance(self.aliases["b"], aliases.Reference)
+
+    def test_rebind(self) -> None:
+        """test references following redefinitions like LetAliases"""
+        let_aliases = aliases.LetAliases(CountingSubstitution)
+        for alias, term in (
+            ("a", Variable("x")),
+            ("b", Variable("a").apply_to(Variable("y")).abstract("y")),
+            ("c", Variable("b").apply_to(Variable("a"))),
+            ("a", Variable("a").apply_to(Variable("z"))),
+            ("b", Variable("a").abstract("y")),
+            ("x", Variable("z").abstract("z")),
+            ("x", Variable("x").apply_to(Variable("a"))),
+            ("a", Variable("d")),
+            ("e", Variable("B").apply_to(Variable("a")).abstract("z")),
+            ("B", Variable("f")),
+            ("a", Variable("g"))
+        ):
+            self.aliases[alias] = term
+            let_aliases[alias] = term
+        self.assertEqual(list(self.aliases), list(let_aliases))
+        for alias in let_aliases:
+            with self.subTest(alias=alias):
+                self.assertEqual(self.aliases.expand(self.aliases[alias]), let_aliases[alias])
+                self.assertEqual(self.aliases.dependents(alias), let_aliases.dependents(alias))
+
+    def test_dependencies(self) -> None:
+        """test listing references to current definitions"""
+        self.aliases["a"] = Variable("1")
+        self.aliases["b"] = Variable("a")
+        self.aliases["c"] = Variable("b").apply_to(Variable("a"))
+        self.aliases["a"] = Variable("2")
+        self.assertEqual(self.aliases.dependencies("c"), ["b", "a"])
+        self.assertEqual(self.aliases.dependents("b"), ["c"])
+        self.assertEqual(self.aliases.dependents("a"), ["b", "c"])
+
+    def test_fork(self) -> None:
+        """test sharing definitions until they change"""
+        self.aliases["a"] = Variable("1")
+        fork = self.aliases.fork()
+        fork["b"] = Variable("a")
+        self.aliases["a"] = Variable("2")
+        self.assertEqual(list(self.aliases), ["a"])
+        self.assertEqual(
+            fork.expand(fork.apply(Variable("b").apply_to(Variable("a")))),
+            Variable("1").apply_to(Variable("1"))
+        )
@@ -0,0 +1,62 @@
+#!/usr/bin/python3
+
+"""Tests for the normal form cache"""
+
+from unittest import TestCase
+from lambda_calculus.terms import Variable
+from lambda_repl import cache
+
+
+class NormalFormCacheTest(TestCase):
+    """Test for the LRU cache of normal forms"""
+
+    cache: cache.NormalFormCache
+
+    def setUp(self) -> None:
+        """create a small cache"""
+        self.cache = cache.NormalFormCache(2)
+
+    def test_alpha_equivalence(self) -> None:
+        """test alpha equivalent terms sharing entries"""
+        key = self.cache.key(Variable("x").apply_to(Variable("y")).abstract("x"))
+        assert key is not None
+        self.cache.put(key, Variable("y"), ())
+        self.assertEqual(
+            self.cache.key(Variable("z").apply_to(Variable("y")).abstract("z")),
+            key
+        )
+        self.assertNotEqual(
+            self.cache.key(Variable("y").apply_to(Variable("y")).abstract("z")),
+            key
+        )
+        self.assertEqual(self.cache.get(key), Variable("y"))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 0))
+
+    def test_eviction(self) -> None:
+        """test removing least recently used entries"""
+        keys = [self.cache.key(Variable(name)) for name in "abc"]
+        self.cache.put(keys[0], Variable("1"), ())    # type: ignore[arg-type]
+        self.cache.put(keys[1], Variable("2"), ())    # type: ignore[arg-type]
+        self.cache.get(keys[0])     # type: ignore[arg-type]
+        self.cache.put(keys[2], Variable("3"), ())    # type: ignore[arg-type]
+        self.assertEqual(len(self.cache), 2)
+        self.assertIsNone(self.cache.get(keys[1]))  # type: ignore[arg-type]
+        self.assertEqual(self.cache.get(keys[0]), Variable("1"))     # type: ignore[arg-type]
+        self.cache.resize(1)
+        self.assertEqual(len(self.cache), 1)
+
+    def test_invalidate(self) -> None:
+        """test removing entries depending on aliases"""
+        keys = [self.cache.key(Variable(name)) for name in "ab"]
+        self.cache.put(keys[0], Variable("1"), {"A", "B"})  # type: ignore[arg-type]
+        self.cache.put(keys[1], Variable("2"), {"B"})   # type: ignore[arg-type]
+        self.cache.invalidate("A")
+        self.assertEqual(len(self.cache), 1)
+        self.cache.invalidate("B")
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.dependents, {})
+
+    def test_disabled(self) -> None:
+        """test disabling the cache"""
+        self.cache.resize(0)
+        self.assertIsNone(self.cache.key(Variable("a")))
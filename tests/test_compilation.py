@@ -0,0 +1,135 @@
+#!/usr/bin/python3
+
+"""Tests for compiled evaluation"""
+
+from unittest import TestCase
+from lambda_calculus.terms import Abstraction, Variable, arithmetic, combinators
+from lambda_repl import compilation
+from lambda_repl.debruijn import alpha_equivalent, from_term
+from lambda_repl.limits import Limits, LimitExceeded
+from lambda_repl.normalisation import EvaluatingVisitor
+from .test_normalisation import CORPUS, TRANSFORMER
+
+
+class CompilerTest(TestCase):
+    """Test for the compiler"""
+
+    compiler: compilation.Compiler
+
+    def setUp(self) -> None:
+        """create the compiler"""
+        self.compiler = compilation.Compiler(maxsize=2)
+
+    def test_generate(self) -> None:
+        """test the generated source"""
+        self.compiler.function(Abstraction("z", Variable("z")))
+        lines, names, constants = self.compiler.generate(Abstraction("x", Abstraction(
+            "y",
+            Variable("x").apply_to(Variable("y").apply_to(Variable("y")), Abstraction("z", Variable("z")))
+        )))
+        self.assertEqual(names, ["x", "y"])
+        self.assertEqual(len(constants), 1)
+        self.assertEqual(
+            lines,
+            [
+                "def make(c0):",
+                "    def f0(v0):",
+                "        tick()",
+                "        def f1(v1):",
+                "            tick()",
+                "            def t0():",
+                "                return v1.force()(v1)",
+                "            return v0.force()(Promise(t0))(c0)",
+                "        return f1",
+                "    return f0"
+            ]
+        )
+
+    def test_cache(self) -> None:
+        """test caching the functions of the most recently used abstractions"""
+        function = self.compiler.function(combinators.I)
+        self.assertIs(self.compiler.function(Abstraction("x", Variable("x"))), function)
+        self.compiler.function(combinators.K)
+        self.compiler.function(combinators.S)
+        self.assertEqual(len(self.compiler.functions), 2)
+        self.assertIsNot(self.compiler.function(combinators.I), function)
+
+    def test_free(self) -> None:
+        """test rejecting open terms"""
+        with self.assertRaises(compilation.CompilationError):
+            self.compiler.evaluate(TRANSFORMER.transform_string(r"a (\x.x)"))
+
+    def test_nesting(self) -> None:
+        """test rejecting abstractions which are too deeply nested"""
+        term = Abstraction("x", Variable("x"))
+        for _ in range(1000):
+            term = Abstraction("x", term)
+        with self.assertRaises(compilation.CompilationError):
+            self.compiler.function(term)
+        with self.assertRaises(compilation.CompilationError):
+            self.compiler.function(term)
+
+
+class CompilingVisitorTest(TestCase):
+    """Test for the compiling normalisation engine"""
+
+    visitor: compilation.CompilingVisitor
+
+    reference: EvaluatingVisitor
+
+    def setUp(self) -> None:
+        """create the engines"""
+        self.visitor = compilation.CompilingVisitor()
+        self.reference = EvaluatingVisitor()
+
+    def test_corpus(self) -> None:
+        """test normal forms against the evaluating engine"""
+        for term in CORPUS:
+            with self.subTest(term=str(term)):
+                self.assertTrue(alpha_equivalent(
+                    from_term(self.visitor.skip_intermediate(term)),
+                    from_term(self.reference.skip_intermediate(term))
+                ))
+
+    def test_factorial(self) -> None:
+        """test recursion with a fixed point combinator"""
+        body = arithmetic.ISZERO.apply_to(Variable("n"), arithmetic.number(1), arithmetic.MULTIPLY.apply_to(
+            Variable("n"),
+            Variable("f").apply_to(arithmetic.PREDECESSOR.apply_to(Variable("n")))
+        ))
+        term = combinators.Y.apply_to(Abstraction("f", Abstraction("n", body)), arithmetic.number(3))
+        self.assertTrue(alpha_equivalent(
+            from_term(self.visitor.skip_intermediate(term)),
+            from_term(arithmetic.number(6))
+        ))
+
+    def test_names(self) -> None:
+        """test keeping the names of bound variables"""
+        term = TRANSFORMER.transform_string(r"(\a.\b.a) (\c.c)")
+        self.assertEqual(
+            self.visitor.skip_intermediate(term),
+            TRANSFORMER.transform_string(r"\b.\c.c")
+        )
+
+    def test_limits(self) -> None:
+        """test steps and sizes being limited"""
+        budget = Limits(steps=100).start(combinators.OMEGA)
+        with self.assertRaises(LimitExceeded):
+            self.visitor.skip_intermediate(combinators.OMEGA, budget)
+        self.assertEqual(budget.steps, 100)
+        term = arithmetic.POWER.apply_to(arithmetic.number(2), arithmetic.number(8))
+        budget = Limits(size=100).start(term)
+        with self.assertRaises(LimitExceeded):
+            self.visitor.skip_intermediate(term, budget)
+
+    def test_fallback(self) -> None:
+        """test terms which can not be compiled being evaluated"""
+        term = TRANSFORMER.transform_string(r"(\x.x) a")
+        self.assertEqual(self.visitor.skip_intermediate(term), Variable("a"))
+        nested = Abstraction("x", Variable("x"))
+        for _ in range(1000):
+            nested = Abstraction("x", nested)
+        self.assertTrue(alpha_equivalent(
+            from_term(self.visitor.skip_intermediate(nested.apply_to(nested))),
+            from_term(self.reference.skip_intermediate(nested.apply_to(nested)))
+        ))
@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+
+"""Tests for the nameless term representation"""
+
+from unittest import TestCase
+from lambda_calculus.terms import Variable, Abstraction
+from lambda_repl import debruijn
+
+
+class DeBruijnTest(TestCase):
+    """Test for conversions between terms and nameless terms"""
+
+    def test_from_term(self) -> None:
+        """test converting terms"""
+        self.assertEqual(
+            debruijn.from_term(
+                Variable("x").apply_to(Variable("y"), Variable("z")).abstract("x", "y")
+            ),
+            (
+                debruijn.ABSTRACTION,
+                "x",
+                (
+                    debruijn.ABSTRACTION,
+                    "y",
+                    (debruijn.APPLICATION, (debruijn.APPLICATION, 1, 0), "z")
+                )
+            )
+        )
+
+    def test_shadowing(self) -> None:
+        """test converting terms with shadowed variables"""
+        self.assertEqual(
+            debruijn.from_term(
+                Variable("x").apply_to(Variable("x").abstract("x")).abstract("x")
+            ),
+            (
+                debruijn.ABSTRACTION,
+                "x",
+                (debruijn.APPLICATION, 0, (debruijn.ABSTRACTION, "x", 0))
+            )
+        )
+
+    def test_context(self) -> None:
+        """test converting terms with variables bound outside"""
+        self.assertEqual(
+            debruijn.from_term(
+                Variable("a").apply_to(Variable("b"), Variable("c")).abstract("x"),
+                ("a", "b")
+            ),
+            (
+                debruijn.ABSTRACTION,
+                "x",
+                (debruijn.APPLICATION, (debruijn.APPLICATION, 2, 1), "c")
+            )
+        )
+
+    def test_round_trip(self) -> None:
+        """test converting nameless terms back"""
+        term = Variable("x") \
+            .apply_to(Variable("y"), Abstraction("x", Variable("x"))) \
+            .abstract("x", "x")
+        self.assertEqual(debruijn.to_term(debruijn.from_term(term)), term)
+
+    def test_renaming(self) -> None:
+        """test renaming bound variables which would capture variables"""
+        self.assertEqual(
+            debruijn.to_term((debruijn.ABSTRACTION, "y", (debruijn.APPLICATION, "y", 0))),
+            Variable("y").apply_to(Variable("y1")).abstract("y1")
+        )
+        self.assertEqual(
+            debruijn.to_term(
+                (debruijn.ABSTRACTION, "x", (debruijn.ABSTRACTION, "x", (debruijn.APPLICATION, 1, 0)))
+            ),
+            Variable("x").apply_to(Variable("x1")).abstract("x", "x1")
+        )
+
+    def test_deep(self) -> None:
+        """test converting terms exceeding the recursion limit"""
+        term = Variable("x")
+        for _ in range(10000):
+            term = Abstraction("x", Variable("f").apply_to(term))
+        nameless = debruijn.from_term(term)
+        self.assertTrue(debruijn.alpha_equivalent(
+            debruijn.from_term(debruijn.to_term(nameless)),
+            nameless
+        ))
+
+    def test_alpha_equivalent(self) -> None:
+        """test checking alpha equivalence"""
+        self.assertTrue(debruijn.alpha_equivalent(
+            debruijn.from_term(Variable("x").apply_to(Variable("z")).abstract("x")),
+            debruijn.from_term(Variable("y").apply_to(Variable("z")).abstract("y"))
+        ))
+        self.assertFalse(debruijn.alpha_equivalent(
+            debruijn.from_term(Variable("x").apply_to(Variable("z")).abstract("x")),
+            debruijn.from_term(Variable("z").apply_to(Variable("z")).abstract("y"))
+        ))
+        self.assertFalse(debruijn.alpha_equivalent(
+            debruijn.from_term(Variable("x").abstract("x")),
+            debruijn.from_term(Variable("x"))
+        ))
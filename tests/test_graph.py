@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+
+"""Tests for graph reduction"""
+
+from unittest import TestCase
+from lambda_calculus.terms import Variable, arithmetic
+from lambda_calculus.visitors.normalisation import BetaNormalisingVisitor
+from lambda_repl import graph
+from lambda_repl.debruijn import alpha_equivalent, from_term
+from lambda_repl.limits import Limits
+from .test_normalisation import CORPUS, TRANSFORMER
+
+
+class GraphTest(TestCase):
+    """Test for term graphs"""
+
+    def test_round_trip(self) -> None:
+        """test converting terms into graphs and back"""
+        for term in CORPUS:
+            with self.subTest(term=str(term)):
+                self.assertEqual(graph.read_back(graph.to_graph(term)), from_term(term))
+
+    def test_instantiate(self) -> None:
+        """test sharing nodes not containing the parameter"""
+        root = graph.to_graph(TRANSFORMER.transform_string(r"\x.(a b) (\y.y x) (\z.z)"))
+        argument = graph.Node(graph.VARIABLE, "c")
+        result = graph.instantiate(root, argument)
+        self.assertEqual(
+            graph.read_back(result),
+            from_term(TRANSFORMER.transform_string(r"(a b) (\y.y c) (\z.z)"))
+        )
+        self.assertIs(result.second, root.second.second)
+        self.assertIs(result.first.first, root.second.first.first)
+        self.assertIsNot(result.first.second.first, root.second.first.second.first)
+
+    def test_capture(self) -> None:
+        """test copied abstractions not capturing parameters of shared abstractions"""
+        term = TRANSFORMER.transform_string(r"(\f.f (f a)) (\x.\y.x y) b")
+        root = graph.to_graph(term)
+        for _ in graph.normalise(root):
+            pass
+        self.assertEqual(graph.read_back(root), from_term(TRANSFORMER.transform_string("a b")))
+
+
+class GraphReducingVisitorTest(TestCase):
+    """Test for the graph reducing normalisation engine"""
+
+    visitor: graph.GraphReducingVisitor
+
+    reference: BetaNormalisingVisitor
+
+    def setUp(self) -> None:
+        """create the engines"""
+        self.visitor = graph.GraphReducingVisitor()
+        self.reference = BetaNormalisingVisitor()
+
+    def test_corpus(self) -> None:
+        """test normal forms against the reference implementation"""
+        for term in CORPUS:
+            with self.subTest(term=str(term)):
+                self.assertTrue(alpha_equivalent(
+                    from_term(self.visitor.skip_intermediate(term)),
+                    from_term(self.reference.skip_intermediate(term))
+                ))
+
+    def test_tower(self) -> None:
+        """test normal forms of exponentially growing terms"""
+        term = TRANSFORMER.transform_string(r"(\f.\x.f (f x)) (\f.\x.f (f x)) (\f.\x.f (f x))")
+        self.assertTrue(alpha_equivalent(
+            from_term(self.visitor.skip_intermediate(term)),
+            from_term(arithmetic.number(16))
+        ))
+
+    def test_full_laziness(self) -> None:
+        """test reducing parts of abstractions not depending on their parameter once"""
+        term = TRANSFORMER.transform_string(r"(\f.f (f (f a))) (\x.(\g.g g) (\y.y) x)")
+        budget = Limits().start(term)
+        self.assertEqual(self.visitor.skip_intermediate(term, budget), Variable("a"))
+        self.assertEqual(budget.steps, 9)
+
+    def test_trace(self) -> None:
+        """test tracing being delegated"""
+        term = TRANSFORMER.transform_string(r"(\x.\y.x) a b")
+        self.assertEqual(
+            list(term.accept(self.visitor)),
+            list(term.accept(self.reference))
+        )
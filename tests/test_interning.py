@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+
+"""Tests for hash-consed terms"""
+
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+from lambda_calculus.terms import Variable, Abstraction, Application
+from lambda_repl import interning
+
+
+class InterningTest(TestCase):
+    """Test for sharing equal terms"""
+
+    def test_sharing(self) -> None:
+        """test equal terms being identical"""
+        first = interning.application(
+            interning.abstraction("x", interning.variable("x")),
+            interning.variable("y")
+        )
+        second = interning.intern_term(Application(Abstraction("x", Variable("x")), Variable("y")))
+        self.assertIs(first, second)
+        self.assertIs(first.argument, interning.variable("y"))
+        self.assertTrue(interning.is_interned(first))
+
+    def test_equality(self) -> None:
+        """test equality with terms which are not shared"""
+        plain = Variable("a").apply_to(Variable("b")).abstract("a")
+        interned = interning.intern_term(plain)
+        self.assertEqual(interned, plain)
+        self.assertEqual(plain, interned)
+        self.assertNotEqual(interned, Variable("a").apply_to(Variable("c")).abstract("a"))
+        self.assertNotEqual(interned, interning.intern_term(Variable("a")))
+        self.assertEqual(hash(interned), hash(plain))
+        self.assertEqual({plain: 1}[interned], 1)
+
+    def test_threads(self) -> None:
+        """test threads interning equal terms at the same time"""
+        # consecutive copies of equal terms are interned by different threads
+        terms = [
+            Variable("a").apply_to(Variable(f"b{index}")).abstract("a")
+            for index in range(1000)
+            for _ in range(8)
+        ]
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(interning.intern_term, terms))
+        for index in range(0, len(results), 8):
+            self.assertTrue(all(term is results[index] for term in results[index:index + 8]))
+
+    def test_size(self) -> None:
+        """test cached sizes"""
+        plain = Variable("a").apply_to(Variable("b"), Variable("c").abstract("c"))
+        interned = interning.intern_term(plain)
+        self.assertEqual(interning.size(plain), 6)
+        self.assertEqual(interning.size(interned), 6)
+        self.assertEqual(interning.size(Application(interned, plain)), 13)
+
+    def test_deep(self) -> None:
+        """test interning terms exceeding the recursion limit"""
+        term = Variable("x")
+        for _ in range(10000):
+            term = Abstraction("x", term)
+        interned = interning.intern_term(term)
+        self.assertEqual(interning.size(interned), 10001)
+        self.assertIs(interning.intern_term(term), interned)
+
+    def test_free_variables(self) -> None:
+        """test cached free variables"""
+        plain = Variable("a").apply_to(Variable("b"), Variable("c").apply_to(Variable("a")).abstract("c"))
+        interned = interning.intern_term(plain)
+        self.assertEqual(interned.free_variables(), {"a", "b"})
+        self.assertIs(interned.free_variables(), interned.abstraction.free_variables())
+        self.assertEqual(interned.argument.free_variables(), {"a"})
+        term = interning.variable("x")
+        for _ in range(10000):
+            term = interning.application(interning.variable("f"), term)
+        self.assertEqual(term.free_variables(), {"f", "x"})
+
+    def test_pickle(self) -> None:
+        """test pickling preserving sharing"""
+        term = interning.intern_term(Variable("a").apply_to(Variable("b")))
+        self.assertIs(pickle.loads(pickle.dumps(term)), term)
@@ -0,0 +1,52 @@
+#!/usr/bin/python3
+
+"""Tests for evaluation limits"""
+
+from unittest import TestCase
+from lambda_calculus.terms import Variable, combinators
+from lambda_repl import limits
+from lambda_repl.normalisation import EvaluatingVisitor
+
+
+class BudgetTest(TestCase):
+    """Test for tracking resources used by evaluations"""
+
+    def test_steps(self) -> None:
+        """test the step limit"""
+        budget = limits.Limits(steps=2).start(Variable("a"))
+        budget.step(Variable("b"))
+        budget.step(Variable("c"))
+        with self.assertRaises(limits.LimitExceeded) as context:
+            budget.step(Variable("d"))
+        self.assertIs(context.exception.budget, budget)
+        self.assertEqual(budget.steps, 2)
+        self.assertEqual(budget.term, Variable("c"))
+
+    def test_timeout(self) -> None:
+        """test the timeout"""
+        budget = limits.Limits(timeout=0.001).start(Variable("a"))
+        with self.assertRaises(limits.LimitExceeded):
+            while True:
+                budget.step()
+
+    def test_size(self) -> None:
+        """test the size limit"""
+        budget = limits.Limits(size=3).start(Variable("a"))
+        budget.step(Variable("a").apply_to(Variable("b")))
+        with self.assertRaises(limits.LimitExceeded):
+            budget.step(Variable("a").apply_to(Variable("b"), Variable("c")))
+
+    def test_evaluating_visitor(self) -> None:
+        """test limiting the evaluating engine"""
+        budget = limits.Limits(steps=100).start(combinators.OMEGA)
+        with self.assertRaises(limits.LimitExceeded):
+            EvaluatingVisitor().skip_intermediate(combinators.OMEGA, budget)
+        self.assertEqual(budget.steps, 100)
+
+    def test_parse_limit(self) -> None:
+        """test parsing limits"""
+        self.assertEqual(limits.parse_limit("10", int), 10)
+        self.assertEqual(limits.parse_limit("0.5", float), 0.5)
+        self.assertIsNone(limits.parse_limit("None", int))
+        with self.assertRaises(ValueError):
+            limits.parse_limit("0", int)
@@ -0,0 +1,113 @@
+#!/usr/bin/python3
+
+"""Tests for the CLI entry point"""
+
+import os
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+from tempfile import NamedTemporaryFile
+from unittest import TestCase
+from lambda_repl.main import ARGUMENT_PARSER, main
+
+
+class MainTest(TestCase):
+    """Test for the CLI entry point"""
+
+    def run_batch(self, commands: str, *args: str) -> tuple[int, str]:
+        """execute commands in batch mode and return the status and output"""
+        with NamedTemporaryFile("w", suffix=".lambda", delete=False) as file:
+            file.write(commands)
+        self.addCleanup(os.remove, file.name)
+        stdout = StringIO()
+        arguments = ARGUMENT_PARSER.parse_args([*args, "--batch", file.name])
+        with redirect_stdout(stdout):
+            status = main(arguments)
+        for batch in arguments.batch:
+            batch.close()
+        return status, stdout.getvalue()
+
+    def test_batch(self) -> None:
+        """test executing files without prompting"""
+        self.assertEqual(
+            self.run_batch("alias K = \\x.\\y.x\neval K a b\ntrace K a b\n"),
+            (0, "a\nβ ((λy.a) b)\nβ a\n")
+        )
+
+    def test_numerals(self) -> None:
+        """test enabling numeric literals"""
+        self.assertEqual(
+            self.run_batch("eval (\\n.\\f.\\x.f (n f x)) 41\n", "--numerals"),
+            (0, "42\n")
+        )
+
+    def test_arithmetic(self) -> None:
+        """test enabling calculating arithmetic"""
+        self.assertEqual(
+            self.run_batch(
+                "import lambda_calculus.terms.arithmetic.*\neval MULTIPLY 100 100\n",
+                "--numerals", "--arithmetic", "--max-steps", "10", "--engine", "zipper"
+            ),
+            (0, "10000\n")
+        )
+        self.assertEqual(
+            self.run_batch(
+                "import lambda_calculus.terms.arithmetic.*\neval POWER 2 8\n",
+                "--numerals", "--arithmetic", "--max-steps", "5", "--jobs", "2"
+            ),
+            (0, "256\n")
+        )
+
+    def test_output(self) -> None:
+        """test selecting the output format"""
+        self.assertEqual(
+            self.run_batch("eval (\\x.\\y.x) (a b)\n", "--output", "minimal", "--width", "6"),
+            (0, "λy.a b\n")
+        )
+
+    def test_stats(self) -> None:
+        """test displaying statistics"""
+        status, output = self.run_batch("alias F = y\neval \\y.F y\n", "--stats")
+        self.assertEqual(status, 0)
+        self.assertEqual(
+            output.splitlines()[:5],
+            ["(λy1.(y y1))", "alpha = 0", "beta = 0", "size = 4", "depth = 3"]
+        )
+        status, output = self.run_batch("eval (\\x.x) a\neval b\n", "--stats", "--jobs", "2")
+        self.assertEqual(status, 0)
+        lines = output.splitlines()
+        self.assertEqual(lines[:3], ["a", "alpha = 0", "beta = 1"])
+        self.assertEqual(lines[9:12], ["b", "alpha = 0", "beta = 0"])
+
+    def test_batch_error(self) -> None:
+        """test failing if errors occurred"""
+        status, output = self.run_batch("eval a\neval (\\x.x x) (\\x.x x)\neval b\n", "--max-steps", "10")
+        self.assertEqual(status, 1)
+        self.assertEqual(output.splitlines()[0], "a")
+        self.assertEqual(output.splitlines()[-1], "b")
+
+    def test_jobs(self) -> None:
+        """test evaluating in parallel"""
+        self.assertEqual(
+            self.run_batch("alias K = \\x.\\y.x\neval K a b\neval K b a\neval (\n", "--jobs", "2")[0],
+            1
+        )
+
+    def test_limits(self) -> None:
+        """test rejecting limits which are not positive"""
+        arguments = ARGUMENT_PARSER.parse_args(["--max-steps", "10", "--timeout", "none", "--max-size", "5"])
+        self.assertEqual((arguments.max_steps, arguments.timeout, arguments.max_size), (10, None, 5))
+        self.assertEqual(ARGUMENT_PARSER.parse_args(["--width", "40"]).width, 40)
+        self.assertIsNone(ARGUMENT_PARSER.parse_args(["--width", "none"]).width)
+        for option in ("--max-steps", "--timeout", "--max-size", "--width"):
+            for value in ("0", "-1", "x"):
+                with self.subTest(option=option, value=value), redirect_stderr(StringIO()):
+                    with self.assertRaises(SystemExit):
+                        ARGUMENT_PARSER.parse_args([option, value])
+
+    def test_interval(self) -> None:
+        """test rejecting intervals which are not positive"""
+        self.assertEqual(ARGUMENT_PARSER.parse_args(["--interval", "3"]).interval, 3)
+        for value in ("0", "-1", "none", "x"):
+            with self.subTest(value=value), redirect_stderr(StringIO()):
+                with self.assertRaises(SystemExit):
+                    ARGUMENT_PARSER.parse_args(["--interval", value])
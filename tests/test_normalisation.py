@@ -0,0 +1,94 @@
+#!/usr/bin/python3
+
+"""Tests for normalisation engines"""
+
+from unittest import TestCase
+from lambda_calculus.terms import Term, Variable, arithmetic, combinators, logic, pairs
+from lambda_calculus.visitors.normalisation import BetaNormalisingVisitor
+from lambda_calculus.visitors.substitution.renaming import CountingSubstitution
+from lambda_repl import normalisation
+from lambda_repl.aliases import LazyAliases
+from lambda_repl.debruijn import alpha_equivalent, from_term
+from lambda_repl.parsing import LambdaTransformer
+
+TRANSFORMER = LambdaTransformer()
+
+CORPUS: tuple[Term[str], ...] = (
+    Variable("x"),
+    TRANSFORMER.transform_string(r"(\x.\y.x) a b"),
+    TRANSFORMER.transform_string(r"(\x.\y.x) y"),
+    TRANSFORMER.transform_string(r"(\x.\y.y x) y"),
+    TRANSFORMER.transform_string(r"\x.(\y.\x.y) x"),
+    TRANSFORMER.transform_string(r"\x.\x.x"),
+    TRANSFORMER.transform_string(r"(\x.x x) (\y.y)"),
+    TRANSFORMER.transform_string(r"(\f.\x.f (f x)) (\f.\x.f (f x))"),
+    TRANSFORMER.transform_string(r"a ((\x.x) b) ((\x.x x) c)"),
+    combinators.K.apply_to(Variable("a"), combinators.OMEGA),
+    combinators.S.apply_to(combinators.K, combinators.K),
+    combinators.B.apply_to(combinators.C, combinators.W),
+    arithmetic.ADD.apply_to(arithmetic.number(3), arithmetic.number(4)),
+    arithmetic.MULTIPLY.apply_to(arithmetic.number(3), arithmetic.number(4)),
+    arithmetic.POWER.apply_to(arithmetic.number(2), arithmetic.number(3)),
+    arithmetic.PREDECESSOR.apply_to(arithmetic.number(5)),
+    arithmetic.SUBTRACT.apply_to(arithmetic.number(7), arithmetic.number(3)),
+    arithmetic.ISZERO.apply_to(arithmetic.number(0)),
+    logic.IF_THEN_ELSE.apply_to(logic.AND.apply_to(logic.TRUE, logic.FALSE), Variable("a"), Variable("b")),
+    pairs.SECOND.apply_to(pairs.PAIR.apply_to(Variable("a"), Variable("b"))),
+    pairs.NULL.apply_to(pairs.NIL),
+    arithmetic.SUCCESSOR,
+    arithmetic.SUCCESSOR.apply_to(Variable("n"))
+)
+
+
+class EvaluatingVisitorTest(TestCase):
+    """Test for the evaluating normalisation engine"""
+
+    visitor: normalisation.EvaluatingVisitor
+
+    reference: BetaNormalisingVisitor
+
+    def setUp(self) -> None:
+        """create the engines"""
+        self.visitor = normalisation.EvaluatingVisitor()
+        self.reference = BetaNormalisingVisitor()
+
+    def test_corpus(self) -> None:
+        """test normal forms against the reference implementation"""
+        for term in CORPUS:
+            with self.subTest(term=str(term)):
+                result = self.visitor.skip_intermediate(term)
+                expected = self.reference.skip_intermediate(term)
+                self.assertTrue(alpha_equivalent(from_term(result), from_term(expected)))
+                self.assertEqual(result, expected)
+
+    def test_large(self) -> None:
+        """test normal forms exceeding the recursion limit"""
+        term = arithmetic.MULTIPLY.apply_to(arithmetic.number(50), arithmetic.number(50))
+        self.assertTrue(alpha_equivalent(
+            from_term(self.visitor.skip_intermediate(term)),
+            from_term(arithmetic.number(2500))
+        ))
+
+    def test_trace(self) -> None:
+        """test tracing being delegated"""
+        term = TRANSFORMER.transform_string(r"(\x.\y.x) a b")
+        self.assertEqual(
+            list(term.accept(self.visitor)),
+            list(term.accept(self.reference))
+        )
+
+    def test_references(self) -> None:
+        """test evaluating references to aliases"""
+        aliases = LazyAliases[str](CountingSubstitution)
+        aliases["ADD"] = arithmetic.ADD
+        aliases["n"] = arithmetic.number(3)
+        aliases["m"] = TRANSFORMER.transform_string(r"\y.ADD n y")
+        aliases["y"] = TRANSFORMER.transform_string("m n")
+        for source in ("y", r"\n.m n", "ADD y (m y)"):
+            term = aliases.apply(TRANSFORMER.transform_string(source))
+            with self.subTest(term=source):
+                self.assertEqual(
+                    self.visitor.skip_intermediate(term),
+                    self.reference.skip_intermediate(aliases.expand(term))
+                )
+        self.assertEqual(len(self.visitor.thunks), 4)
@@ -0,0 +1,51 @@
+#!/usr/bin/python3
+
+"""Tests for church numerals written as numeric literals"""
+
+from unittest import TestCase
+from lambda_calculus.terms import Variable, arithmetic, logic
+from lambda_repl import interning, numerals
+
+
+class NumeralsTest(TestCase):
+    """Tests for creating and recognising church numerals"""
+
+    def test_literal(self) -> None:
+        """test recognising numeric literals"""
+        for name in ("0", "42", "007"):
+            with self.subTest(name=name):
+                self.assertTrue(numerals.is_literal(name))
+        for name in ("x", "1x", "-1", "٣", ""):
+            with self.subTest(name=name):
+                self.assertFalse(numerals.is_literal(name))
+
+    def test_numeral(self) -> None:
+        """test creating church numerals"""
+        for n in (0, 1, 5):
+            with self.subTest(n=n):
+                term = numerals.numeral(n)
+                self.assertEqual(term, arithmetic.number(n))
+                self.assertTrue(interning.is_interned(term))
+        with self.assertRaises(ValueError):
+            numerals.numeral(-1)
+
+    def test_value(self) -> None:
+        """test recognising church numerals"""
+        for n in (0, 1, 5, 10000):
+            with self.subTest(n=n):
+                self.assertEqual(numerals.numeral_value(numerals.numeral(n)), n)
+        self.assertEqual(
+            numerals.numeral_value(Variable("a").apply_to(Variable("b")).abstract("a", "b")),
+            1
+        )
+        for term in (
+            Variable("f"),
+            Variable("x").abstract("f"),
+            Variable("x").abstract("x", "x"),
+            Variable("f").apply_to(Variable("y")).abstract("f", "x"),
+            Variable("g").apply_to(Variable("x")).abstract("f", "x"),
+            Variable("f").apply_to(Variable("x"), Variable("x")).abstract("f", "x"),
+            logic.TRUE
+        ):
+            with self.subTest(term=term):
+                self.assertIsNone(numerals.numeral_value(term))
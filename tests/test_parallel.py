@@ -0,0 +1,127 @@
+#!/usr/bin/python3
+
+"""Tests for parallel evaluation"""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from io import StringIO
+from unittest import TestCase
+from lambda_calculus.visitors.normalisation import BetaNormalisingVisitor
+from lambda_calculus.visitors.substitution.renaming import CountingSubstitution
+from lambda_repl import LambdaREPL
+from lambda_repl.aliases import LetAliases
+from lambda_repl.parallel import ParallelExecutor
+from lambda_repl.parsing import LambdaTransformer
+
+COMMANDS = (
+    "alias K = \\x.\\y.x\n",
+    "eval K a b\n",
+    "eval (\n",
+    "eval (\\x.x x) (\\x.x x)\n",
+    "eval K b a\n",
+    "alias K = \\x.\\y.y\n",
+    "eval K a b\n",
+    "eval K a b\n"
+)
+
+
+class ParallelExecutorTest(TestCase):
+    """Test for parallel evaluation of commands"""
+
+    repl: LambdaREPL
+
+    stdout: StringIO
+
+    def setUp(self) -> None:
+        """create a REPL"""
+        self.stdout = StringIO()
+        self.repl = LambdaREPL(
+            LetAliases(CountingSubstitution),
+            LambdaTransformer(),
+            BetaNormalisingVisitor(),
+            stdout=self.stdout
+        )
+        self.repl.limits.steps = 100
+
+    def sequential_output(self) -> str:
+        """execute the commands one after another"""
+        stdout = StringIO()
+        repl = LambdaREPL(
+            LetAliases(CountingSubstitution),
+            LambdaTransformer(),
+            BetaNormalisingVisitor(),
+            stdout=stdout
+        )
+        repl.limits.steps = 100
+        repl.execute(COMMANDS)
+        return stdout.getvalue()
+
+    def test_order(self) -> None:
+        """test displaying results in order"""
+        with ThreadPoolExecutor(4) as executor:
+            self.assertFalse(ParallelExecutor(self.repl, executor).execute(COMMANDS))
+        self.assertEqual(self.stdout.getvalue(), self.sequential_output())
+        self.assertEqual(self.repl.errors, 2)
+        self.assertEqual((self.repl.cache.hits, self.repl.cache.misses), (0, 5))
+        self.assertEqual(len(self.repl.cache), 1)
+
+    def test_processes(self) -> None:
+        """test evaluating in other processes"""
+        with ProcessPoolExecutor(2) as executor:
+            self.assertFalse(ParallelExecutor(self.repl, executor).execute(COMMANDS))
+        self.assertEqual(self.stdout.getvalue(), self.sequential_output())
+
+    def test_exit(self) -> None:
+        """test waiting for evaluations before exiting"""
+        with ThreadPoolExecutor(4) as executor:
+            self.assertTrue(ParallelExecutor(self.repl, executor).execute(
+                ("eval (\\x.x) a", "exit", "eval b")
+            ))
+        self.assertEqual(self.stdout.getvalue(), "a\nExiting REPL...\n")
+
+    def test_stats(self) -> None:
+        """test displaying statistics of evaluations in order"""
+        self.repl.stats = True
+        with ThreadPoolExecutor(4) as executor:
+            self.assertFalse(ParallelExecutor(self.repl, executor).execute(
+                ("eval (\\x.x) a", "eval b")
+            ))
+        lines = self.stdout.getvalue().splitlines()
+        self.assertEqual(lines[:3], ["a", "alpha = 0", "beta = 1"])
+        self.assertEqual(
+            [line.partition(" = ")[0] for line in lines[5:9]],
+            ["parse", "aliases", "normalise", "print"]
+        )
+        self.assertEqual(lines[9:12], ["b", "alpha = 0", "beta = 0"])
+
+    def test_arithmetic(self) -> None:
+        """test calculating arithmetic before evaluating in the workers"""
+        self.repl.transformer.numerals = True
+        self.repl.session.arithmetic = True
+        self.repl.limits.steps = 5
+        with ThreadPoolExecutor(4) as executor:
+            self.assertFalse(ParallelExecutor(self.repl, executor).execute(
+                ("import lambda_calculus.terms.arithmetic.*", "eval POWER 2 8")
+            ))
+        self.assertEqual(self.stdout.getvalue(), "256\n")
+
+    def test_interruption(self) -> None:
+        """test displaying partial terms of workers with the settings of the REPL"""
+        commands = (
+            "set output minimal",
+            "set numerals true",
+            "set width 40",
+            "set steps 3",
+            "eval (\\x.x x x) (\\x.x x x) 2",
+            "eval (\\x.\\y.x) 2 a"
+        )
+        with ProcessPoolExecutor(2) as executor:
+            self.assertFalse(ParallelExecutor(self.repl, executor).execute(commands))
+        self.assertEqual(
+            self.stdout.getvalue().splitlines()[4:],
+            [
+                "Error: step limit of 3 reached after 3 steps",
+                "(λx.x x x) (λx.x x x) (λx.x x x) (λx.x x… (42 nodes, depth 9)",
+                "2"
+            ]
+        )
+        self.assertEqual(self.repl.errors, 1)
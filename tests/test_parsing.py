@@ -4,8 +4,7 @@
 
 from unittest import TestCase
 from lambda_calculus.terms import Variable, Abstraction, Application
-from lark import Token
-from lambda_repl import parsing
+from lambda_repl import numerals, parsing, printing
 
 
 class ParsingTest(TestCase):
@@ -49,6 +48,13 @@ class ParsingTest(TestCase):
                 (Abstraction("a", Variable("b")), Variable("c"))
             )
         )
+        self.assertEqual(
+            self.transformer.transform_string(" (a)(b)c\n"),
+            Application.with_arguments(
+                Variable("a"),
+                (Variable("b"), Variable("c"))
+            )
+        )
 
     def test_variables(self) -> None:
         """test valid variable names"""
@@ -119,124 +125,38 @@ class ParsingTest(TestCase):
         )
 
 
-class PostLexTest(TestCase):
-    """Tests for WhitespacePostLex"""
-
-    postlex: parsing.WhitespacePostLex
+class ParserTest(TestCase):
+    """Tests for the lazily created parser"""
 
-    def setUp(self) -> None:
-        """create a PostLex"""
-        self.postlex = parsing.WhitespacePostLex()
-
-    def test_no_whitespace(self) -> None:
-        """test handling of tokens other than whitespace"""
-        tokens = (
-            Token("BACKLASH", "\\"),
-            Token("VARIABLE", "a"),
-            Token("DOT", "."),
-            Token("LPAR", "("),
-            Token("VARIABLE", "a"),
-            Token("RPAR", ")")
-        )
-        self.assertEqual(
-            tuple(self.postlex.process(iter(tokens))),
-            tokens
-        )
-
-    def test_abstraction_unnecessary(self) -> None:
-        """test handling of unnecessary whitespace in abstractions"""
-        tokens = (
-            Token("BACKLASH", "λ"),
-            Token("_WHITESPACE", " "),
-            Token("VARIABLE", "a"),
-            Token("_WHITESPACE", "\t"),
-            Token("DOT", "."),
-            Token("_WHITESPACE", "  "),
-            Token("LPAR", "("),
-            Token("VARIABLE", "a"),
-            Token("RPAR", ")")
-        )
-        self.assertEqual(
-            tuple(self.postlex.process(iter(tokens))),
-            (
-                Token("BACKLASH", "λ"),
-                Token("VARIABLE", "a"),
-                Token("DOT", "."),
-                Token("LPAR", "("),
-                Token("VARIABLE", "a"),
-                Token("RPAR", ")")
-            )
-        )
+    def test_lazy(self) -> None:
+        """test that the parser is created once"""
+        self.assertIs(parsing.PARSER, parsing.get_parser())
+        self.assertIs(parsing.PARSER, parsing.PARSER)
+        with self.assertRaises(AttributeError):
+            getattr(parsing, "PARSERS")
 
-    def test_backslash_unnecessary(self) -> None:
-        """test handling of unnecessary whitespace in abstractions with a backslash"""
-        tokens = (
-            Token("BACKLASH", "\\"),
-            Token("_WHITESPACE", " "),
-            Token("VARIABLE", "a"),
-            Token("_WHITESPACE", "\t"),
-            Token("DOT", "."),
-            Token("_WHITESPACE", "  "),
-            Token("LPAR", "("),
-            Token("VARIABLE", "a"),
-            Token("RPAR", ")")
-        )
+    def test_ignored_whitespace(self) -> None:
+        """test that whitespace does not produce tokens"""
         self.assertEqual(
-            tuple(self.postlex.process(iter(tokens))),
-            (
-                Token("BACKLASH", "\\"),
-                Token("VARIABLE", "a"),
-                Token("DOT", "."),
-                Token("LPAR", "("),
-                Token("VARIABLE", "a"),
-                Token("RPAR", ")")
-            )
+            [token.type for token in parsing.PARSER.lex(" \\ a\t.  ( a b\n)  ")],
+            ["BACKSLASH", "VARIABLE", "DOT", "LPAR", "VARIABLE", "VARIABLE", "RPAR"]
         )
 
-    def test_brackets_unnecessary(self) -> None:
-        """test handling of unnecessary whitespace in brackets"""
-        tokens = (
-            Token("BACKLASH", "\\"),
-            Token("VARIABLE", "a"),
-            Token("DOT", "."),
-            Token("LPAR", "("),
-            Token("_WHITESPACE", "\t"),
-            Token("VARIABLE", "a"),
-            Token("_WHITESPACE", "  "),
-            Token("RPAR", ")")
-        )
+    def test_numerals(self) -> None:
+        """test numeric literals"""
+        transformer = parsing.LambdaTransformer(numerals=True)
+        self.assertIs(transformer.transform_string("2"), numerals.numeral(2))
         self.assertEqual(
-            tuple(self.postlex.process(iter(tokens))),
-            (
-                Token("BACKLASH", "\\"),
-                Token("VARIABLE", "a"),
-                Token("DOT", "."),
-                Token("LPAR", "("),
-                Token("VARIABLE", "a"),
-                Token("RPAR", ")")
+            transformer.transform_string("f 0 (λ1.1 x)"),
+            Application.with_arguments(
+                Variable("f"),
+                (numerals.numeral(0), Abstraction("1", Application(Variable("1"), Variable("x"))))
             )
         )
+        self.assertEqual(parsing.LambdaTransformer().transform_string("2"), Variable("2"))
 
-    def test_ends_unnecessary(self) -> None:
-        """test handling of unnecessary whitespace at the start and end"""
-        tokens = (
-            Token("_WHITESPACE", "\t"),
-            Token("VARIABLE", "a"),
-            Token("_WHITESPACE", " ")
-        )
-        self.assertEqual(
-            tuple(self.postlex.process(iter(tokens))),
-            (tokens[1],)
-        )
-
-    def test_necessary(self) -> None:
-        """test handling of necessary whitespace"""
-        tokens = (
-            Token("VARIABLE", "a"),
-            Token("_WHITESPACE", "\t"),
-            Token("VARIABLE", "a")
-        )
-        self.assertEqual(
-            tuple(self.postlex.process(iter(tokens))),
-            tokens
-        )
+    def test_deep(self) -> None:
+        """test transforming terms deeper than the recursion limit"""
+        string = "(λf.(λx." + "(f " * 10000 + "x" + ")" * 10002
+        term = parsing.LambdaTransformer().transform_string(string)
+        self.assertEqual(printing.format_term(term), string)
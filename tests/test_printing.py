@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+
+"""Tests for converting terms into strings"""
+
+from io import StringIO
+from unittest import TestCase
+from lambda_repl import interning, printing
+from .test_normalisation import CORPUS, TRANSFORMER
+
+
+class PrintingTest(TestCase):
+    """Tests for the iterative term printer"""
+
+    def test_str(self) -> None:
+        """test that terms are formatted like str"""
+        for term in CORPUS:
+            with self.subTest(term=term):
+                self.assertEqual(printing.format_term(term), str(term))
+
+    def test_tokens(self) -> None:
+        """test the parts of the string representation"""
+        self.assertEqual(
+            list(printing.tokens(TRANSFORMER.transform_string(r"\x.x y"))),
+            ["(λx.", "(", "x", " ", "y", ")", ")"]
+        )
+
+    def test_numerals(self) -> None:
+        """test formatting church numerals as numbers"""
+        term = TRANSFORMER.transform_string(r"a (\f.\x.f (f x)) (\a.\b.b) (\f.\x.f x x)")
+        self.assertEqual(
+            printing.format_term(term, numerals=True),
+            "(((a 2) 0) (λf.(λx.((f x) x))))"
+        )
+        self.assertEqual(printing.format_term(term), str(term))
+
+    def test_minimal(self) -> None:
+        """test formatting terms with minimal brackets"""
+        for term in CORPUS:
+            with self.subTest(term=term):
+                string = "".join(printing.minimal_tokens(term))
+                self.assertEqual(TRANSFORMER.transform_string(string), term)
+        self.assertEqual(
+            "".join(printing.minimal_tokens(TRANSFORMER.transform_string(r"(\x.\y.x y) (a b) c \z.z"))),
+            "(λx.λy.x y) (a b) c λz.z"
+        )
+        self.assertEqual(
+            "".join(printing.minimal_tokens(TRANSFORMER.transform_string(r"a (\f.\x.f x) b"), True)),
+            "a 1 b"
+        )
+
+    def test_debruijn(self) -> None:
+        """test formatting terms with de Bruijn indices"""
+        term = TRANSFORMER.transform_string(r"(\x.\y.x (y z)) (\x.x) \f.\x.f (f x)")
+        self.assertEqual(
+            "".join(printing.debruijn_tokens(term)),
+            "(λ λ 1 (0 z)) (λ 0) λ λ 1 (1 0)"
+        )
+        self.assertEqual(
+            "".join(printing.debruijn_tokens(term, True)),
+            "(λ λ 1 (0 z)) (λ 0) 2"
+        )
+
+    def test_truncate(self) -> None:
+        """test limiting the length of representations"""
+        term = TRANSFORMER.transform_string(r"\x.a (b x)")
+        self.assertEqual(printing.depth(term), 4)
+        self.assertEqual(
+            "".join(printing.truncate(term, printing.tokens(term), 7)),
+            "(λx.(a … (6 nodes, depth 4)"
+        )
+        self.assertEqual(
+            "".join(printing.truncate(term, printing.tokens(term), 15)),
+            "(λx.(a (b x)))"
+        )
+
+    def test_write(self) -> None:
+        """test writing parts in chunks"""
+        file = StringIO()
+        printing.write_tokens(map(str, range(10000)), file)
+        self.assertEqual(file.getvalue(), "".join(map(str, range(10000))))
+
+    def test_deep(self) -> None:
+        """test formatting terms deeper than the recursion limit"""
+        term = interning.variable("x")
+        for _ in range(100000):
+            term = interning.application(interning.variable("f"), term)
+        string = printing.format_term(term)
+        self.assertEqual(len(string), 400001)
+        self.assertTrue(string.startswith("(f (f (f "))
+        self.assertTrue(string.endswith(" x" + ")" * 100000))
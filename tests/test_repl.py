@@ -2,15 +2,37 @@
 
 """Tests for the REPL"""
 
+from collections.abc import Iterator
+from contextlib import contextmanager
+import json
+import os
 from io import StringIO
+from tempfile import TemporaryDirectory
 from unittest import TestCase
-from lambda_calculus.terms import Variable
+from lambda_calculus.terms import Abstraction, Application, Variable
 from lambda_calculus.terms.arithmetic import SUCCESSOR
 from lambda_calculus.visitors.substitution.renaming import CountingSubstitution
 from lambda_calculus.visitors.normalisation import BetaNormalisingVisitor
 from lambda_repl import LambdaREPL
-from lambda_repl.aliases import LetAliases
+from lambda_repl.aliases import LazyAliases, LetAliases
+from lambda_repl.normalisation import EvaluatingVisitor, NormalisingVisitor, Step
 from lambda_repl.parsing import LambdaTransformer
+from lambda_repl.serialisation import SNAPSHOT_MAGIC
+
+
+class InterruptingVisitor(NormalisingVisitor):
+    """visitor simulating an interrupt by the user"""
+
+    __slots__ = ()
+
+    def visit_variable(self, variable: Variable[str]) -> Iterator[Step]:
+        raise KeyboardInterrupt()
+
+    def visit_abstraction(self, abstraction: Abstraction[str]) -> Iterator[Step]:
+        raise KeyboardInterrupt()
+
+    def visit_application(self, application: Application[str]) -> Iterator[Step]:
+        raise KeyboardInterrupt()
 
 
 class REPLTest(TestCase):
@@ -64,6 +86,261 @@ class REPLTest(TestCase):
             "β ((λy.a) b)\nβ a\n"
         )
 
+    def test_trace_modes(self) -> None:
+        """test displaying only parts of traces"""
+        self.assertFalse(self.repl.onecmd("set trace redex"))
+        self.assertFalse(self.repl.onecmd(r"trace (\x.\y.x) a ((\x.x) b)"))
+        self.assertFalse(self.repl.onecmd("set trace counts"))
+        self.assertFalse(self.repl.onecmd(r"trace (\x.\y.x) y b"))
+        self.assertFalse(self.repl.onecmd("set trace all"))
+        self.assertEqual(
+            self.stdout.getvalue(),
+            "trace = redex\nβ /0 ((λx.(λy.x)) a)\nβ / ((λy.a) ((λx.x) b))\n"
+            "trace = counts\nα 1\nβ 2\n"
+            "Error: invalid value: unknown trace mode all\n"
+        )
+
+    def test_trace_interval(self) -> None:
+        """test displaying every nth step"""
+        self.assertFalse(self.repl.onecmd("set interval 2"))
+        self.assertFalse(self.repl.onecmd(r"trace (\f.\x.f (f (f x))) (\x.x) a"))
+        self.assertFalse(self.repl.onecmd("set interval 0"))
+        self.assertEqual(
+            self.stdout.getvalue(),
+            "interval = 2\nβ ((λx.x) ((λx.x) ((λx.x) a)))\n"
+            "β ((λx.x) a)\nβ a\n"
+            "Error: invalid value: interval 0 is not positive\n"
+        )
+
+    def test_trace_file(self) -> None:
+        """test writing traces to a file"""
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trace.txt")
+            self.assertFalse(self.repl.onecmd(f"set tracefile {path}"))
+            self.assertFalse(self.repl.onecmd(r"trace (\x.\y.x) a b"))
+            self.assertFalse(self.repl.onecmd(r"trace (\x.x) c"))
+            self.assertFalse(self.repl.onecmd(f"set tracefile {directory}"))
+            self.assertFalse(self.repl.onecmd("trace a"))
+            self.assertFalse(self.repl.onecmd("set tracefile none"))
+            with open(path, encoding="utf8") as file:
+                self.assertEqual(file.read(), "β ((λy.a) b)\nβ a\nβ c\n")
+        self.assertEqual(
+            self.stdout.getvalue().splitlines()[:2],
+            [f"tracefile = {path}", f"tracefile = {directory}"]
+        )
+        self.assertTrue(self.stdout.getvalue().splitlines()[2].startswith("Error while tracing: "))
+        self.assertEqual(self.repl.errors, 1)
+
+    def test_stats(self) -> None:
+        """test displaying statistics"""
+        self.assertFalse(self.repl.onecmd("set stats true"))
+        self.assertFalse(self.repl.onecmd(r"eval (\x.\y.x) a b"))
+        self.assertFalse(self.repl.onecmd(r"trace (\x.x) c"))
+        self.assertFalse(self.repl.onecmd("set stats false"))
+        self.assertFalse(self.repl.onecmd("eval a"))
+        lines = self.stdout.getvalue().splitlines()
+        self.assertEqual(
+            lines[:7],
+            [
+                "stats = true",
+                "a",
+                "alpha = 0",
+                "beta = 2",
+                "size = 7",
+                "depth = 5",
+                "parse = " + lines[6].partition(" = ")[2]
+            ]
+        )
+        self.assertEqual(
+            [line.partition(" = ")[0] for line in lines[6:10]],
+            ["parse", "aliases", "normalise", "print"]
+        )
+        self.assertEqual(lines[10], "β c")
+        self.assertEqual(lines[12], "beta = 1")
+        self.assertEqual(lines[-2:], ["stats = false", "a"])
+        self.assertEqual(self.repl.errors, 0)
+
+    def test_stats_file(self) -> None:
+        """test appending statistics to a file"""
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "stats.jsonl")
+            self.assertFalse(self.repl.onecmd("set stats true"))
+            self.assertFalse(self.repl.onecmd(f"set statsfile {path}"))
+            self.assertFalse(self.repl.onecmd(r"eval (\x.x) a"))
+            self.assertFalse(self.repl.onecmd("trace b"))
+            self.assertFalse(self.repl.onecmd(f"set statsfile {directory}"))
+            self.assertFalse(self.repl.onecmd("eval c"))
+            with open(path, encoding="utf8") as file:
+                entries = list(map(json.loads, file))
+        self.assertEqual([entry["command"] for entry in entries], ["evaluate", "trace"])
+        self.assertEqual([entry["beta"] for entry in entries], [1, 0])
+        self.assertEqual(entries[0]["timings"].keys(), {"parse", "aliases", "normalise", "print"})
+        self.assertTrue(self.stdout.getvalue().splitlines()[-1].startswith("Error while writing statistics: "))
+        self.assertEqual(self.repl.errors, 1)
+
+    def test_hooks(self) -> None:
+        """test surrounding phases with hooks"""
+        phases: list[str] = []
+
+        @contextmanager
+        def hook(name: str) -> Iterator[None]:
+            phases.append(name)
+            yield None
+            phases.append(f"/{name}")
+
+        self.repl.hooks.append(hook)
+        self.assertFalse(self.repl.onecmd(r"eval (\x.x) a"))
+        self.assertEqual(
+            phases,
+            ["parse", "/parse", "aliases", "/aliases", "aliases", "/aliases",
+             "normalise", "/normalise", "print", "/print"]
+        )
+
+    def test_step_limit(self) -> None:
+        """test stopping evaluations after too many steps"""
+        self.repl.limits.steps = 3
+        self.assertFalse(self.repl.onecmd(r"eval (\x.x x) (\x.x x)"))
+        self.assertEqual(
+            self.stdout.getvalue(),
+            "Error: step limit of 3 reached after 3 steps\n((λx.(x x)) (λx.(x x)))\n"
+        )
+
+    def test_trace_limit(self) -> None:
+        """test stopping traces after too many steps"""
+        self.repl.limits.steps = 1
+        self.assertFalse(self.repl.onecmd(r"trace (\x.\y.x) a b"))
+        self.assertEqual(
+            self.stdout.getvalue(),
+            "β ((λy.a) b)\nError: step limit of 1 reached after 1 steps\n"
+        )
+
+    def test_size_limit(self) -> None:
+        """test stopping evaluations producing large terms"""
+        self.repl.limits.size = 20
+        self.assertFalse(self.repl.onecmd(r"eval (\x.x x x) (\x.x x x)"))
+        self.assertTrue(self.stdout.getvalue().startswith("Error: size limit of 20 nodes reached"))
+
+    def test_interrupt(self) -> None:
+        """test interrupting evaluations"""
+        self.repl.visitor = InterruptingVisitor()
+        self.assertFalse(self.repl.onecmd("eval a"))
+        self.assertFalse(self.repl.onecmd("trace a"))
+        self.assertEqual(
+            self.stdout.getvalue(),
+            "Interrupted after 0 steps\na\nInterrupted after 0 steps\n"
+        )
+
+    def test_set(self) -> None:
+        """test changing settings"""
+        self.assertFalse(self.repl.onecmd("set steps 10"))
+        self.assertFalse(self.repl.onecmd("set timeout 1.5"))
+        self.assertEqual(self.repl.limits.steps, 10)
+        self.assertEqual(self.repl.limits.timeout, 1.5)
+        self.assertFalse(self.repl.onecmd("set steps none"))
+        self.assertIsNone(self.repl.limits.steps)
+        self.assertEqual(
+            self.stdout.getvalue(),
+            "steps = 10\ntimeout = 1.5\nsteps = none\n"
+        )
+
+    def test_set_list(self) -> None:
+        """test listing settings"""
+        self.assertFalse(self.repl.onecmd("set"))
+        self.assertIn("steps = none\n", self.stdout.getvalue())
+        self.assertIn("timeout = none\n", self.stdout.getvalue())
+
+    def test_numerals(self) -> None:
+        """test numeric literals"""
+        self.assertFalse(self.repl.onecmd("set numerals true"))
+        self.assertFalse(self.repl.onecmd("import ADD = lambda_calculus.terms.arithmetic.ADD"))
+        self.assertFalse(self.repl.onecmd("evaluate ADD 2 3"))
+        self.assertFalse(self.repl.onecmd("evaluate λ3.3"))
+        self.assertFalse(self.repl.onecmd("set numerals false"))
+        self.assertFalse(self.repl.onecmd("evaluate ADD 2 3"))
+        self.assertFalse(self.repl.onecmd("set numerals 1"))
+        self.assertEqual(
+            self.stdout.getvalue(),
+            "numerals = true\n5\n(λ3.3)\nnumerals = false\n"
+            "(λf.(λx.((2 f) ((3 f) x))))\nError: invalid value: 1 is not true or false\n"
+        )
+
+    def test_arithmetic(self) -> None:
+        """test calculating arithmetic on church numerals"""
+        self.assertFalse(self.repl.onecmd("set numerals true"))
+        self.assertFalse(self.repl.onecmd("import lambda_calculus.terms.arithmetic.*"))
+        self.assertFalse(self.repl.onecmd("set steps 10"))
+        self.assertFalse(self.repl.onecmd("evaluate POWER 2 (ADD 3 (PREDECESSOR 5))"))
+        self.assertEqual(self.repl.errors, 1)
+        self.stdout.truncate(0)
+        self.stdout.seek(0)
+        self.assertFalse(self.repl.onecmd("set arithmetic true"))
+        self.assertFalse(self.repl.onecmd("evaluate POWER 2 (ADD 3 (PREDECESSOR 5))"))
+        self.assertFalse(self.repl.onecmd("set arithmetic 1"))
+        self.assertEqual(
+            self.stdout.getvalue(),
+            "arithmetic = true\n128\nError: invalid value: 1 is not true or false\n"
+        )
+
+    def test_arithmetic_strategy(self) -> None:
+        """test arithmetic not reducing under abstractions with weak strategies"""
+        self.assertFalse(self.repl.onecmd("set numerals true"))
+        self.assertFalse(self.repl.onecmd("import ADD = lambda_calculus.terms.arithmetic.ADD"))
+        self.assertFalse(self.repl.onecmd("set strategy name"))
+        self.assertFalse(self.repl.onecmd("evaluate \\z.ADD 1 1"))
+        self.assertFalse(self.repl.onecmd("set arithmetic true"))
+        self.assertEqual(len(self.repl.cache), 0)
+        self.assertFalse(self.repl.onecmd("evaluate \\z.ADD 1 1"))
+        self.assertFalse(self.repl.onecmd("set strategy normal"))
+        self.assertFalse(self.repl.onecmd("evaluate \\z.ADD 1 1"))
+        lines = self.stdout.getvalue().splitlines()
+        self.assertEqual(lines[2], lines[4])
+        self.assertNotEqual(lines[2], "(λz.2)")
+        self.assertEqual(lines[6], "(λz.2)")
+
+    def test_output(self) -> None:
+        """test output formats"""
+        self.assertFalse(self.repl.onecmd("set output minimal"))
+        self.assertFalse(self.repl.onecmd("evaluate (λx.λy.y x) a"))
+        self.assertFalse(self.repl.onecmd("set output debruijn"))
+        self.assertFalse(self.repl.onecmd("trace (λx.λy.y x) a"))
+        self.assertFalse(self.repl.onecmd("set width 5"))
+        self.assertFalse(self.repl.onecmd("set output full"))
+        self.assertFalse(self.repl.onecmd("evaluate (λx.λy.y x) a"))
+        self.assertFalse(self.repl.onecmd("set output short"))
+        self.assertEqual(
+            self.stdout.getvalue(),
+            "output = minimal\nλy.y a\noutput = debruijn\nβ λ 0 a\n"
+            "width = 5\noutput = full\n(λy.(… (4 nodes, depth 3)\n"
+            "Error: invalid value: unknown output format short\n"
+        )
+
+    def test_invalid_set(self) -> None:
+        """test handling of invalid settings"""
+        self.assertFalse(self.repl.onecmd("set steps -1"))
+        self.assertFalse(self.repl.onecmd("set steps x"))
+        self.assertFalse(self.repl.onecmd("set unknown 1"))
+        self.assertIsNone(self.repl.limits.steps)
+        self.assertEqual(
+            self.stdout.getvalue().splitlines()[2],
+            "Error: setting 'unknown' does not exist"
+        )
+        self.assertTrue(all(line.startswith("Error") for line in self.stdout.getvalue().splitlines()))
+
+    def test_strategy(self) -> None:
+        """test changing the reduction strategy"""
+        self.assertFalse(self.repl.onecmd(r"eval (\x.\y.x) ((\x.x) a)"))
+        self.assertFalse(self.repl.onecmd("set strategy name"))
+        self.assertEqual(len(self.repl.cache), 0)
+        self.assertFalse(self.repl.onecmd(r"eval (\x.\y.x) ((\x.x) a)"))
+        self.assertFalse(self.repl.onecmd(r"trace (\x.\y.x) ((\x.x) a)"))
+        self.assertFalse(self.repl.onecmd("set strategy unknown"))
+        self.assertEqual(self.repl.strategy, "name")
+        self.assertEqual(
+            self.stdout.getvalue(),
+            "(λy.a)\nstrategy = name\n(λy.((λx.x) a))\nβ (λy.((λx.x) a))\n"
+            "Error: invalid value: unknown strategy unknown\n"
+        )
+
     def test_syntax_error(self) -> None:
         """test handling of syntax errors while parsing"""
         self.assertFalse(self.repl.onecmd(r"eval (\x.\y.x) a b."))
@@ -130,6 +407,87 @@ class REPLTest(TestCase):
         self.assertTrue(self.stdout.getvalue().startswith("invalid Command: "))
         self.assertTrue(self.stdout.getvalue().endswith("\n"))
 
+    def test_snapshot(self) -> None:
+        """test saving and loading aliases"""
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "prelude.snapshot")
+            self.assertFalse(self.repl.onecmd("alias a = y"))
+            self.assertFalse(self.repl.onecmd(r"alias b = \y.a y"))
+            self.assertFalse(self.repl.onecmd(f"save {path}"))
+            self.assertFalse(self.repl.onecmd("eval b"))
+            self.assertFalse(self.repl.onecmd("clear"))
+            self.assertFalse(self.repl.onecmd("alias b = c"))
+            self.assertFalse(self.repl.onecmd("eval b"))
+            self.assertFalse(self.repl.onecmd(f"load {path}"))
+            self.assertFalse(self.repl.onecmd("eval b"))
+            self.assertFalse(self.repl.onecmd("aliases"))
+        self.assertEqual(
+            self.stdout.getvalue(),
+            "(λy1.(y y1))\nc\n(λy1.(y y1))\na = y\nb = (λy1.(y y1))\n"
+        )
+
+    def test_snapshot_dependencies(self) -> None:
+        """test loaded aliases being rebuilt when the aliases they use change"""
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "prelude.snapshot")
+            self.assertFalse(self.repl.onecmd("alias a = y"))
+            self.assertFalse(self.repl.onecmd(r"alias b = \x.a x"))
+            self.assertFalse(self.repl.onecmd(f"save {path}"))
+            self.assertFalse(self.repl.onecmd("clear"))
+            self.assertFalse(self.repl.onecmd(f"load {path}"))
+        self.assertFalse(self.repl.onecmd("deps a"))
+        self.assertFalse(self.repl.onecmd("alias a = z"))
+        self.assertFalse(self.repl.onecmd("eval b"))
+        self.assertEqual(
+            self.stdout.getvalue(),
+            "dependencies = none\ndependents = b\n(λx.(z x))\n"
+        )
+
+    def test_invalid_snapshot(self) -> None:
+        """test handling errors while saving and loading aliases"""
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "invalid")
+            self.assertFalse(self.repl.onecmd(f"load {path}"))
+            with open(path, "wb") as file:
+                file.write(SNAPSHOT_MAGIC)
+            self.assertFalse(self.repl.onecmd(f"load {path}"))
+            self.assertFalse(self.repl.onecmd(f"save {directory}"))
+        self.assertFalse(self.repl.onecmd("load"))
+        self.assertEqual(self.repl.errors, 4)
+        self.assertEqual(self.repl.stdout.getvalue().splitlines()[1], "Error while loading: file is too short")
+
+    def test_definitions(self) -> None:
+        """test loading files of definitions"""
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "prelude")
+            with open(path, "w", encoding="utf8") as file:
+                file.write("# combinators\nI = \\x.x\n\nK = λx.λy.x\nA = K I\n")
+            self.assertFalse(self.repl.onecmd("alias A = x"))
+            self.assertFalse(self.repl.onecmd("alias B = A a"))
+            self.assertFalse(self.repl.onecmd("eval B"))
+            self.assertFalse(self.repl.onecmd(f"load {path}"))
+            self.assertFalse(self.repl.onecmd("eval B"))
+            with open(path, "w", encoding="utf8") as file:
+                file.write("C = c\nalias D = d\n")
+            self.assertFalse(self.repl.onecmd(f"load {path}"))
+            with open(path, "w", encoding="utf8") as file:
+                file.write("C = c\nD = (d\n")
+            self.assertFalse(self.repl.onecmd(f"load {path}"))
+        self.assertEqual(list(self.repl.aliases), ["B", "I", "K", "A"])
+        self.assertEqual(self.repl.errors, 2)
+        lines = self.stdout.getvalue().splitlines()
+        self.assertEqual(lines[:2], ["(x a)", "(λx.x)"])
+        self.assertEqual(lines[2], "Error while loading: line 2: invalid alias 'alias D'")
+        self.assertTrue(lines[3].startswith("Error while loading: line 2: "))
+
+    def test_import_all(self) -> None:
+        """test importing all terms of a module"""
+        self.assertFalse(self.repl.onecmd("import lambda_calculus.terms.combinators.*"))
+        self.assertEqual(list(self.repl.aliases), ["Y", "S", "K", "I", "B", "C", "W", "DELTA", "OMEGA"])
+        self.assertFalse(self.repl.onecmd("import lambda_calculus.terms.arithmeticX.*"))
+        self.assertEqual(self.repl.errors, 1)
+        self.assertTrue(self.stdout.getvalue().startswith("Error while importing: "))
+
     def test_aliases(self) -> None:
         """test listing aliases"""
         self.assertFalse(self.repl.onecmd("alias x = 1"))
@@ -141,6 +499,13 @@ class REPLTest(TestCase):
             "x = 1\na = (1 b)\nb = (b c)\n"
         )
 
+    def test_deep(self) -> None:
+        """test displaying terms deeper than the recursion limit"""
+        term = "(λf.(λx." + "(f " * 5000 + "x" + ")" * 5002
+        self.assertFalse(self.repl.onecmd(f"alias n = {term}"))
+        self.assertFalse(self.repl.onecmd("aliases"))
+        self.assertEqual(self.stdout.getvalue(), f"n = {term}\n")
+
     def test_clear(self) -> None:
         """test clearing aliases"""
         self.assertFalse(self.repl.onecmd("alias x = 1"))
@@ -150,12 +515,45 @@ class REPLTest(TestCase):
         self.assertEqual(
             self.repl.aliases,
             {
-                "a": Variable("1").apply_to(Variable("b")),
+                "a": Variable("x").apply_to(Variable("b")),
                 "b": Variable("b").apply_to(Variable("c"))
             }
         )
         self.assertEqual(self.stdout.getvalue(), "")
 
+    def test_deps(self) -> None:
+        """test listing dependencies and rebuilding dependents"""
+        self.assertFalse(self.repl.onecmd(r"alias ADD = \m.\n.\f.\x.m f (n f x)"))
+        self.assertFalse(self.repl.onecmd(r"alias MULT = \m.\n.n (ADD m) (\f.\x.x)"))
+        self.assertFalse(self.repl.onecmd(r"alias SQUARE = \n.MULT n n"))
+        self.assertFalse(self.repl.onecmd("deps MULT"))
+        self.assertFalse(self.repl.onecmd("deps ADD"))
+        self.assertFalse(self.repl.onecmd("deps SQUARE"))
+        self.assertFalse(self.repl.onecmd("deps"))
+        self.assertFalse(self.repl.onecmd("deps x"))
+        self.assertEqual(
+            self.stdout.getvalue(),
+            "dependencies = ADD\ndependents = SQUARE\n"
+            "dependencies = none\ndependents = MULT, SQUARE\n"
+            "dependencies = MULT\ndependents = none\n"
+            "invalid Command: missing alias\n"
+            "Error: alias 'x' does not exist\n"
+        )
+        self.assertEqual(self.repl.errors, 2)
+
+    def test_redefine(self) -> None:
+        """test rebuilding aliases using redefined aliases"""
+        self.assertFalse(self.repl.onecmd("alias x = a"))
+        self.assertFalse(self.repl.onecmd("alias y = x b"))
+        self.assertFalse(self.repl.onecmd("eval y"))
+        self.assertFalse(self.repl.onecmd("alias x = c"))
+        self.assertFalse(self.repl.onecmd("eval y"))
+        self.assertFalse(self.repl.onecmd("aliases"))
+        self.assertEqual(
+            self.stdout.getvalue(),
+            "(a b)\n(c b)\ny = (c b)\nx = c\n"
+        )
+
     def test_clear_all(self) -> None:
         """test clearing all aliases"""
         self.assertFalse(self.repl.onecmd("alias x = 1"))
@@ -165,6 +563,69 @@ class REPLTest(TestCase):
         self.assertEqual(self.repl.aliases, {})
         self.assertEqual(self.stdout.getvalue(), "")
 
+    def test_cache(self) -> None:
+        """test caching normal forms"""
+        self.assertFalse(self.repl.onecmd(r"alias K = \x.\y.x"))
+        self.assertFalse(self.repl.onecmd("eval K a b"))
+        self.assertFalse(self.repl.onecmd("eval K a b"))
+        self.assertEqual((self.repl.cache.hits, self.repl.cache.misses), (1, 1))
+        self.assertFalse(self.repl.onecmd(r"alias K = \x.\y.y"))
+        self.assertEqual(len(self.repl.cache), 0)
+        self.assertFalse(self.repl.onecmd("eval K a b"))
+        self.assertFalse(self.repl.onecmd("cache"))
+        self.assertEqual(
+            self.stdout.getvalue(),
+            "a\na\nb\nentries = 1/128\nhits = 1\nmisses = 2\n"
+        )
+        self.assertFalse(self.repl.onecmd("cache clear"))
+        self.assertEqual(len(self.repl.cache), 0)
+
+    def test_cache_limit(self) -> None:
+        """test not caching partial results"""
+        self.repl.limits.steps = 1
+        self.assertFalse(self.repl.onecmd(r"eval (\x.x x) (\x.x x)"))
+        self.assertEqual(len(self.repl.cache), 0)
+
+    def test_lazy_aliases(self) -> None:
+        """test lazy aliases with all engines"""
+        for visitor in (BetaNormalisingVisitor(), EvaluatingVisitor()):
+            with self.subTest(visitor=visitor):
+                stdout = StringIO()
+                repl = LambdaREPL(
+                    LazyAliases(CountingSubstitution),
+                    LambdaTransformer(),
+                    visitor,
+                    stdout=stdout
+                )
+                self.assertFalse(repl.onecmd("alias a = y"))
+                self.assertFalse(repl.onecmd(r"alias b = \y.a y"))
+                self.assertFalse(repl.onecmd("alias a = z"))
+                self.assertFalse(repl.onecmd("eval b a"))
+                self.assertFalse(repl.onecmd("trace b a"))
+                self.assertFalse(repl.onecmd("aliases"))
+                self.assertEqual(
+                    stdout.getvalue(),
+                    "(z z)\nβ (z z)\nb = (λy.(a y))\na = z\n"
+                )
+
+    def test_execute(self) -> None:
+        """test executing commands without prompting"""
+        self.assertTrue(self.repl.execute([
+            "alias I = \\x.x\n",
+            "eval I a\n",
+            "\n",
+            "exit\n",
+            "eval I b\n"
+        ]))
+        self.assertFalse(self.repl.execute(["eval I b"]))
+        self.assertEqual(self.stdout.getvalue(), "a\nExiting REPL...\nb\n")
+        self.assertEqual(self.repl.errors, 0)
+
+    def test_errors(self) -> None:
+        """test counting errors"""
+        self.assertFalse(self.repl.execute(["eval (", "unknown", "clear a", "eval a"]))
+        self.assertEqual(self.repl.errors, 3)
+
     def test_exit(self) -> None:
         """test exiting the REPL"""
         self.assertTrue(self.repl.onecmd("exit"))
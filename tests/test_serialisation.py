@@ -0,0 +1,167 @@
+#!/usr/bin/python3
+
+"""Tests for serialisation"""
+
+import marshal
+from hashlib import sha256
+from io import BytesIO
+from unittest import TestCase
+from lambda_calculus.terms import Abstraction, Variable
+from lambda_calculus.visitors.substitution.renaming import CountingSubstitution
+from lambda_repl import serialisation
+from lambda_repl.aliases import LazyAliases, LetAliases
+from lambda_repl.interning import is_interned
+from .test_normalisation import CORPUS
+
+
+class EncodingTest(TestCase):
+    """Test for the flat encoding of terms"""
+
+    def test_round_trip(self) -> None:
+        """test decoding encoded terms"""
+        for term in CORPUS:
+            with self.subTest(term=str(term)):
+                result = serialisation.decode(serialisation.encode(term))
+                self.assertEqual(result, term)
+                self.assertTrue(is_interned(result))
+
+    def test_encode(self) -> None:
+        """test the encoding of terms"""
+        self.assertEqual(
+            serialisation.encode(Variable("x").apply_to(Variable("y")).abstract("x")),
+            (-1, "x", -2, "x", "y")
+        )
+
+    def test_deep(self) -> None:
+        """test encoding terms exceeding the recursion limit"""
+        term: Variable[str] | Abstraction[str] = Variable("x")
+        for _ in range(10000):
+            term = Abstraction("x", term)
+        encoded = serialisation.encode(term)
+        self.assertEqual(len(encoded), 20001)
+        self.assertEqual(serialisation.encode(serialisation.decode(encoded)), encoded)
+
+    def test_invalid(self) -> None:
+        """test decoding invalid data"""
+        for encoded in ((), ("x", "y"), (-2, "x"), (3,), (-1, -1, "x", "x")):
+            with self.subTest(encoded=encoded):
+                with self.assertRaises(ValueError):
+                    serialisation.decode(encoded)
+
+
+class SnapshotTest(TestCase):
+    """Test for alias snapshots"""
+
+    aliases: LetAliases[str]
+
+    def setUp(self) -> None:
+        """create aliases"""
+        self.aliases = LetAliases(CountingSubstitution)
+        self.aliases["a"] = Variable("y")
+        self.aliases["b"] = Variable("a").apply_to(Variable("y")).abstract("y")
+        self.aliases["c"] = Variable("b").apply_to(Variable("c"))
+
+    def dump(self) -> bytes:
+        """create a snapshot of the aliases"""
+        file = BytesIO()
+        serialisation.dump_aliases(self.aliases, file)
+        return file.getvalue()
+
+    @staticmethod
+    def forge(payload: object) -> bytes:
+        """create a snapshot with a valid header from an arbitrary payload"""
+        data = marshal.dumps(payload, 4)
+        return serialisation.SNAPSHOT_MAGIC + serialisation.SNAPSHOT_VERSION.to_bytes(2, "big") \
+            + sha256(data).digest() + data
+
+    def test_round_trip(self) -> None:
+        """test restoring aliases without applying them again"""
+        aliases = LetAliases[str](CountingSubstitution)
+        aliases["a"] = Variable("x")
+        aliases["d"] = Variable("z")
+        self.assertEqual(
+            serialisation.load_aliases(aliases, BytesIO(self.dump())),
+            ["a", "b", "c"]
+        )
+        self.assertEqual(list(aliases.items()), [("d", Variable("z")), *self.aliases.items()])
+        self.assertEqual(aliases.captures, {**self.aliases.captures, "z": {"d"}})
+
+    def test_dependencies(self) -> None:
+        """test restoring the definitions and dependencies of aliases"""
+        for aliases in (LetAliases[str](CountingSubstitution), LazyAliases[str](CountingSubstitution)):
+            with self.subTest(aliases=aliases):
+                serialisation.load_aliases(aliases, BytesIO(self.dump()))
+                self.assertEqual(aliases.dependents("a"), ["b", "c"])
+                self.assertEqual(aliases.dependencies("c"), ["b"])
+                self.assertEqual(aliases.source("c"), (Variable("b").apply_to(Variable("c")), None))
+                aliases["a"] = Variable("x")
+                self.assertEqual(
+                    aliases.expand(aliases["c"]),
+                    Variable("x").apply_to(Variable("y")).abstract("y").apply_to(Variable("c"))
+                )
+
+    def test_self_reference(self) -> None:
+        """test restoring aliases which used their earlier value"""
+        self.aliases["c"] = Variable("c").apply_to(Variable("a"))
+        snapshot = self.dump()
+        for aliases in (LetAliases[str](CountingSubstitution), LazyAliases[str](CountingSubstitution)):
+            with self.subTest(aliases=aliases):
+                serialisation.load_aliases(aliases, BytesIO(snapshot))
+                aliases["a"] = Variable("x")
+                self.assertEqual(
+                    aliases.expand(aliases["c"]),
+                    Variable("y").apply_to(Variable("y1")).abstract("y1").apply_to(Variable("c"), Variable("x"))
+                )
+
+    def test_shared(self) -> None:
+        """test snapshots containing every unique node once"""
+        aliases = LetAliases[str](CountingSubstitution)
+        aliases["A0"] = Variable("x").abstract("x")
+        for index in range(1, 1001):
+            aliases[f"A{index}"] = Variable(f"A{index - 1}").apply_to(Variable("y")).abstract("y")
+        file = BytesIO()
+        serialisation.dump_aliases(aliases, file)
+        nodes, definitions = marshal.loads(file.getvalue()[42:])
+        self.assertEqual(len(definitions), 1001)
+        # x, λx.x and y followed by two expanded and three source nodes for every other alias
+        self.assertEqual(len(nodes), 3 + 1000 * 5)
+        self.assertEqual(len(nodes), len(set(nodes)))
+        restored = LetAliases[str](CountingSubstitution)
+        file.seek(0)
+        serialisation.load_aliases(restored, file)
+        self.assertEqual(restored.expand(restored["A1000"]), aliases.expand(aliases["A1000"]))
+
+    def test_lazy(self) -> None:
+        """test snapshots of lazy aliases"""
+        aliases = LazyAliases[str](CountingSubstitution)
+        for alias, value in self.aliases.items():
+            aliases[alias] = value
+        restored = LazyAliases[str](CountingSubstitution)
+        file = BytesIO()
+        serialisation.dump_aliases(aliases, file)
+        file.seek(0)
+        serialisation.load_aliases(restored, file)
+        self.assertEqual(
+            restored.expand(restored.apply(Variable("c"))),
+            aliases.expand(aliases.apply(Variable("c")))
+        )
+
+    def test_invalid(self) -> None:
+        """test rejecting invalid snapshots"""
+        snapshot = self.dump()
+        for data, message in (
+            (snapshot[:10], "file is too short"),
+            (b"x" + snapshot[1:], "file is not a snapshot"),
+            (snapshot[:8] + b"\xff\xff" + snapshot[10:], "unsupported version 65535, expected 3"),
+            (snapshot[:-1], "snapshot is corrupted"),
+            (self.forge(((("x", 0),), (("a", 0, 0, None, ()),))), "invalid snapshot: invalid reference: 0"),
+            (self.forge((("x", (0, -1)), (("a", 1, 0, None, ()),))), "invalid snapshot: invalid reference: -1"),
+            (self.forge((("x",), (("a", 0, 0, None, (1,)),))), "invalid snapshot: invalid dependencies"),
+            (self.forge((("x",), (("a", 1, 0, None, ()),))), "invalid snapshot: list index out of range")
+        ):
+            with self.subTest(message=message):
+                aliases = LetAliases[str](CountingSubstitution)
+                with self.assertRaises(serialisation.SnapshotError) as context:
+                    serialisation.load_aliases(aliases, BytesIO(data))
+                self.assertEqual(str(context.exception), message)
+                self.assertEqual(len(aliases), 0)
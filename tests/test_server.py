@@ -0,0 +1,190 @@
+#!/usr/bin/python3
+
+"""Tests for the network server"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import TemporaryDirectory
+from threading import Event
+from unittest import IsolatedAsyncioTestCase
+from lambda_calculus.terms import Term, Variable
+from lambda_calculus.visitors.substitution.renaming import CountingSubstitution
+from lambda_repl import LambdaREPL
+from lambda_repl.aliases import Aliases, LetAliases
+from lambda_repl.limits import Limits
+from lambda_repl.parsing import LambdaTransformer
+from lambda_repl.server import TIMEOUT, LambdaServer
+from lambda_repl.zipper import ZipperNormalisingVisitor
+
+
+def create_repl(aliases: Aliases[str]) -> LambdaREPL:
+    """create a REPL without intro"""
+    repl = LambdaREPL(aliases, LambdaTransformer(), ZipperNormalisingVisitor())
+    repl.intro = None
+    return repl
+
+
+class LambdaServerTest(IsolatedAsyncioTestCase):
+    """Tests for the network server"""
+
+    prelude: LetAliases[str]
+
+    executor: ThreadPoolExecutor
+
+    server: LambdaServer
+
+    socket: asyncio.Server
+
+    async def asyncSetUp(self) -> None:
+        """start a server on a random port"""
+        self.prelude = LetAliases(CountingSubstitution)
+        self.prelude["I"] = Variable("x").abstract("x")
+        self.executor = ThreadPoolExecutor(1)
+        self.server = LambdaServer(self.prelude, create_repl, self.executor)
+        self.socket = await self.server.start_tcp("127.0.0.1", 0)
+        # connections are closed by cleanups registered later
+        self.addAsyncCleanup(self.stop)
+
+    async def stop(self) -> None:
+        """stop the server after all connections were handled"""
+        self.socket.close()
+        await self.socket.wait_closed()
+        while self.server.repls:
+            await asyncio.sleep(0.01)
+        self.executor.shutdown()
+
+    async def connect(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """connect to the server and wait for the prompt"""
+        host, port = self.socket.sockets[0].getsockname()[:2]
+        reader, writer = await asyncio.open_connection(host, port)
+        self.addAsyncCleanup(self.close, writer)
+        self.assertEqual(await reader.readuntil("λ ".encode("utf8")), "λ ".encode("utf8"))
+        return reader, writer
+
+    @staticmethod
+    async def close(writer: asyncio.StreamWriter) -> None:
+        """close a connection"""
+        writer.close()
+        await writer.wait_closed()
+
+    @staticmethod
+    async def command(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, line: str) -> str:
+        """execute a command and return its output"""
+        writer.write(f"{line}\n".encode("utf8"))
+        output = await reader.readuntil("λ ".encode("utf8"))
+        return output.decode("utf8").removesuffix("λ ")
+
+    async def test_evaluate(self) -> None:
+        """test evaluating terms with the prelude"""
+        reader, writer = await self.connect()
+        self.assertEqual(await self.command(reader, writer, "eval I a"), "a\n")
+        self.assertTrue((await self.command(reader, writer, "eval (")).startswith("Error while parsing: "))
+        self.assertEqual(await self.command(reader, writer, "eval I b"), "b\n")
+        self.assertEqual(await self.command(reader, writer, "unknown"), "*** Unknown command: unknown\n")
+
+    async def test_namespaces(self) -> None:
+        """test connections having their own aliases"""
+        reader1, writer1 = await self.connect()
+        reader2, writer2 = await self.connect()
+        self.assertEqual(await self.command(reader1, writer1, "alias I = a"), "")
+        self.assertEqual(await self.command(reader1, writer1, "alias K = b"), "")
+        self.assertEqual(await self.command(reader1, writer1, "eval I K"), "(a b)\n")
+        self.assertEqual(await self.command(reader2, writer2, "eval I K"), "K\n")
+        self.assertEqual(self.prelude["I"], Variable("x").abstract("x"))
+        self.assertEqual(len(self.server.repls), 2)
+
+    async def test_worker(self) -> None:
+        """test other connections not waiting for evaluations"""
+        reader1, writer1 = await self.connect()
+        reader2, writer2 = await self.connect()
+        blocked = Event()
+        self.executor.submit(blocked.wait)
+        writer1.write(b"eval I a\n")
+        self.assertEqual(await self.command(reader2, writer2, "alias K = b"), "")
+        self.assertEqual(await self.command(reader2, writer2, "aliases"), "I = (λx.x)\nK = b\n")
+        blocked.set()
+        self.assertEqual(await reader1.readuntil("λ ".encode("utf8")), "a\nλ ".encode("utf8"))
+
+    async def test_parsing(self) -> None:
+        """test other connections not waiting for terms being parsed or printed"""
+        reader1, writer1 = await self.connect()
+        repl = next(iter(self.server.repls))
+        blocked = Event()
+        self.addCleanup(blocked.set)
+        parse_term = repl.parse_term
+
+        def wait(arg: str) -> Term[str] | None:
+            """parse a term after the event is set"""
+            blocked.wait()
+            return parse_term(arg)
+
+        repl.parse_term = wait  # type: ignore[method-assign, assignment]
+        reader2, writer2 = await self.connect()
+        writer1.write(b"eval I a\n")
+        output = await asyncio.wait_for(self.command(reader2, writer2, "eval I b"), 5)
+        self.assertEqual(output, "b\n")
+        blocked.set()
+        self.assertEqual(await reader1.readuntil("λ ".encode("utf8")), "a\nλ ".encode("utf8"))
+
+    async def test_exit(self) -> None:
+        """test closing connections after exiting"""
+        reader, writer = await self.connect()
+        writer.write(b"exit\n")
+        self.assertEqual(await reader.read(), b"Exiting REPL...\n")
+        await asyncio.sleep(0)
+        self.assertEqual(len(self.server.repls), 0)
+
+    async def test_unix(self) -> None:
+        """test serving unix sockets"""
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "socket")
+            server = await self.server.start_unix(path)
+            async with server:
+                reader, writer = await asyncio.open_unix_connection(path)
+                self.addAsyncCleanup(self.close, writer)
+                writer.write(b"eval I c\n")
+                self.assertEqual(await reader.readuntil("λ ".encode("utf8")), "λ ".encode("utf8"))
+                self.assertEqual(await reader.readuntil("λ ".encode("utf8")), "c\nλ ".encode("utf8"))
+
+    async def test_restricted(self) -> None:
+        """test connections not accessing files and modules"""
+        reader, writer = await self.connect()
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "snapshot")
+            for line, error in (
+                (f"save {path}", "command 'save' is not available"),
+                (f"load {path}", "command 'load' is not available"),
+                ("import lambda_calculus.terms.combinators.*", "command 'import' is not available"),
+                (f"set tracefile {path}", "setting 'tracefile' is not available"),
+                (f"set statsfile {path}", "setting 'statsfile' is not available"),
+                ("set cache 1000000", "setting 'cache' is not available")
+            ):
+                with self.subTest(line=line):
+                    self.assertEqual(await self.command(reader, writer, line), f"Error: {error}\n")
+            self.assertEqual(os.listdir(directory), [])
+        self.assertEqual(await self.command(reader, writer, "set width 10"), "width = 10\n")
+
+    async def test_limits(self) -> None:
+        """test connections not exceeding the limits of the server"""
+        reader, writer = await self.connect()
+        self.assertEqual(await self.command(reader, writer, "set timeout"), f"timeout = {TIMEOUT}\n")
+        self.server.limits = Limits(steps=10)
+        await self.command(reader, writer, "set steps none")
+        self.assertEqual(await self.command(reader, writer, "set steps"), "steps = 10\n")
+        self.assertEqual(
+            await self.command(reader, writer, "eval (\\x.x x) (\\x.x x)"),
+            "Error: step limit of 10 reached after 10 steps\n((λx.(x x)) (λx.(x x)))\n"
+        )
+
+    async def test_trace(self) -> None:
+        """test other connections not waiting for traces"""
+        self.server.limits = Limits(timeout=2.0)
+        reader1, writer1 = await self.connect()
+        reader2, writer2 = await self.connect()
+        self.assertEqual(await self.command(reader1, writer1, "set trace counts"), "trace = counts\n")
+        writer1.write(b"trace (\\x.x x) (\\x.x x)\n")
+        await asyncio.sleep(0.1)
+        self.assertEqual(await asyncio.wait_for(self.command(reader2, writer2, "eval I a"), 1.0), "a\n")
+        output = await reader1.readuntil("λ ".encode("utf8"))
+        self.assertIn("Error: timeout of 2.0 seconds reached", output.decode("utf8"))
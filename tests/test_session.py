@@ -0,0 +1,159 @@
+#!/usr/bin/python3
+
+"""Tests for sessions"""
+
+from io import BytesIO
+from unittest import TestCase
+from lambda_calculus.terms.arithmetic import SUCCESSOR
+from lambda_calculus.visitors.normalisation import BetaNormalisingVisitor, Conversion
+from lambda_calculus.visitors.substitution.renaming import CountingSubstitution
+from lambda_repl.aliases import LazyAliases, LetAliases
+from lambda_repl.limits import LimitExceeded
+from lambda_repl.parsing import LambdaTransformer
+from lambda_repl.session import DefinitionError, Interrupted, ParseError, Session, TermImportError
+from .test_repl import InterruptingVisitor
+
+
+class SessionTest(TestCase):
+    """Tests for the session"""
+
+    session: Session
+
+    def setUp(self) -> None:
+        """create a session"""
+        self.session = Session(
+            LetAliases(CountingSubstitution),
+            LambdaTransformer(),
+            BetaNormalisingVisitor()
+        )
+
+    def test_parse(self) -> None:
+        """test parsing terms"""
+        self.assertEqual(
+            self.session.parse(r"\x.x"),
+            self.session.transformer.transform_string(r"\x.x")
+        )
+        with self.assertRaises(ParseError) as context:
+            self.session.parse(r"\x.")
+        self.assertEqual(context.exception.text, r"\x.")
+        self.assertTrue(context.exception.context())
+
+    def test_import(self) -> None:
+        """test importing terms"""
+        self.assertEqual(
+            self.session.import_alias("S", "lambda_calculus.terms.arithmetic.SUCCESSOR"),
+            SUCCESSOR
+        )
+        self.assertEqual(self.session.aliases["S"], SUCCESSOR)
+        with self.assertRaises(TermImportError) as context:
+            self.session.import_term("lambda_calculus.terms.arithmetic.X")
+        self.assertIsInstance(context.exception.__cause__, AttributeError)
+        with self.assertRaises(TermImportError) as context:
+            self.session.import_term("lambda_calculus.terms.arithmetic.number")
+        self.assertIsNone(context.exception.__cause__)
+
+    def test_evaluate(self) -> None:
+        """test evaluating terms with aliases"""
+        self.session.define("I", r"\x.x")
+        evaluation = self.session.evaluate("I I a")
+        self.assertEqual(evaluation.term, self.session.parse("a"))
+        self.assertEqual(evaluation.steps, 2)
+        self.assertFalse(evaluation.cached)
+        evaluation = self.session.evaluate(self.session.parse("I I a"))
+        self.assertEqual(evaluation.term, self.session.parse("a"))
+        self.assertTrue(evaluation.cached)
+        self.session.define("I", r"\x.b")
+        self.assertEqual(self.session.evaluate("I I a").term, self.session.parse("b a"))
+
+    def test_free_variables(self) -> None:
+        """test cached normal forms with free variables named like new aliases"""
+        for aliases in (LetAliases(CountingSubstitution), LazyAliases(CountingSubstitution)):
+            with self.subTest(aliases=aliases):
+                self.session.aliases = aliases
+                self.session.cache.clear()
+                for term in ("FOO", r"(\x.x) FOO"):
+                    self.assertEqual(self.session.evaluate(term).term, self.session.parse("FOO"))
+                self.session.define("FOO", r"\x.x")
+                for term in ("FOO", r"(\x.x) FOO"):
+                    self.assertEqual(self.session.evaluate(term).term, self.session.parse(r"\x.x"))
+                self.session.delete("FOO")
+                self.assertEqual(self.session.evaluate("FOO").term, self.session.parse("FOO"))
+                self.session.load(BytesIO(b"FOO = a"))
+                self.assertEqual(self.session.evaluate("FOO").term, self.session.parse("a"))
+
+    def test_trace(self) -> None:
+        """test iterating over the steps of an evaluation"""
+        steps = list(self.session.trace(r"(\x.\y.x) a b"))
+        self.assertEqual([step.number for step in steps], [1, 2])
+        self.assertEqual([step.conversion for step in steps], [Conversion.BETA] * 2)
+        self.assertEqual(steps[0].before, self.session.parse(r"(\x.\y.x) a b"))
+        self.assertEqual(steps[0].after, steps[1].before)
+        self.assertEqual(steps[1].after, self.session.parse("a"))
+
+    def test_interrupted(self) -> None:
+        """test exceptions raised by stopped evaluations"""
+        self.session.limits.steps = 3
+        with self.assertRaises(Interrupted) as context:
+            self.session.evaluate(r"(\x.x x) (\x.x x)")
+        self.assertIsInstance(context.exception.reason, LimitExceeded)
+        self.assertEqual(context.exception.steps, 3)
+        self.assertEqual(context.exception.term, self.session.parse(r"(\x.x x) (\x.x x)"))
+        with self.assertRaises(Interrupted) as context:
+            list(self.session.trace(r"(\x.x x) (\x.x x)"))
+        self.assertEqual(context.exception.steps, 3)
+        self.session.visitor = InterruptingVisitor()
+        with self.assertRaises(Interrupted) as context:
+            self.session.evaluate("a")
+        self.assertIsInstance(context.exception.reason, KeyboardInterrupt)
+
+    def test_aliases(self) -> None:
+        """test deleting, saving and loading aliases"""
+        self.session.define("A", "a")
+        self.session.define("B", "A b")
+        self.assertEqual(self.session.evaluate("B").term, self.session.parse("a b"))
+        file = BytesIO()
+        self.session.save(file)
+        self.session.delete("A")
+        with self.assertRaises(KeyError):
+            self.session.delete("A")
+        self.session.clear()
+        self.assertEqual(len(self.session.aliases), 0)
+        self.assertEqual(len(self.session.cache), 0)
+        file.seek(0)
+        self.assertEqual(self.session.load(file), ["A", "B"])
+        self.assertEqual(self.session.evaluate("B").term, self.session.parse("a b"))
+
+    def test_definitions(self) -> None:
+        """test loading definitions as a batch"""
+        self.session.define("A", "x")
+        self.session.define("B", "A a")
+        self.assertEqual(self.session.evaluate("B").term, self.session.parse("x a"))
+        self.assertEqual(
+            self.session.load(BytesIO("# comment\n\nI = λx.x\nA = I I\n".encode("utf8"))),
+            ["I", "A"]
+        )
+        self.assertEqual(self.session.evaluate("B").term, self.session.parse("a"))
+        for text, line in (("C = (c", 1), ("C = c\nD", 2), ("C D = d", 1), (b"\xff", None)):
+            with self.assertRaises(DefinitionError) as context:
+                self.session.load(BytesIO(text if isinstance(text, bytes) else text.encode("utf8")))
+            self.assertEqual(context.exception.line, line)
+        self.assertNotIn("C", self.session.aliases)
+
+    def test_import_all(self) -> None:
+        """test importing all terms of a module"""
+        self.assertEqual(
+            self.session.import_all("lambda_calculus.terms.arithmetic"),
+            ["ISZERO", "SUCCESSOR", "PREDECESSOR", "ADD", "SUBTRACT", "MULTIPLY", "POWER"]
+        )
+        self.assertEqual(self.session.aliases["SUCCESSOR"], SUCCESSOR)
+        with self.assertRaises(TermImportError):
+            self.session.import_all("lambda_calculus.terms.arithmeticX")
+
+    def test_strategy(self) -> None:
+        """test changing the reduction strategy"""
+        self.session.evaluate(r"(\x.x) a")
+        self.session.use_strategy("applicative")
+        self.assertEqual(self.session.strategy, "applicative")
+        self.assertEqual(len(self.session.cache), 0)
+        with self.assertRaises(ValueError):
+            self.session.use_strategy("invalid")
@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+
+"""Tests for collecting statistics"""
+
+import json
+from time import sleep
+from unittest import TestCase
+from lambda_calculus.visitors.normalisation import Conversion
+from lambda_repl.stats import Statistics
+from .test_normalisation import TRANSFORMER
+
+
+class StatisticsTest(TestCase):
+    """Tests for the statistics of a command"""
+
+    def test_steps(self) -> None:
+        """test recording steps and peaks"""
+        statistics = Statistics("evaluate")
+        statistics.record_term(TRANSFORMER.transform_string(r"(\x.x) (a (b c))"))
+        statistics.record_step(Conversion.ALPHA, TRANSFORMER.transform_string("a"))
+        statistics.record_step(Conversion.BETA, TRANSFORMER.transform_string("a"))
+        summary = statistics.summary()
+        self.assertEqual(summary["alpha"], 1)
+        self.assertEqual(summary["beta"], 1)
+        self.assertEqual(summary["size"], 8)
+        self.assertEqual(summary["depth"], 4)
+
+    def test_timing(self) -> None:
+        """test that nested phases are excluded"""
+        statistics = Statistics("evaluate")
+        with statistics.timing("normalise"):
+            with statistics.timing("print"):
+                sleep(0.05)
+        self.assertGreaterEqual(statistics.timings["print"], 0.05)
+        self.assertLess(statistics.timings["normalise"], 0.05)
+
+    def test_merge(self) -> None:
+        """test adding statistics collected elsewhere"""
+        statistics = Statistics("evaluate")
+        statistics.record_step(Conversion.BETA, TRANSFORMER.transform_string("a b"))
+        statistics.timings["parse"] = 1.0
+        other = Statistics("evaluate")
+        other.record_step(Conversion.ALPHA, TRANSFORMER.transform_string("a"))
+        other.record_step(Conversion.BETA, TRANSFORMER.transform_string("a"))
+        other.timings.update(parse=0.5, normalise=2.0)
+        statistics.merge(other)
+        summary = statistics.summary()
+        self.assertEqual((summary["alpha"], summary["beta"]), (1, 2))
+        self.assertEqual((summary["size"], summary["depth"]), (3, 2))
+        self.assertEqual(summary["timings"], {"parse": 1.5, "normalise": 2.0})
+
+    def test_json(self) -> None:
+        """test converting statistics into JSON"""
+        statistics = Statistics("trace")
+        with statistics.timing("parse"):
+            pass
+        self.assertEqual(
+            json.loads(statistics.to_json()),
+            statistics.summary()
+        )
+        self.assertNotIn("\n", statistics.to_json())
@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+
+"""Tests for reduction strategies"""
+
+from unittest import TestCase
+from lambda_calculus.terms import Variable, arithmetic, combinators
+from lambda_calculus.visitors.normalisation import BetaNormalisingVisitor, Conversion
+from lambda_repl import strategies
+from lambda_repl.debruijn import alpha_equivalent, from_term
+from lambda_repl.limits import Limits
+from lambda_repl.parsing import LambdaTransformer
+
+TRANSFORMER = LambdaTransformer()
+
+NORMALISER = BetaNormalisingVisitor()
+
+
+class ApplicativeOrderVisitorTest(TestCase):
+    """Test for the applicative order strategy"""
+
+    def test_normal_form(self) -> None:
+        """test calculating beta normal forms"""
+        visitor = strategies.ApplicativeOrderVisitor()
+        for term in (
+            TRANSFORMER.transform_string(r"(\x.\y.x) y"),
+            TRANSFORMER.transform_string(r"(\x.x x) ((\y.y) (\z.z))"),
+            arithmetic.ADD.apply_to(arithmetic.number(2), arithmetic.number(3))
+        ):
+            with self.subTest(term=str(term)):
+                self.assertEqual(
+                    visitor.skip_intermediate(term),
+                    NORMALISER.skip_intermediate(term)
+                )
+
+    def test_order(self) -> None:
+        """test reducing arguments first"""
+        term = TRANSFORMER.transform_string(r"(\x.x x) ((\y.y) a)")
+        self.assertEqual(
+            list(term.accept(strategies.ApplicativeOrderVisitor())),
+            [
+                (Conversion.BETA, TRANSFORMER.transform_string(r"(\x.x x) a")),
+                (Conversion.BETA, TRANSFORMER.transform_string("a a"))
+            ]
+        )
+
+
+class CallByNameVisitorTest(TestCase):
+    """Test for the weak head call-by-name strategy"""
+
+    def test_weak_head(self) -> None:
+        """test not reducing abstractions and arguments"""
+        visitor = strategies.CallByNameVisitor()
+        self.assertEqual(
+            visitor.skip_intermediate(TRANSFORMER.transform_string(r"(\x.\y.(\z.z) x) a")),
+            TRANSFORMER.transform_string(r"\y.(\z.z) a")
+        )
+        self.assertEqual(
+            visitor.skip_intermediate(TRANSFORMER.transform_string(r"a ((\x.x) b)")),
+            TRANSFORMER.transform_string(r"a ((\x.x) b)")
+        )
+
+    def test_non_strict(self) -> None:
+        """test not evaluating unused arguments"""
+        term = combinators.K.apply_to(Variable("a"), combinators.OMEGA)
+        self.assertEqual(strategies.CallByNameVisitor().skip_intermediate(term), Variable("a"))
+
+
+class CallByNeedVisitorTest(TestCase):
+    """Test for the weak head call-by-need strategy"""
+
+    visitor: strategies.CallByNeedVisitor
+
+    def setUp(self) -> None:
+        """create the visitor"""
+        self.visitor = strategies.CallByNeedVisitor()
+
+    def test_call_by_name(self) -> None:
+        """test reaching weak head normal forms with the same normal forms as call-by-name"""
+        for source in (
+            r"(\x.\y.x) y",
+            r"(\x.\y.(\z.z) x) a",
+            r"(\f.f (f a)) (\x.\y.x y) b",
+            r"(\f.\x.f (f x)) (\f.\x.f (f x)) g y",
+            r"(\x.\y.y x) ((\x.x x) (\x.x x)) (\x.a)"
+        ):
+            term = TRANSFORMER.transform_string(source)
+            with self.subTest(term=source):
+                self.assertTrue(alpha_equivalent(
+                    from_term(NORMALISER.skip_intermediate(self.visitor.skip_intermediate(term))),
+                    from_term(NORMALISER.skip_intermediate(
+                        strategies.CallByNameVisitor().skip_intermediate(term)
+                    ))
+                ))
+
+    def test_sharing(self) -> None:
+        """test reducing arguments at most once"""
+        term = TRANSFORMER.transform_string(r"(\x.x (x a)) ((\y.y) (\z.z))")
+        self.assertEqual(
+            [step for _, step in term.accept(self.visitor)],
+            [
+                TRANSFORMER.transform_string(r"(\y.y) (\z.z) ((\y.y) (\z.z) a)"),
+                TRANSFORMER.transform_string(r"(\z.z) ((\z.z) a)"),
+                TRANSFORMER.transform_string(r"(\z.z) a"),
+                Variable("a")
+            ]
+        )
+
+    def test_steps(self) -> None:
+        """test recording steps in the budget"""
+        term = TRANSFORMER.transform_string(r"(\x.x (x (x a))) ((\y.y) (\z.z))")
+        budget = Limits().start(term)
+        self.visitor.skip_intermediate(term, budget)
+        self.assertEqual(budget.steps, 5)
+        self.assertEqual(sum(1 for _ in term.accept(strategies.CallByNameVisitor())), 7)
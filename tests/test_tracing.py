@@ -0,0 +1,47 @@
+#!/usr/bin/python3
+
+"""Tests for summarising trace steps"""
+
+from unittest import TestCase
+from lambda_calculus.visitors.normalisation import BetaNormalisingVisitor, Conversion
+from lambda_repl import tracing
+from lambda_repl.strategies import ApplicativeOrderVisitor
+from .test_normalisation import TRANSFORMER
+
+
+class TracingTest(TestCase):
+    """Tests for locating converted subterms"""
+
+    def test_locate(self) -> None:
+        """test locating redexes"""
+        term = TRANSFORMER.transform_string(r"a (\y.y ((\x.x) b)) c")
+        (conversion, step), = term.accept(BetaNormalisingVisitor())
+        position, redex = tracing.locate(term, step, conversion)
+        self.assertEqual(position, [0, 1, 0, 1])
+        self.assertEqual(redex, TRANSFORMER.transform_string(r"(\x.x) b"))
+        self.assertEqual(tracing.format_position(position), "/0/1/0/1")
+
+    def test_shared(self) -> None:
+        """test locating redexes sharing parts with their result"""
+        term = TRANSFORMER.transform_string(r"(\x.f x) a")
+        (conversion, step), = term.accept(BetaNormalisingVisitor())
+        self.assertEqual(tracing.locate(term, step, conversion), ([], term))
+
+    def test_applicative(self) -> None:
+        """test locating inner redexes"""
+        term = TRANSFORMER.transform_string(r"(\x.x) ((\y.y) a)")
+        (conversion, step), _ = term.accept(ApplicativeOrderVisitor())
+        self.assertEqual(tracing.locate(term, step, conversion), ([1], term.argument))
+
+    def test_alpha(self) -> None:
+        """test locating renamed abstractions"""
+        term = TRANSFORMER.transform_string(r"(\x.\y.x) y")
+        steps = list(term.accept(BetaNormalisingVisitor()))
+        self.assertEqual(steps[0][0], Conversion.ALPHA)
+        position, subterm = tracing.locate(term, steps[0][1], steps[0][0])
+        self.assertEqual(position, [0, 0])
+        self.assertEqual(subterm, term.abstraction.body)
+
+    def test_root(self) -> None:
+        """test position of the whole term"""
+        self.assertEqual(tracing.format_position([]), "/")
@@ -0,0 +1,113 @@
+#!/usr/bin/python3
+
+"""Tests for normal order reduction with a zipper"""
+
+from itertools import islice
+from unittest import TestCase
+from lambda_calculus.terms import Variable
+from lambda_calculus.visitors.normalisation import BetaNormalisingVisitor
+from lambda_repl import zipper
+from lambda_repl.limits import LimitExceeded, Limits
+from lambda_repl.normalisation import skip_intermediate
+from .test_normalisation import CORPUS, TRANSFORMER
+
+
+class ZipperTest(TestCase):
+    """Tests for zipper paths"""
+
+    def test_plug(self) -> None:
+        """test rebuilding terms from paths"""
+        path = zipper.Frame(zipper.BODY, "x", zipper.Frame(
+            zipper.FUNCTION,
+            Variable("b"),
+            zipper.Frame(zipper.ARGUMENT, Variable("a"), None)
+        ))
+        self.assertEqual(
+            zipper.plug(Variable("x"), path),
+            TRANSFORMER.transform_string(r"a ((\x.x) b)")
+        )
+        self.assertEqual(zipper.plug(Variable("x"), None), Variable("x"))
+
+    def test_reduce(self) -> None:
+        """test that steps are performed on the subterm at their path"""
+        term = TRANSFORMER.transform_string(r"a ((\x.\y.x) b c)")
+        steps = [
+            (conversion, before, after, zipper.plug(after, path))
+            for conversion, before, after, path in zipper.reduce(term)
+        ]
+        self.assertEqual(
+            [(before, after) for _, before, after, _ in steps],
+            [
+                (TRANSFORMER.transform_string(r"(\x.\y.x) b"), TRANSFORMER.transform_string(r"\y.b")),
+                (TRANSFORMER.transform_string(r"(\y.b) c"), Variable("b"))
+            ]
+        )
+        self.assertEqual(steps[-1][-1], TRANSFORMER.transform_string("a b"))
+
+
+class ZipperNormalisingVisitorTest(TestCase):
+    """Tests for the zipper normalisation engine"""
+
+    visitor: zipper.ZipperNormalisingVisitor
+
+    reference: BetaNormalisingVisitor
+
+    def setUp(self) -> None:
+        """create the engines"""
+        self.visitor = zipper.ZipperNormalisingVisitor()
+        self.reference = BetaNormalisingVisitor()
+
+    def test_steps(self) -> None:
+        """test performing the same steps as the reference implementation"""
+        for term in CORPUS:
+            with self.subTest(term=str(term)):
+                self.assertEqual(
+                    list(term.accept(self.visitor)),
+                    list(term.accept(self.reference))
+                )
+
+    def test_corpus(self) -> None:
+        """test normal forms against the reference implementation"""
+        for term in CORPUS:
+            with self.subTest(term=str(term)):
+                budget = Limits().start(term)
+                self.assertEqual(
+                    self.visitor.skip_intermediate(term, budget),
+                    self.reference.skip_intermediate(term)
+                )
+                self.assertEqual(budget.steps, len(list(term.accept(self.reference))))
+
+    def test_step_limit(self) -> None:
+        """test partial results matching the reference implementation"""
+        term = TRANSFORMER.transform_string(r"(\x.\y.x y) (\y.y) ((\x.x x) (\x.x x))")
+        steps = list(islice(term.accept(self.reference), 3))
+        for limit in range(4):
+            with self.subTest(limit=limit):
+                budget = Limits(steps=limit).start(term)
+                with self.assertRaises(LimitExceeded):
+                    self.visitor.skip_intermediate(term, budget)
+                self.assertEqual(budget.term, steps[limit - 1][1] if limit else term)
+
+    def test_size_limit(self) -> None:
+        """test tracking the size of terms like the reference implementation"""
+        term = TRANSFORMER.transform_string(r"(\x.x x x) ((\x.x x x) a)")
+        for limit in (7, 20, 26, 27):
+            with self.subTest(limit=limit):
+                budget = Limits(size=limit).start(term)
+                reference = Limits(size=limit).start(term)
+                try:
+                    skip_intermediate(self.reference, term, reference)
+                except LimitExceeded:
+                    with self.assertRaises(LimitExceeded):
+                        self.visitor.skip_intermediate(term, budget)
+                    self.assertEqual(budget.term, reference.term)
+                else:
+                    self.visitor.skip_intermediate(term, budget)
+                self.assertEqual(budget.steps, reference.steps)
+
+    def test_deep(self) -> None:
+        """test reducing redexes nested deeper than the recursion limit"""
+        term = TRANSFORMER.transform_string("(\\x.x) (" * 5000 + "a" + ")" * 5000)
+        budget = Limits().start(term)
+        self.assertEqual(self.visitor.skip_intermediate(term, budget), Variable("a"))
+        self.assertEqual(budget.steps, 5000)